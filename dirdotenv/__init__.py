@@ -1,3 +1,15 @@
 """dirdotenv - Load environment variables from .env and .envrc files."""
 
 from .__version__ import __version__
+from .scope import scoped
+
+__all__ = ["__version__", "Watcher", "scoped"]
+
+
+def __getattr__(name):
+    # Imported lazily: the watcher pulls in ctypes, which shell hooks don't need
+    if name == "Watcher":
+        from .watch import Watcher
+
+        return Watcher
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
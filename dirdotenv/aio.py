@@ -0,0 +1,174 @@
+"""Asyncio API for loading environment variables without blocking the event loop."""
+
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+from dirdotenv import loader, parser
+
+DEFAULT_MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# In-flight loads per event loop, keyed by (operation, absolute directory)
+_inflight = weakref.WeakKeyDictionary()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Get the bounded executor used to offload filesystem I/O.
+
+    The executor is created lazily with DEFAULT_MAX_WORKERS threads.
+
+    Returns:
+        Shared ThreadPoolExecutor instance
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="dirdotenv"
+            )
+        return _executor
+
+
+def set_max_workers(max_workers: int) -> None:
+    """
+    Replace the shared executor with one bounded to max_workers threads.
+
+    Loads already running on the previous executor are allowed to finish.
+
+    Args:
+        max_workers: Maximum number of threads doing filesystem I/O at once
+
+    Raises:
+        ValueError: If max_workers is less than 1
+    """
+    global _executor
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    with _executor_lock:
+        old_executor = _executor
+        _executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="dirdotenv"
+        )
+
+    if old_executor is not None:
+        old_executor.shutdown(wait=False)
+
+
+async def _run_deduplicated(operation: str, directory: str, func):
+    """
+    Run func(directory) in the executor, sharing the result between concurrent callers.
+
+    Args:
+        operation: Name of the operation, part of the deduplication key
+        directory: Directory the operation works on
+        func: Blocking function taking the absolute directory path
+
+    Returns:
+        Result of func for the directory
+    """
+    loop = asyncio.get_running_loop()
+    path = os.path.abspath(directory)
+    key = (operation, path)
+
+    pending = _inflight.setdefault(loop, {})
+    future = pending.get(key)
+    if future is None:
+        future = loop.run_in_executor(get_executor(), func, path)
+        pending[key] = future
+
+        def _forget(done):
+            if pending.get(key) is done:
+                del pending[key]
+
+        future.add_done_callback(_forget)
+
+    # Shield so that one cancelled caller does not cancel the load for the others
+    return await asyncio.shield(future)
+
+
+async def load_env(directory: str = ".") -> Dict[str, str]:
+    """
+    Async counterpart of dirdotenv.parser.load_env.
+
+    Args:
+        directory: Directory to search for .env and .envrc files (default: current directory)
+
+    Returns:
+        Dictionary of environment variable key-value pairs
+    """
+    env_vars = await _run_deduplicated("load_env", directory, parser.load_env)
+    return dict(env_vars)
+
+
+async def load_env_with_inheritance(current_dir: str) -> Tuple[Dict[str, str], list]:
+    """
+    Async counterpart of dirdotenv.loader.load_env_with_inheritance.
+
+    Args:
+        current_dir: Directory to load the inherited environment for
+
+    Returns:
+        Tuple of (env_vars dict, list of directory paths that were loaded)
+    """
+    env_vars, directories = await _run_deduplicated(
+        "load_env_with_inheritance", current_dir, loader.load_env_with_inheritance
+    )
+    return dict(env_vars), list(directories)
+
+
+async def compute_env_state(current_dir: str) -> str:
+    """
+    Async counterpart of dirdotenv.loader.compute_env_state.
+
+    Args:
+        current_dir: Current directory path
+
+    Returns:
+        State string that changes when files are added, removed, or modified
+    """
+    return await _run_deduplicated(
+        "compute_env_state", current_dir, loader.compute_env_state
+    )
+
+
+async def load_many(
+    directories: Iterable[str], inherit: bool = True
+) -> List[Dict[str, str]]:
+    """
+    Load the environments of many directories concurrently.
+
+    Concurrency is bounded by the shared executor; duplicate directories are
+    loaded only once.
+
+    Args:
+        directories: Directories to load
+        inherit: Whether to apply parent directory inheritance (default: True)
+
+    Returns:
+        List of environment dicts in the same order as directories
+    """
+    if inherit:
+        results = await asyncio.gather(
+            *(load_env_with_inheritance(directory) for directory in directories)
+        )
+        return [env_vars for env_vars, _ in results]
+
+    return list(await asyncio.gather(*(load_env(directory) for directory in directories)))
+
+
+__all__ = [
+    "compute_env_state",
+    "get_executor",
+    "load_env",
+    "load_env_with_inheritance",
+    "load_many",
+    "set_max_workers",
+]
@@ -0,0 +1,197 @@
+"""Frozen, fully resolved environments of a directory.
+
+`dirdotenv bake` resolves the inherited environment of a directory once and
+writes it to a small JSON artifact, together with a fingerprint of every file
+that can contribute to it: each env file name in the directory and all its
+parents (existing or not) and the files watched from .envrc. Loading the
+artifact only stats those files. If one of them was added or changed content,
+or the selected file names (profile) differ, the environment is loaded from
+the source files instead. Removed files do not count as changes unless
+checking strictly: deployments often ship the artifact without the sources.
+"""
+
+import os
+import stat
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from dirdotenv.filehash import hash_file
+from dirdotenv.loader import env_file_candidates, load_env_tree
+from dirdotenv.profiles import get_file_names
+
+FORMAT = "dirdotenv-bake"
+VERSION = 1
+
+# (size, mtime in nanoseconds, content hash), or None for a missing file
+FileFingerprint = Optional[Tuple[int, int, str]]
+
+
+class Bake(NamedTuple):
+    """A resolved environment and the files it was resolved from."""
+
+    directory: str
+    names: List[str]
+    files: List[Tuple[str, FileFingerprint]]
+    env_vars: Dict[str, str]
+    expires: Optional[float] = None
+
+
+def _fingerprint(filepath: str) -> FileFingerprint:
+    try:
+        st = os.stat(filepath)
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return (st.st_size, st.st_mtime_ns, hash_file(filepath))
+    except OSError:
+        return None
+
+
+def bake(directory: str) -> Bake:
+    """
+    Resolve the inherited environment of a directory.
+
+    Args:
+        directory: Directory to resolve
+
+    Returns:
+        Bake with the merged variables and the fingerprints of all files that
+        can contribute to them
+    """
+    directory = os.path.abspath(directory)
+    result = load_env_tree(directory)
+
+    paths = env_file_candidates(directory)
+    paths.extend(filepath for filepath in result.watched if filepath not in paths)
+
+    return Bake(
+        directory=directory,
+        names=list(get_file_names()),
+        files=[(filepath, _fingerprint(filepath)) for filepath in paths],
+        env_vars=dict(result.env_vars),
+        expires=result.expires,
+    )
+
+
+def dumps(baked: Bake) -> str:
+    """Serialize a bake to its artifact format."""
+    import json
+
+    return json.dumps(
+        {
+            "format": FORMAT,
+            "version": VERSION,
+            "directory": baked.directory,
+            "names": baked.names,
+            "files": [[filepath] + list(fingerprint or ()) for filepath, fingerprint in baked.files],
+            "expires": baked.expires,
+            "env": baked.env_vars,
+        },
+        separators=(",", ":"),
+    )
+
+
+def loads(data: str) -> Bake:
+    """
+    Deserialize an artifact.
+
+    Raises:
+        ValueError: If the data is not a bake artifact of a supported version
+    """
+    import json
+
+    try:
+        content = json.loads(data)
+        if content.get("format") != FORMAT:
+            raise ValueError("not a dirdotenv bake artifact")
+        if content.get("version") != VERSION:
+            raise ValueError(f"unsupported bake version {content.get('version')}")
+        files = []
+        for record in content["files"]:
+            fingerprint = (int(record[1]), int(record[2]), str(record[3])) if len(record) == 4 else None
+            files.append((str(record[0]), fingerprint))
+        return Bake(
+            directory=str(content["directory"]),
+            names=[str(name) for name in content["names"]],
+            files=files,
+            env_vars={str(key): str(value) for key, value in content["env"].items()},
+            expires=content.get("expires"),
+        )
+    except (AttributeError, IndexError, KeyError, TypeError) as e:
+        raise ValueError(f"invalid bake artifact: {e}") from None
+
+
+def write_bake(directory: str, output: str) -> Bake:
+    """
+    Bake a directory into an artifact file.
+
+    Args:
+        directory: Directory to resolve
+        output: Artifact path
+
+    Returns:
+        The bake that was written
+    """
+    from dirdotenv.paths import write_file_atomic
+
+    baked = bake(directory)
+    write_file_atomic(os.path.abspath(output), dumps(baked).encode("utf-8"))
+    return baked
+
+
+def read_bake(path: str) -> Bake:
+    """
+    Read an artifact file.
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a bake artifact of a supported version
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return loads(f.read())
+
+
+def is_fresh(baked: Bake, strict: bool = False) -> bool:
+    """
+    Check whether the files a bake was resolved from are unchanged.
+
+    Size and mtime are a fast gate: the content is only hashed when they
+    differ, so copies that keep the content (e.g. into an image) stay fresh.
+
+    Args:
+        baked: Bake to check
+        strict: Also treat source files that no longer exist as changes
+    """
+    if baked.expires is not None and time.time() >= baked.expires:
+        return False
+    if tuple(baked.names) != get_file_names():
+        return False
+
+    for filepath, fingerprint in baked.files:
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            if fingerprint is None or not strict:
+                continue
+            return False
+        if fingerprint is None or st.st_size != fingerprint[0]:
+            return False
+        if st.st_mtime_ns != fingerprint[1]:
+            try:
+                if hash_file(filepath) != fingerprint[2]:
+                    return False
+            except OSError:
+                return False
+    return True
+
+
+__all__ = [
+    "Bake",
+    "bake",
+    "dumps",
+    "is_fresh",
+    "loads",
+    "read_bake",
+    "write_bake",
+]
@@ -0,0 +1,386 @@
+"""Thread-safe in-process cache for parsed .env and .envrc files."""
+
+import os
+import stat
+import threading
+from collections import ChainMap, OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from dirdotenv import parser
+from dirdotenv.interpolate import interpolate_layers, referenced_names
+from dirdotenv.loader import scan_env_tree
+from dirdotenv.profiles import file_kind, get_file_names, scan_env_files
+
+if TYPE_CHECKING:
+    from dirdotenv.envrc import EnvrcResult
+
+DEFAULT_MAX_SIZE = 1024
+
+Fingerprint = Tuple[int, int, int, int]
+
+
+class CacheStats(NamedTuple):
+    """Counters describing cache effectiveness."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+
+
+def stat_fingerprint(filepath: str) -> Optional[Fingerprint]:
+    """
+    Get a fingerprint of a file that changes whenever the file is replaced or modified.
+
+    Args:
+        filepath: Path to the file
+
+    Returns:
+        Tuple of (device, inode, size, mtime in nanoseconds), or None if the file
+        does not exist or is not a regular file
+    """
+    try:
+        st = os.stat(filepath)
+    except (OSError, ValueError):
+        return None
+
+    if not stat.S_ISREG(st.st_mode):
+        return None
+
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class EnvCache:
+    """
+    LRU cache of parsed env files, validated by stat fingerprint.
+
+    Safe to share between threads. Concurrent requests for the same file are
+    single-flight: one thread parses it while the others wait for its result.
+
+    Merged environments are also kept per (directory, file names), so
+    switching between profiles reuses both the parsed files and the merge.
+
+    .envrc files with directives or commands depend on more than their own
+    content (sourced files, PATH, command output), so they are evaluated on
+    every load and neither they nor the merges including them are cached.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        # (directory, file names) -> (files, fingerprints, referenced process values,
+        #                             env_vars, directories, watched files, reusable,
+        #                             untrusted sourced files)
+        self._merged = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> [lock, number of threads using it]
+        self._key_locks = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _lookup(self, key, fingerprint) -> Optional[Dict[str, str]]:
+        """Return a copy of the cached value if it matches fingerprint (caller holds _lock)."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != fingerprint:
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return dict(entry[1])
+
+    def _acquire_key_lock(self, key) -> threading.Lock:
+        with self._lock:
+            entry = self._key_locks.get(key)
+            if entry is None:
+                entry = self._key_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        entry[0].acquire()
+        return entry[0]
+
+    def _release_key_lock(self, key, lock: threading.Lock) -> None:
+        lock.release()
+        with self._lock:
+            entry = self._key_locks[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._key_locks[key]
+
+    def parse_file(self, filepath: str, kind: str) -> Dict[str, str]:
+        """
+        Parse an env file, reusing the cached result when the file is unchanged.
+
+        Args:
+            filepath: Path to the file
+            kind: 'env' for .env syntax or 'envrc' for .envrc syntax
+
+        Returns:
+            Dictionary of environment variable key-value pairs
+        """
+        return self._parse_file(filepath, kind)[0]
+
+    def _parse_file(
+        self,
+        filepath: str,
+        kind: str,
+        allowlist=None,
+        environ: Optional[Mapping[str, str]] = None,
+    ) -> Tuple[Dict[str, str], Optional["EnvrcResult"]]:
+        """
+        Parse an env file like parse_file.
+
+        Args:
+            filepath: Path to the file
+            kind: 'env' for .env syntax or 'envrc' for .envrc syntax
+            allowlist: If given, files sourced from an .envrc file are only
+                loaded when allowed in it
+            environ: Values that PATH_add/path_add build on (default:
+                os.environ). Only results that do not use them are cached,
+                so they are not part of the key.
+
+        Returns:
+            Tuple of (env_vars, None) for results that were cached, or
+            (env_vars, EnvrcResult) for .envrc results that depend on more
+            than the file itself and are not cached
+        """
+        if kind not in ("env", "envrc"):
+            raise ValueError(f"Unknown env file kind: {kind}")
+
+        fingerprint = stat_fingerprint(filepath)
+        if fingerprint is None:
+            return {}, None
+
+        key = (kind, os.path.abspath(filepath))
+
+        with self._lock:
+            cached = self._lookup(key, fingerprint)
+        if cached is not None:
+            return cached, None
+
+        lock = self._acquire_key_lock(key)
+        try:
+            # Another thread may have parsed the file while we were waiting
+            with self._lock:
+                cached = self._lookup(key, fingerprint)
+            if cached is not None:
+                return cached, None
+
+            if kind == "env":
+                env_vars = parser.parse_env_file(filepath)
+            else:
+                from dirdotenv.envrc import evaluate_envrc
+
+                result = evaluate_envrc(filepath, environ, allowlist, allowlist is not None)
+                env_vars = result.env_vars
+                if not result.self_contained:
+                    with self._lock:
+                        self._misses += 1
+                        self._entries.pop(key, None)
+                    return dict(env_vars), result
+
+            with self._lock:
+                self._misses += 1
+                self._entries[key] = (fingerprint, env_vars)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+
+            return dict(env_vars), None
+        finally:
+            self._release_key_lock(key, lock)
+
+    def load_env(self, directory: str = ".", profile: Optional[str] = None) -> Dict[str, str]:
+        """
+        Cached counterpart of dirdotenv.parser.load_env.
+
+        Args:
+            directory: Directory to search for .env and .envrc files (default: current directory)
+            profile: Profile selecting extra files (default: $DIRDOTENV_PROFILE)
+
+        Returns:
+            Dictionary of environment variable key-value pairs
+        """
+        return interpolate_layers(self.load_layers(directory, profile))
+
+    def load_layers(
+        self,
+        directory: str,
+        profile: Optional[str] = None,
+        parents: Optional[List[Dict[str, str]]] = None,
+    ) -> List[Dict[str, str]]:
+        """
+        Get the raw variables of a directory's env files, in load order.
+
+        Args:
+            directory: Directory to search for env files
+            profile: Profile selecting extra files (default: $DIRDOTENV_PROFILE)
+            parents: Layers loaded before this directory's (e.g. of its
+                parents), which PATH_add/path_add build on
+
+        Returns:
+            List of dictionaries with ${VAR} references not yet resolved
+        """
+        merged = {}
+        for layer in parents or []:
+            merged.update(layer)
+        layers = []
+        for entry in scan_env_files(directory, get_file_names(profile)):
+            # Path directives build on the variables loaded before
+            env_vars, _ = self._parse_file(
+                entry.path, file_kind(entry.path), None, ChainMap(merged, os.environ)
+            )
+            layers.append(env_vars)
+            merged.update(env_vars)
+        return layers
+
+    def load_env_with_inheritance(
+        self,
+        current_dir: str,
+        profile: Optional[str] = None,
+        skip: Optional[Set[str]] = None,
+        allowlist=None,
+    ) -> Tuple[Dict[str, str], list]:
+        """
+        Cached counterpart of dirdotenv.loader.load_env_with_inheritance.
+
+        The merged result is reused while the same files exist with the same
+        fingerprints and the process values they reference are unchanged, and
+        none of them is an .envrc file that depends on other files.
+
+        Args:
+            current_dir: Directory to load the inherited environment for
+            profile: Profile selecting extra files (default: $DIRDOTENV_PROFILE)
+            skip: Absolute paths of env files not to load (e.g. untrusted files)
+            allowlist: If given, files sourced from .envrc files are only
+                loaded when allowed in it (the env files themselves are
+                checked by skip)
+
+        Returns:
+            Tuple of (env_vars dict, list of directory paths that were loaded)
+        """
+        skip = skip or set()
+        names = get_file_names(profile)
+        tree = scan_env_tree(current_dir, names)
+        files = tuple(
+            entry.path for _, entries in tree for entry in entries if entry.path not in skip
+        )
+        fingerprints = tuple(stat_fingerprint(filepath) for filepath in files)
+        key = (os.path.abspath(current_dir), names)
+
+        with self._lock:
+            cached = self._merged.get(key)
+            if (
+                cached is not None
+                and cached[6]
+                and cached[0] == files
+                and cached[1] == fingerprints
+                and all(os.environ.get(name) == value for name, value in cached[2])
+            ):
+                self._merged.move_to_end(key)
+                self._hits += 1
+                return dict(cached[3]), list(cached[4])
+
+        layers = []
+        merged = {}
+        watched = []
+        untrusted = []
+        reusable = True
+        for filepath in files:
+            # Path directives build on the variables loaded before, like load_env_tree
+            env_vars, result = self._parse_file(
+                filepath, file_kind(filepath), allowlist, ChainMap(merged, os.environ)
+            )
+            layers.append(env_vars)
+            merged.update(env_vars)
+            if result is not None:
+                reusable = False
+                watched.extend(path for path in result.watched if path not in watched)
+                untrusted.extend(path for path in result.untrusted if path not in untrusted)
+        env_vars = interpolate_layers(layers)
+        directories = [directory for directory, _ in tree]
+        process_values = tuple(
+            (name, os.environ.get(name)) for name in sorted(referenced_names(layers))
+        )
+
+        with self._lock:
+            self._merged[key] = (
+                files,
+                fingerprints,
+                process_values,
+                env_vars,
+                directories,
+                tuple(watched),
+                reusable,
+                tuple(untrusted),
+            )
+            self._merged.move_to_end(key)
+            while len(self._merged) > self.max_size:
+                self._merged.popitem(last=False)
+
+        return dict(env_vars), list(directories)
+
+    def watched_files(self, current_dir: str, profile: Optional[str] = None) -> List[str]:
+        """
+        Get the files the last load_env_with_inheritance of a directory also
+        depended on, besides its env files (files sourced or watched by .envrc).
+
+        Args:
+            current_dir: Directory that was loaded
+            profile: Profile selecting extra files (default: $DIRDOTENV_PROFILE)
+
+        Returns:
+            List of file paths, empty if the directory was not loaded yet
+        """
+        key = (os.path.abspath(current_dir), get_file_names(profile))
+        with self._lock:
+            cached = self._merged.get(key)
+            return list(cached[5]) if cached is not None else []
+
+    def untrusted_files(self, current_dir: str, profile: Optional[str] = None) -> List[str]:
+        """
+        Get the files sourced from .envrc that the last load_env_with_inheritance
+        of a directory did not load because they are not allowed.
+
+        Args:
+            current_dir: Directory that was loaded
+            profile: Profile selecting extra files (default: $DIRDOTENV_PROFILE)
+
+        Returns:
+            List of file paths, empty if the directory was not loaded yet
+        """
+        key = (os.path.abspath(current_dir), get_file_names(profile))
+        with self._lock:
+            cached = self._merged.get(key)
+            return list(cached[7]) if cached is not None else []
+
+    def stats(self) -> CacheStats:
+        """Get the current hit/miss/eviction counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                max_size=self.max_size,
+            )
+
+    def clear(self) -> None:
+        """Drop all cached entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._merged.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+# Shared cache for callers that do not need their own
+default_cache = EnvCache()
+
+
+__all__ = ["CacheStats", "EnvCache", "default_cache", "stat_fingerprint"]
@@ -0,0 +1,282 @@
+"""Validation of .env and .envrc files across a directory tree."""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from dirdotenv.envrc import DIRECTIVES
+from dirdotenv.interpolate import Interpolator, literal_or_str
+from dirdotenv.parser import ENV_LINE_RE, ENVRC_LINE_RE, strip_quotes
+
+ENV_FILE_NAMES = (".envrc", ".env")
+
+# Directories that never contain env files we should manage
+DEFAULT_EXCLUDES = frozenset(
+    [
+        ".git",
+        ".hg",
+        ".svn",
+        ".tox",
+        ".nox",
+        ".venv",
+        "venv",
+        "node_modules",
+        "__pycache__",
+        ".mypy_cache",
+        ".pytest_cache",
+    ]
+)
+
+# A quoted value followed by a comment: "value" # comment
+_QUOTED_COMMENT_RE = re.compile(r'^(\'[^\']*\'|"[^"]*")\s+#.*$')
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+
+class Diagnostic(NamedTuple):
+    """A problem found in an env file."""
+
+    path: str
+    line: int
+    severity: str  # "error" or "warning"
+    message: str
+
+    def format(self) -> str:
+        return f"{self.path}:{self.line}: {self.severity}: {self.message}"
+
+
+def find_env_files(root: str, excludes: Iterable[str] = DEFAULT_EXCLUDES) -> Iterator[str]:
+    """
+    Find all .env and .envrc files under root.
+
+    Uses a single os.scandir per directory and does not follow symlinked directories.
+
+    Args:
+        root: Directory to search
+        excludes: Directory names to skip
+
+    Yields:
+        Paths of env files
+    """
+    excludes = frozenset(excludes)
+    stack = [root]
+
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in excludes:
+                        subdirs.append(entry.path)
+                elif entry.name in ENV_FILE_NAMES and entry.is_file():
+                    yield entry.path
+            except OSError:
+                continue
+
+        # Reverse so that directories are visited in sorted order
+        stack.extend(sorted(subdirs, reverse=True))
+
+
+def _quote_problem(value: str) -> Optional[str]:
+    """Describe an unbalanced quote in a raw value, if there is one."""
+    # A comment after a quoted value does not unbalance it
+    match = _QUOTED_COMMENT_RE.match(value)
+    if match:
+        value = match.group(1)
+    for quote in ("'", '"'):
+        starts = value.startswith(quote)
+        ends = value.endswith(quote)
+        if starts and (len(value) < 2 or not ends):
+            return f"unbalanced {quote} quote: value starts with a quote but does not end with one"
+        if ends and not starts:
+            return f"unbalanced {quote} quote: value ends with a quote but does not start with one"
+    return None
+
+
+def check_file(filepath: str) -> Tuple[List[Diagnostic], Dict[str, int]]:
+    """
+    Validate a single .env or .envrc file.
+
+    Args:
+        filepath: Path to the file
+
+    Returns:
+        Tuple of (diagnostics, dict mapping each defined key to the line defining it)
+    """
+    is_envrc = os.path.basename(filepath) == ".envrc"
+    pattern = ENVRC_LINE_RE if is_envrc else ENV_LINE_RE
+    expected = "export KEY=value" if is_envrc else "KEY=value"
+
+    diagnostics = []
+    keys = {}
+    values = {}
+
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except UnicodeDecodeError as e:
+        return [Diagnostic(filepath, 0, "error", f"not valid UTF-8: {e.reason}")], keys
+    except OSError as e:
+        return [Diagnostic(filepath, 0, "error", f"cannot read file: {e.strerror}")], keys
+
+    for lineno, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        match = pattern.match(line)
+        if not match and is_envrc and line.split(None, 1)[0] in DIRECTIVES:
+            continue
+        if not match:
+            diagnostics.append(
+                Diagnostic(
+                    filepath, lineno, "error", f"unparseable line, expected {expected}"
+                )
+            )
+            continue
+
+        key, value = match.group(1), match.group(2)
+
+        problem = _quote_problem(value)
+        if problem:
+            diagnostics.append(Diagnostic(filepath, lineno, "error", problem))
+
+        if key in keys:
+            diagnostics.append(
+                Diagnostic(
+                    filepath,
+                    lineno,
+                    "error",
+                    f"duplicate key {key} (first defined on line {keys[key]})",
+                )
+            )
+        else:
+            keys[key] = lineno
+        values[key] = literal_or_str(value, strip_quotes(value))
+
+    # References within the file that can never be resolved
+    interpolator = Interpolator(environ={})
+    interpolator.update([(filepath, values)])
+    for cycle in interpolator.cycles:
+        diagnostics.append(
+            Diagnostic(
+                filepath,
+                keys[cycle[0]],
+                "error",
+                f"circular reference: {' -> '.join(cycle)}",
+            )
+        )
+
+    return diagnostics, keys
+
+
+def _shadow_diagnostics(results: Dict[str, Dict[str, int]]) -> List[Diagnostic]:
+    """
+    Report keys that override a definition from a file loaded earlier.
+
+    Follows the order of load_env_with_inheritance: parents before children and
+    .envrc before .env within a directory.
+    """
+    by_directory = {}
+    for path in results:
+        directory, name = os.path.split(path)
+        by_directory.setdefault(directory, {})[name] = path
+
+    diagnostics = []
+    for path, keys in results.items():
+        directory, name = os.path.split(path)
+
+        # Files loaded before this one, nearest first
+        earlier = []
+        if name == ".env" and ".envrc" in by_directory[directory]:
+            earlier.append(by_directory[directory][".envrc"])
+        parent = directory
+        while True:
+            next_parent = os.path.dirname(parent)
+            if next_parent == parent:
+                break
+            parent = next_parent
+            files = by_directory.get(parent)
+            if files:
+                earlier.extend(files[n] for n in ENV_FILE_NAMES[::-1] if n in files)
+
+        for key, lineno in keys.items():
+            for other in earlier:
+                if key in results[other]:
+                    diagnostics.append(
+                        Diagnostic(
+                            path,
+                            lineno,
+                            "warning",
+                            f"{key} shadows definition at {other}:{results[other][key]}",
+                        )
+                    )
+                    break
+
+    return diagnostics
+
+
+def map_files(func, files: List[str], jobs: Optional[int] = None) -> list:
+    """
+    Apply func to every file, using a process pool when it is worth it.
+
+    Args:
+        func: Picklable function taking a file path
+        files: File paths
+        jobs: Number of worker processes (default: number of CPUs)
+
+    Returns:
+        Results in the same order as files
+    """
+    workers = jobs or os.cpu_count() or 1
+    if workers == 1 or len(files) < PARALLEL_THRESHOLD:
+        return [func(f) for f in files]
+
+    chunksize = max(1, len(files) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, files, chunksize=chunksize))
+
+
+def check_paths(
+    paths: Iterable[str], jobs: Optional[int] = None
+) -> Tuple[List[Diagnostic], int]:
+    """
+    Validate env files, walking directories and checking files in a process pool.
+
+    Args:
+        paths: Files and directories to check
+        jobs: Number of worker processes (default: number of CPUs)
+
+    Returns:
+        Tuple of (diagnostics sorted by path and line, number of files checked)
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(find_env_files(path))
+        else:
+            files.append(path)
+    files = [os.path.abspath(f) for f in files]
+
+    outputs = map_files(check_file, files, jobs)
+
+    diagnostics = []
+    results = {}
+    for filepath, (file_diagnostics, keys) in zip(files, outputs):
+        diagnostics.extend(file_diagnostics)
+        results[filepath] = keys
+
+    diagnostics.extend(_shadow_diagnostics(results))
+    diagnostics.sort(key=lambda d: (d.path, d.line))
+    return diagnostics, len(files)
+
+
+__all__ = ["Diagnostic", "check_file", "check_paths", "find_env_files", "map_files"]
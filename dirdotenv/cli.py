@@ -12,17 +12,24 @@ from dirdotenv.loader import (
     format_unset_commands,
     format_message,
     compute_env_state,
-    has_state_changed,
+    get_path_additions,
+    check_state,
+    load_env_tree,
 )
+from dirdotenv.formats import FORMATS
 from dirdotenv.hooks import get_hook
 from dirdotenv.__version__ import __version__
 
+SUBCOMMANDS = ["hook", "load", "check", "where", "exec-many", "allow", "deny", "status", "bake"]
+
 
 def get_invocation_command():
     """Determine how dirdotenv was invoked."""
     # Check for python -m dirdotenv usage
     if sys.argv[0].endswith("__main__.py"):
-        return f"{sys.executable} -m dirdotenv"
+        # -P keeps the directory the hook runs in off sys.path (Python 3.11+)
+        safe_path = " -P" if sys.version_info >= (3, 11) else ""
+        return f"{sys.executable}{safe_path} -m dirdotenv"
 
     # Check for uvx / uv tool run usage
     # Heuristic: executable path contains uv/tools directory structure
@@ -38,89 +45,544 @@ def get_invocation_command():
     return "dirdotenv"
 
 
+def _source_line(shell, hook_path):
+    """Get the line that loads an installed hook in the given shell."""
+    from dirdotenv.hooks import quote_for_shell
+
+    if shell == "powershell":
+        return f". {quote_for_shell(hook_path, shell)}"
+    return f"source {quote_for_shell(hook_path, 'bash' if shell == 'xonsh' else shell)}"
+
+
+def get_direct_python():
+    """
+    Get the interpreter hooks can run directly with `-m dirdotenv`.
+
+    Running the interpreter skips the PATH lookup of an entry point script and,
+    under uv, re-resolving the tool environment with `uvx` on every prompt.
+    The hooks check that the file and the installed dirdotenv package still
+    exist and otherwise fall back to the command from get_invocation_command().
+
+    Returns:
+        Absolute path of the interpreter, or None if it cannot be determined
+    """
+    if not sys.executable or not os.path.isabs(sys.executable):
+        return None
+    return sys.executable
+
+
 def load_command(args):
     """Handle the load command with inheritance and cleanup."""
     shell = args.shell
     current_dir = os.getcwd()
 
-    # Get previous state from environment
-    old_state = os.environ.get("_DIRDOTENV_STATE", None)
+    if args.format:
+        # For tools: the full inherited environment, independent of hook state
+        from dirdotenv.formats import write_env
+
+        env_vars, _ = load_env_with_inheritance(current_dir)
+        write_env(env_vars, args.format, sys.stdout, directory=current_dir)
+        return 0
+
+    session = None
+    if args.session is not None:
+        # Keys and state are kept in a session file instead of the environment
+        from dirdotenv.session import Session
+
+        try:
+            session = Session.open(args.session)
+        except OSError as e:
+            print(f"dirdotenv: could not open session: {e}", file=sys.stderr)
+            return 1
+        old_state = session.state
+        old_keys_str = session.keys
+    else:
+        # Get previous state from environment
+        old_state = os.environ.get("_DIRDOTENV_STATE", None)
+        old_keys_str = os.environ.get("_DIRDOTENV_KEYS", "")
 
     # Check if state has changed (directory or files)
-    if not has_state_changed(old_state, current_dir):
+    # A new session still has to be saved and its id exported
+    changed, refreshed_state = check_state(old_state, current_dir)
+    if not changed and not (session and session.is_new):
+        if refreshed_state is not None:
+            # Files were rewritten with the same content: record their new
+            # mtimes, so the next prompts do not look up their hashes again
+            return refresh_state(args, session, refreshed_state)
         # No changes detected, output nothing
         return 0
 
-    # Compute new state
-    new_state = compute_env_state(current_dir)
+    # Only load allowed files if the user asked for it
+    from dirdotenv.trust import Allowlist, find_untrusted, trust_required
 
-    # Load with inheritance
-    new_vars, loaded_dirs = load_env_with_inheritance(current_dir)
+    allowlist = Allowlist() if trust_required() else None
+    skip, untrusted = find_untrusted(current_dir, allowlist) if allowlist else (set(), [])
 
-    # Get previously loaded vars from environment variable
-    old_keys_str = os.environ.get("_DIRDOTENV_KEYS", "")
+    # Get previously loaded vars
     old_keys = set(old_keys_str.split(":")) if old_keys_str else set()
 
+    # Directories the previous load prepended to path variables are taken out
+    # again, so PATH_add builds on the user's own value. Other values we set
+    # are not the user's: ${VAR} references must not see them.
+    old_path_additions = get_path_additions(old_state)
+    environ = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in old_keys or key in old_path_additions
+    }
+    if old_path_additions:
+        from dirdotenv.envrc import remove_paths
+
+        for key, entries in old_path_additions.items():
+            if key in environ:
+                environ[key] = remove_paths(environ[key], entries)
+
+    # Load with inheritance
+    result = load_env_tree(current_dir, skip, environ, allowlist)
+    new_vars = result.env_vars
+
+    # Compute new state
+    new_state = compute_env_state(
+        current_dir, result.watched, result.path_additions, result.expires
+    )
+
     # Build old vars dict from current environment
     old_vars = {key: os.environ.get(key, "") for key in old_keys if key in os.environ}
 
     output_lines = []
+    messages = []
+
+    def add_message(message):
+        # With --script-file, messages go to stderr instead of into the script
+        if args.script_file:
+            messages.append(message)
+        else:
+            output_lines.append(format_message(message, shell))
+
+    # Shown once per change: the state stays the same until the file or the allowlist changes
+    for filepath in untrusted:
+        add_message(
+            f"dirdotenv: {filepath} is not allowed, run 'dirdotenv allow {os.path.dirname(filepath)}' to load it"
+        )
+    # Files sourced by .envrc directives are allowed one by one
+    for filepath in result.untrusted:
+        add_message(f"dirdotenv: {filepath} is not allowed, run 'dirdotenv allow {filepath}' to load it")
 
     # Determine what changed
     loaded_keys = get_loaded_keys(old_vars, new_vars)
     unloaded_keys = get_unloaded_keys(old_vars, new_vars)
 
+    # Path variables the user had before are restored instead of unset
+    restored = {
+        key: environ[key]
+        for key in unloaded_keys
+        if key in old_path_additions and environ.get(key)
+    }
+    export_vars = dict(new_vars, **restored)
+
+    # Bookkeeping variables to set and unset besides the loaded ones
+    if session is not None:
+        try:
+            session.save(":".join(sorted(new_vars.keys())), new_state)
+        except OSError as e:
+            print(f"dirdotenv: could not save session: {e}", file=sys.stderr)
+            return 1
+        from dirdotenv.session import SESSION_VAR
+
+        state_vars = {SESSION_VAR: session.session_id} if session.is_new else {}
+        # Switching from exported bookkeeping: drop the old variables
+        state_unset = {
+            key for key in ["_DIRDOTENV_KEYS", "_DIRDOTENV_STATE"] if key in os.environ
+        }
+    else:
+        state_vars = {}
+        state_unset = set()
+        if new_vars:
+            state_vars["_DIRDOTENV_KEYS"] = ":".join(sorted(new_vars.keys()))
+        elif old_keys:
+            state_unset.add("_DIRDOTENV_KEYS")
+        state_vars["_DIRDOTENV_STATE"] = new_state
+
+    if args.data_file:
+        for message in messages:
+            print(message, file=sys.stderr)
+        return write_load_data(export_vars, state_vars, state_unset, loaded_keys, unloaded_keys)
+
     # Unset variables that should be removed
     if unloaded_keys:
-        output_lines.append(format_unset_commands(unloaded_keys, shell))
+        if unloaded_keys - restored.keys():
+            output_lines.append(format_unset_commands(unloaded_keys - restored.keys(), shell))
         # Format unloaded keys with - prefix like direnv
         unloaded_msg = " ".join(f"-{key}" for key in sorted(unloaded_keys))
-        output_lines.append(format_message(f"dirdotenv: {unloaded_msg}", shell))
+        add_message(f"dirdotenv: {unloaded_msg}")
 
     # Export new/changed variables
-    if new_vars:
-        output_lines.append(format_export_commands(new_vars, shell))
-
-        # Store the keys we're managing
-        all_keys = ":".join(sorted(new_vars.keys()))
-        if shell in ["bash", "zsh"]:
-            output_lines.append(f"export _DIRDOTENV_KEYS='{all_keys}'")
-        elif shell == "fish":
-            output_lines.append(f"set -gx _DIRDOTENV_KEYS '{all_keys}'")
-        elif shell == "powershell":
-            output_lines.append(f"$env:_DIRDOTENV_KEYS = '{all_keys}'")
+    if export_vars:
+        output_lines.append(format_export_commands(export_vars, shell))
 
         # Show what was loaded with + prefix like direnv
         if loaded_keys:
             loaded_msg = " ".join(f"+{key}" for key in sorted(loaded_keys))
-            output_lines.append(format_message(f"dirdotenv: {loaded_msg}", shell))
-    elif old_keys:
-        # Clear the tracking variable if nothing is loaded anymore
+            add_message(f"dirdotenv: {loaded_msg}")
+
+    # Store the keys we're managing and the new state
+    if state_unset:
+        output_lines.append(format_unset_commands(state_unset, shell))
+    output_lines.extend(format_state_commands(state_vars, shell))
+
+    return write_load_output(args, output_lines, messages)
+
+
+def format_state_commands(state_vars, shell):
+    """Format commands setting dirdotenv's bookkeeping variables."""
+    lines = []
+    for key, value in state_vars.items():
         if shell in ["bash", "zsh"]:
-            output_lines.append("unset _DIRDOTENV_KEYS")
+            # Escape single quotes in the state string for shell
+            escaped_value = value.replace("'", "'\\''")
+            lines.append(f"export {key}='{escaped_value}'")
         elif shell == "fish":
-            output_lines.append("set -e _DIRDOTENV_KEYS")
+            escaped_value = value.replace("'", "\\'")
+            lines.append(f"set -gx {key} '{escaped_value}'")
         elif shell == "powershell":
-            output_lines.append(
-                "Remove-Item Env:_DIRDOTENV_KEYS -ErrorAction SilentlyContinue"
-            )
+            escaped_value = value.replace("'", "''")
+            lines.append(f"$env:{key} = '{escaped_value}'")
+    return lines
+
+
+def write_load_output(args, output_lines, messages):
+    """
+    Print the shell code of a load, or write it to a script file and print its path.
 
-    # Store the new state
-    if shell in ["bash", "zsh"]:
-        # Escape single quotes in the state string for shell
-        escaped_state = new_state.replace("'", "'\\''")
-        output_lines.append(f"export _DIRDOTENV_STATE='{escaped_state}'")
-    elif shell == "fish":
-        escaped_state = new_state.replace("'", "\\'")
-        output_lines.append(f"set -gx _DIRDOTENV_STATE '{escaped_state}'")
-    elif shell == "powershell":
-        escaped_state = new_state.replace("'", "''")
-        output_lines.append(f"$env:_DIRDOTENV_STATE = '{escaped_state}'")
+    Returns:
+        Exit code
+    """
+    if args.script_file:
+        extension = {"fish": "fish", "powershell": "ps1"}.get(args.shell, "sh")
+        try:
+            script_path = write_load_file("\n".join(output_lines) + "\n", extension)
+        except OSError as e:
+            print(f"dirdotenv: could not write load script: {e}", file=sys.stderr)
+            return 1
+        for message in messages:
+            print(message, file=sys.stderr)
+        print(script_path)
+        return 0
 
     print("\n".join(output_lines))
     return 0
 
 
+def refresh_state(args, session, state):
+    """
+    Record a state whose files were rewritten without changing the environment.
+
+    Returns:
+        Exit code
+    """
+    if session is not None:
+        try:
+            session.save(session.keys, state)
+        except OSError as e:
+            print(f"dirdotenv: could not save session: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    state_vars = {"_DIRDOTENV_STATE": state}
+    if args.data_file:
+        return write_load_data({}, state_vars, set(), set(), set())
+    return write_load_output(args, format_state_commands(state_vars, args.shell), [])
+
+
+def write_load_data(new_vars, state_vars, state_unset, loaded_keys, unloaded_keys):
+    """
+    Write the changes of a load as data for the fish and PowerShell hooks.
+
+    The file holds NUL-terminated records: "KEY=VALUE" to set a variable,
+    "KEY" to unset it. Hooks apply them in a single loop with shell builtins,
+    which is much faster than parsing one generated command per variable.
+    Messages are printed to stderr and the path of the file to stdout.
+
+    Returns:
+        Exit code
+    """
+    records = sorted(unloaded_keys - new_vars.keys()) + sorted(state_unset)
+    records += [f"{key}={value}" for key, value in new_vars.items()]
+    records += [f"{key}={value}" for key, value in state_vars.items()]
+
+    try:
+        data_path = write_load_file("".join(f"{record}\0" for record in records), "data")
+    except OSError as e:
+        print(f"dirdotenv: could not write load data: {e}", file=sys.stderr)
+        return 1
+
+    if unloaded_keys:
+        unloaded_msg = " ".join(f"-{key}" for key in sorted(unloaded_keys))
+        print(f"dirdotenv: {unloaded_msg}", file=sys.stderr)
+    if loaded_keys:
+        loaded_msg = " ".join(f"+{key}" for key in sorted(loaded_keys))
+        print(f"dirdotenv: {loaded_msg}", file=sys.stderr)
+    print(data_path)
+    return 0
+
+
+def write_load_file(content, extension):
+    """
+    Write a load script or data file to the runtime directory for the calling shell.
+
+    Each shell (identified by the parent process) reuses one file per
+    extension, which is replaced atomically. The hooks remove the file once
+    they applied it, since it can hold secrets; files left behind by shells
+    that have exited are removed here.
+
+    Args:
+        content: File content
+        extension: File extension
+
+    Returns:
+        Path of the file
+    """
+    from dirdotenv.paths import ensure_private_dir, get_runtime_dir, write_file_atomic
+    from dirdotenv.session import cleanup_stale_load_files
+
+    runtime_dir = ensure_private_dir(get_runtime_dir())
+    path = os.path.join(runtime_dir, f"load-{os.getppid()}.{extension}")
+    write_file_atomic(path, content.encode("utf-8"))
+    cleanup_stale_load_files(runtime_dir, keep=path)
+    return path
+
+
+def format_command(args):
+    """Handle --format: print environments for tools instead of shell code."""
+    from dirdotenv.formats import MULTI_DIRECTORY_FORMATS, write_env
+
+    if args.directory != "-":
+        env_vars = load_env(args.directory)
+        directory = os.path.abspath(args.directory)
+        write_env(env_vars, args.format, sys.stdout, directory=directory)
+        return 0
+
+    if args.format not in MULTI_DIRECTORY_FORMATS:
+        print(
+            f"dirdotenv: reading directories from stdin requires --format "
+            f"{' or '.join(MULTI_DIRECTORY_FORMATS)}",
+            file=sys.stderr,
+        )
+        return 1
+
+    from dirdotenv.cache import EnvCache
+
+    # Stream one record per directory as it is resolved
+    cache = EnvCache()
+    for line in sys.stdin:
+        directory = line.rstrip("\n")
+        if not directory:
+            continue
+        env_vars = cache.load_env(directory)
+        write_env(env_vars, args.format, sys.stdout, directory=os.path.abspath(directory))
+    return 0
+
+
+def check_command(args):
+    """Handle the check command: validate env files and report diagnostics."""
+    from dirdotenv.check import check_paths
+
+    diagnostics, file_count = check_paths(args.paths, jobs=args.jobs)
+
+    errors = sum(1 for d in diagnostics if d.severity == "error")
+    warnings = len(diagnostics) - errors
+
+    for diagnostic in diagnostics:
+        print(diagnostic.format())
+
+    print(
+        f"dirdotenv: checked {file_count} files, {errors} errors, {warnings} warnings",
+        file=sys.stderr,
+    )
+
+    if errors or (args.strict and warnings):
+        return 1
+    return 0
+
+
+def where_command(args):
+    """Handle the where command: show every definition of the given keys."""
+    from dirdotenv.index import KeyIndex, winning_definition
+
+    index = KeyIndex(args.root)
+    if not args.no_index:
+        index.load()
+    index.refresh(jobs=args.jobs)
+    if not args.no_index and index.dirty:
+        try:
+            index.save()
+        except OSError as e:
+            print(f"dirdotenv: could not save index: {e}", file=sys.stderr)
+
+    directory = os.path.abspath(args.dir)
+    missing = 0
+
+    for key in args.keys:
+        definitions = index.definitions(key)
+        winner = winning_definition(key, directory, index)
+        if winner and winner not in definitions:
+            # Defined above the indexed root
+            definitions.insert(0, winner)
+
+        if not definitions:
+            print(f"{key}: not defined")
+            missing += 1
+            continue
+
+        print(f"{key}:")
+        for filepath, line in definitions:
+            marker = "*" if (filepath, line) == winner else " "
+            print(f"{marker} {filepath}:{line}")
+
+    print(f"dirdotenv: * marks the definition used in {directory}", file=sys.stderr)
+    return 1 if missing else 0
+
+
+def _trust_targets(path):
+    """Resolve an allow/deny/status argument to env files: a file, or the env files of a directory."""
+    from dirdotenv.profiles import get_file_names, scan_env_files
+
+    path = os.path.abspath(path)
+    if not os.path.isdir(path):
+        return [path]
+    return [entry.path for entry in scan_env_files(path, get_file_names())]
+
+
+def allow_command(args):
+    """Handle the allow and deny commands: record env files in the allowlist."""
+    from dirdotenv.trust import Allowlist
+
+    targets = _trust_targets(args.path)
+    if not targets:
+        print(f"dirdotenv: no .env or .envrc file in {args.path}", file=sys.stderr)
+        return 1
+
+    allowlist = Allowlist()
+    for filepath in targets:
+        try:
+            if args.command == "allow":
+                allowlist.allow(filepath)
+            else:
+                allowlist.deny(filepath)
+        except OSError as e:
+            print(f"dirdotenv: could not {args.command} {filepath}: {e}", file=sys.stderr)
+            return 1
+        print(f"dirdotenv: {args.command} {filepath}", file=sys.stderr)
+    return 0
+
+
+def status_command(args):
+    """Handle the status command: show the trust status of the env files for a directory."""
+    from dirdotenv.loader import stat_env_files
+    from dirdotenv.trust import UNTRUSTED, Allowlist, REQUIRE_ALLOW_VAR, trust_required
+
+    path = os.path.abspath(args.path)
+    if os.path.isdir(path):
+        files = stat_env_files(path)
+    else:
+        files = [(path, None)]
+
+    allowlist = Allowlist()
+    for filepath, st in files:
+        try:
+            status = allowlist.status(filepath, st)
+        except OSError:
+            status = UNTRUSTED
+        print(f"{status:<10} {filepath}")
+
+    if not trust_required():
+        print(
+            f"dirdotenv: {REQUIRE_ALLOW_VAR} is not set, the hooks load all files",
+            file=sys.stderr,
+        )
+    return 0
+
+
+def bake_command(args):
+    """Handle the bake command: write the resolved environment of a directory to an artifact."""
+    from dirdotenv.bake import bake, dumps, write_bake
+
+    if args.output == "-":
+        print(dumps(bake(args.directory)))
+        return 0
+
+    baked = write_bake(args.directory, args.output)
+    existing = sum(1 for _, fingerprint in baked.files if fingerprint is not None)
+    print(
+        f"dirdotenv: baked {len(baked.env_vars)} variables from {existing} files into {args.output}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _load_from_bake(path, strict=False):
+    """
+    Load the environment of a bake artifact for --from-bake.
+
+    Returns:
+        Tuple of (env_vars dict, baked directory), or None if the artifact cannot
+        be read, or is out of date and loading from the env files gives nothing
+    """
+    from dirdotenv.bake import is_fresh, read_bake
+
+    try:
+        baked = read_bake(path)
+    except (OSError, ValueError) as e:
+        print(f"dirdotenv: cannot load {path}: {e}", file=sys.stderr)
+        return None
+    if is_fresh(baked, strict):
+        return baked.env_vars, baked.directory
+
+    print(f"dirdotenv: {path} is out of date, loading from the env files", file=sys.stderr)
+    env_vars, _ = load_env_with_inheritance(baked.directory)
+    if not env_vars and baked.env_vars:
+        print(f"dirdotenv: no variables found in the env files of {baked.directory}", file=sys.stderr)
+        return None
+    return env_vars, baked.directory
+
+
+def exec_many_command(args):
+    """Handle the exec-many command: run a command in every directory read from stdin."""
+    from dirdotenv.runner import run_many
+
+    command = args.exec_command
+    if command and command[0] == "--":
+        command = command[1:]
+    if not command:
+        print("exec-many: no command given", file=sys.stderr)
+        return 2
+
+    directories = []
+    seen = set()
+    for line in sys.stdin:
+        directory = line.strip()
+        if directory and directory not in seen:
+            seen.add(directory)
+            directories.append(directory)
+
+    results = run_many(directories, command, jobs=args.jobs)
+
+    failed = [r for r in results if r.returncode != 0]
+    width = max((len(r.directory) for r in results), default=0)
+    for result in results:
+        status = "ok" if result.returncode == 0 else f"exit {result.returncode}"
+        print(
+            f"{result.directory:<{width}}  {status:<8}  {result.duration:.2f}s",
+            file=sys.stderr,
+        )
+    print(
+        f"dirdotenv: {len(results) - len(failed)} succeeded, {len(failed)} failed",
+        file=sys.stderr,
+    )
+
+    return 1 if failed else 0
+
+
 def main():
     """Main entry point for the dirdotenv CLI."""
     parser = argparse.ArgumentParser(
@@ -136,11 +598,37 @@ Examples:
   
   # Execute command with loaded variables
   dirdotenv --exec python script.py
+
+  # Restart the command when .env/.envrc change
+  dirdotenv --watch --exec python server.py
   
   # Setup shell integration (automatic loading on cd)
   eval "$(dirdotenv hook bash)"     # for bash
   eval "$(dirdotenv hook zsh)"      # for zsh
   dirdotenv hook fish | source      # for fish
+  execx($(dirdotenv hook xonsh))    # for xonsh
+
+  # Or pre-render the hook once and source the printed file (faster startup)
+  dirdotenv hook bash --install
+
+  # Validate all env files in a repository
+  dirdotenv check .
+
+  # Print variables as JSON (or ndjson, env0, dotenv, systemd) for other tools
+  dirdotenv --format json
+
+  # Find which files define a variable
+  dirdotenv where DATABASE_URL
+
+  # Run a command in many directories with their own environments
+  ls -d packages/* | dirdotenv exec-many --jobs 8 -- make test
+
+  # Only let the hooks load files you approved (export DIRDOTENV_REQUIRE_ALLOW=1)
+  dirdotenv allow .
+
+  # Resolve the environment once (e.g. in a container build) and use it later
+  dirdotenv bake . -o env.bake
+  dirdotenv --from-bake env.bake --exec python server.py
   
 For more information, see: https://github.com/alexeygrigorev/dirdotenv
         """,
@@ -155,7 +643,7 @@ For more information, see: https://github.com/alexeygrigorev/dirdotenv
     )
 
     # Check if first argument is a known subcommand
-    if len(sys.argv) > 1 and sys.argv[1] in ["hook", "load"]:
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
         subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
         # Hook subcommand
@@ -166,14 +654,33 @@ For more information, see: https://github.com/alexeygrigorev/dirdotenv
         )
         hook_parser.add_argument(
             "shell",
-            choices=["bash", "zsh", "fish", "powershell"],
-            help="Shell to generate hook for (bash, zsh, fish, or powershell)",
+            choices=["bash", "zsh", "fish", "powershell", "xonsh"],
+            help="Shell to generate hook for (bash, zsh, fish, powershell, or xonsh)",
         )
         hook_parser.add_argument(
             "--cmd",
             default=None,
             help="Explicitly specify the dirdotenv command to use in the hook (overrides detection)",
         )
+        hook_parser.add_argument(
+            "--install",
+            nargs="?",
+            const="",
+            default=None,
+            metavar="PATH",
+            help="Write the hook to a file (default: in the dirdotenv data directory) that can be sourced without running dirdotenv at startup, and print its path",
+        )
+        hook_parser.add_argument(
+            "--async",
+            dest="background",
+            action="store_true",
+            help="Load in the background so the prompt is never blocked (zsh and fish)",
+        )
+        hook_parser.add_argument(
+            "--session-state",
+            action="store_true",
+            help="Keep bookkeeping in a per-session file instead of exported variables",
+        )
 
         # Load subcommand (used internally by hooks)
         load_parser = subparsers.add_parser(
@@ -185,19 +692,203 @@ For more information, see: https://github.com/alexeygrigorev/dirdotenv
             default="bash",
             help="Shell format for export commands",
         )
+        load_parser.add_argument(
+            "--script-file",
+            action="store_true",
+            help="Write the script to a file in the runtime directory and print its path (messages go to stderr)",
+        )
+        load_parser.add_argument(
+            "--data-file",
+            action="store_true",
+            help="Write NUL-separated KEY=VALUE (set) and KEY (unset) records to a file in the runtime directory and print its path (messages go to stderr)",
+        )
+        load_parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            default=None,
+            help="Print the inherited environment in a machine-readable format instead of shell code",
+        )
+        load_parser.add_argument(
+            "--session",
+            type=int,
+            default=None,
+            metavar="PID",
+            help="Keep managed keys and state in a session file owned by the shell with this PID, exporting only a session id",
+        )
+
+        # Check subcommand
+        check_parser = subparsers.add_parser(
+            "check",
+            help="Validate .env and .envrc files in a directory tree",
+            description="Find every .env and .envrc file under the given paths and report unparseable lines, duplicate keys, unbalanced quotes and keys shadowed by parent directories.",
+        )
+        check_parser.add_argument(
+            "paths",
+            nargs="*",
+            default=["."],
+            help="Directories to search or files to check (default: current directory)",
+        )
+        check_parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=None,
+            help="Number of worker processes (default: number of CPUs)",
+        )
+        check_parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Exit with an error when there are warnings (e.g. shadowed keys)",
+        )
+
+        # Where subcommand
+        where_parser = subparsers.add_parser(
+            "where",
+            help="Show which files define the given variables",
+            description="Find every definition of the given keys in .env and .envrc files under a tree and mark the one that wins for a directory.",
+        )
+        where_parser.add_argument("keys", nargs="+", metavar="KEY", help="Variable names")
+        where_parser.add_argument(
+            "--root",
+            default=".",
+            help="Directory tree to search (default: current directory)",
+        )
+        where_parser.add_argument(
+            "--dir",
+            default=".",
+            help="Directory whose inherited environment decides the winner (default: current directory)",
+        )
+        where_parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=None,
+            help="Number of worker processes for scanning changed files (default: number of CPUs)",
+        )
+        where_parser.add_argument(
+            "--no-index",
+            action="store_true",
+            help="Scan the whole tree without reading or writing the persistent index",
+        )
+
+        # Exec-many subcommand
+        exec_many_parser = subparsers.add_parser(
+            "exec-many",
+            help="Run a command in many directories, each with its own environment",
+            description="Read directories from stdin (one per line) and run the command in each of them with its inherited environment. Output is prefixed with the directory.",
+        )
+        exec_many_parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=None,
+            help="Maximum number of commands running at once (default: number of CPUs)",
+        )
+        exec_many_parser.add_argument(
+            "exec_command",
+            nargs=argparse.REMAINDER,
+            metavar="-- command",
+            help="Command to run in each directory",
+        )
+
+        # Bake subcommand
+        bake_parser = subparsers.add_parser(
+            "bake",
+            help="Write the resolved environment of a directory to an artifact",
+            description="Resolve the inherited environment of a directory and write it, with a fingerprint of every file it depends on, to an artifact that --from-bake loads without reading the env files.",
+        )
+        bake_parser.add_argument(
+            "directory",
+            nargs="?",
+            default=".",
+            help="Directory to resolve (default: current directory)",
+        )
+        bake_parser.add_argument(
+            "-o",
+            "--output",
+            default="-",
+            help="Artifact path (default: standard output)",
+        )
+
+        # Allow, deny and status subcommands
+        for name, help_text in [
+            ("allow", "Allow the hooks to load the env files of a directory with their current content"),
+            ("deny", "Never load the env files of a directory from the hooks"),
+            ("status", "Show whether the hooks may load the env files of a directory and its parents"),
+        ]:
+            trust_parser = subparsers.add_parser(
+                name,
+                help=help_text,
+                description=f"{help_text}. Only enforced when DIRDOTENV_REQUIRE_ALLOW is set.",
+            )
+            trust_parser.add_argument(
+                "path",
+                nargs="?",
+                default=".",
+                help="Directory or env file (default: current directory)",
+            )
 
         args = parser.parse_args()
 
         # Handle hook command
         if args.command == "hook":
+            if args.background and args.shell not in ["zsh", "fish"]:
+                print(f"hook: --async is not supported for {args.shell}", file=sys.stderr)
+                return 1
+            if args.background and args.session_state:
+                print("hook: --async cannot be combined with --session-state", file=sys.stderr)
+                return 1
             cmd = args.cmd or get_invocation_command()
-            print(get_hook(args.shell, cmd))
+            # An explicit --cmd is used as given
+            python = None if args.cmd else get_direct_python()
+            if args.install is not None:
+                from dirdotenv.hooks import install_hook
+
+                hook_path = install_hook(
+                    args.shell,
+                    cmd,
+                    args.install or None,
+                    python,
+                    args.background,
+                    args.session_state,
+                )
+                print(hook_path)
+                if not args.install:
+                    # Regeneration from an installed hook passes the path: stay quiet
+                    print(
+                        f"Add to your shell startup file: {_source_line(args.shell, hook_path)}",
+                        file=sys.stderr,
+                    )
+                return 0
+            print(get_hook(args.shell, cmd, python, args.background, args.session_state))
             return 0
 
         # Handle load command
         if args.command == "load":
             return load_command(args)
 
+        # Handle check command
+        if args.command == "check":
+            return check_command(args)
+
+        # Handle where command
+        if args.command == "where":
+            return where_command(args)
+
+        # Handle exec-many command
+        if args.command == "exec-many":
+            return exec_many_command(args)
+
+        # Handle allow, deny and status commands
+        if args.command in ["allow", "deny"]:
+            return allow_command(args)
+        if args.command == "status":
+            return status_command(args)
+
+        # Handle bake command
+        if args.command == "bake":
+            return bake_command(args)
+
     # Add arguments for default behavior
     parser.add_argument(
         "directory",
@@ -222,18 +913,85 @@ For more information, see: https://github.com/alexeygrigorev/dirdotenv
         nargs=argparse.REMAINDER,
         help="Execute command with loaded environment variables",
     )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="With --exec: restart the command when the .env/.envrc files change",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=None,
+        help="Print variables in a machine-readable format. With ndjson, a directory of '-' reads directories from stdin, one per line",
+    )
+    parser.add_argument(
+        "--from-bake",
+        default=None,
+        metavar="FILE",
+        help="Use the inherited environment from an artifact written by 'dirdotenv bake' (loaded from the env files if they changed since)",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="With --from-bake: also load from the env files when some of them were removed since baking",
+    )
 
     args = parser.parse_args()
 
+    # --exec takes every argument after it, so also accept --watch right after it
+    if args.exec_command and args.exec_command[0] == "--watch":
+        args.watch = True
+        args.exec_command = args.exec_command[1:]
+
+    if args.watch and not args.exec_command:
+        parser.error("--watch requires --exec")
+
+    if args.format and args.exec_command:
+        parser.error("--format cannot be used with --exec")
+
+    if args.strict and not args.from_bake:
+        parser.error("--strict requires --from-bake")
+
+    if args.from_bake:
+        if args.watch:
+            parser.error("--watch cannot be used with --from-bake")
+        loaded = _load_from_bake(args.from_bake, args.strict)
+        if loaded is None:
+            return 1
+        env_vars, directory = loaded
+        if args.format:
+            from dirdotenv.formats import write_env
+
+            write_env(env_vars, args.format, sys.stdout, directory=directory)
+            return 0
+
+    if args.format and not args.from_bake:
+        return format_command(args)
+
+    if args.watch:
+        from dirdotenv.loader import env_file_candidates, load_env_tree
+        from dirdotenv.watch import exec_with_watch
+
+        directory = args.directory
+        return exec_with_watch(
+            args.exec_command,
+            env_file_candidates(directory, inherit=False),
+            lambda: load_env(directory),
+            # Files loaded or watched by .envrc directives
+            watched=lambda: load_env_tree(directory).watched,
+        )
+
     # If no --export and no --exec, show help
     if not args.export and not args.exec_command:
         parser.print_help()
         return 0
 
-    # Load environment variables (single directory, no inheritance)
-    env_vars = load_env(args.directory)
+    if not args.from_bake:
+        # Load environment variables (single directory, no inheritance)
+        env_vars = load_env(args.directory)
 
-    if not env_vars:
+    # An empty baked environment is still an environment to run the command in
+    if not env_vars and not args.from_bake:
         print("No environment variables found in .env or .envrc files", file=sys.stderr)
         return 0
 
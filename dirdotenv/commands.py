@@ -0,0 +1,261 @@
+"""Command substitution in .envrc values, with a persistent result cache.
+
+With DIRDOTENV_ALLOW_COMMANDS set, `$(...)` in unquoted or double-quoted
+.envrc values is replaced by the output of the command, like a shell would,
+but only in files approved with `dirdotenv allow` (see dirdotenv.trust).
+Allowing commands also makes the hooks require approval for every file.
+Results are cached in the cache directory, keyed by the content hash of the
+file and the command, so a command runs once per change of its file and is
+shared by all shells. A comment line right above an export sets how long its
+results stay valid and how long the command may run:
+
+    # dirdotenv: ttl=3600 timeout=5
+    export AWS_ACCOUNT_ID=$(aws sts get-caller-identity --query Account --output text)
+"""
+
+import os
+import re
+import sys
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+from dirdotenv.paths import ensure_private_dir, get_cache_dir, write_file_atomic
+
+ALLOW_COMMANDS_VAR = "DIRDOTENV_ALLOW_COMMANDS"
+
+# Seconds a command may run before it is killed
+DEFAULT_TIMEOUT = 10
+
+# Entries kept in the cache file
+MAX_ENTRIES = 256
+
+# $(command), without nesting
+COMMAND_RE = re.compile(r"\$\(([^()]*)\)")
+
+# "# dirdotenv: ttl=3600 timeout=5" above an export
+OPTIONS_RE = re.compile(r"^#\s*dirdotenv:\s*(.*)$")
+
+
+def commands_allowed() -> bool:
+    """Whether $(...) in .envrc values is executed ($DIRDOTENV_ALLOW_COMMANDS is set)."""
+    return os.environ.get(ALLOW_COMMANDS_VAR, "").lower() not in ("", "0", "false", "no")
+
+
+def parse_options(comment: str) -> Optional[Dict[str, float]]:
+    """
+    Parse a "# dirdotenv: ttl=N timeout=N" comment.
+
+    Returns:
+        Dictionary with the given "ttl" and "timeout" in seconds, or None if
+        the line is not an options comment
+    """
+    match = OPTIONS_RE.match(comment)
+    if not match:
+        return None
+    options = {}
+    for word in match.group(1).split():
+        name, _, value = word.partition("=")
+        if name in ("ttl", "timeout"):
+            try:
+                options[name] = float(value)
+            except ValueError:
+                pass
+    return options
+
+
+class CommandCache:
+    """
+    Command outputs, persisted as a marshal file in the cache directory.
+
+    Outputs may be secrets, so the file is kept in a directory only the
+    current user can access.
+
+    Args:
+        path: Cache file (default: <cache dir>/commands/outputs)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(get_cache_dir(), "commands", "outputs")
+        self._entries = None  # type: Optional[Dict[str, Tuple[float, str]]]
+
+    def _load(self) -> Dict[str, Tuple[float, str]]:
+        if self._entries is None:
+            import marshal
+
+            try:
+                with open(self.path, "rb") as f:
+                    entries = marshal.load(f)
+                self._entries = entries if isinstance(entries, dict) else {}
+            except (OSError, EOFError, ValueError, TypeError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, key: str, ttl: Optional[float] = None) -> Optional[Tuple[float, str]]:
+        """
+        Get a cached output.
+
+        Args:
+            key: Cache key
+            ttl: Maximum age in seconds (None: valid until the file changes)
+
+        Returns:
+            Tuple of (time the command ran, output), or None
+        """
+        entry = self._load().get(key)
+        if entry is None or (ttl is not None and time.time() - entry[0] >= ttl):
+            return None
+        return entry
+
+    def put(self, key: str, output: str) -> None:
+        """Store the output of a command that just ran."""
+        import marshal
+
+        entries = self._load()
+        entries.pop(key, None)
+        entries[key] = (time.time(), output)
+        self._entries = dict(list(entries.items())[-MAX_ENTRIES:])
+        try:
+            ensure_private_dir(os.path.dirname(self.path))
+            write_file_atomic(self.path, marshal.dumps(self._entries))
+        except OSError:
+            # The cache is an optimization only
+            pass
+
+
+# Shared by all .envrc files evaluated in one process
+default_command_cache = None  # type: Optional[CommandCache]
+
+
+def run_command(
+    command: str, cwd: str, env: Mapping[str, str], timeout: float = DEFAULT_TIMEOUT
+) -> Optional[str]:
+    """
+    Run a shell command and return its output without trailing newlines.
+
+    Failures are reported on stderr.
+
+    Returns:
+        Output, or None if the command failed or timed out
+    """
+    import subprocess
+
+    try:
+        # In its own process group, so a timeout also stops the command's children
+        process = subprocess.Popen(
+            command,
+            shell=True,
+            cwd=cwd,
+            env=dict(env),
+            stdout=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            start_new_session=os.name != "nt",
+        )
+    except OSError as e:
+        print(f"dirdotenv: could not run {command}: {e}", file=sys.stderr)
+        return None
+
+    try:
+        stdout, _ = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        if os.name != "nt":
+            import signal
+
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+        process.communicate()
+        print(f"dirdotenv: command timed out after {timeout:g}s: {command}", file=sys.stderr)
+        return None
+
+    if process.returncode != 0:
+        print(f"dirdotenv: command exited with {process.returncode}: {command}", file=sys.stderr)
+        return None
+    return stdout.decode("utf-8", errors="replace").rstrip("\n")
+
+
+def substitute_commands(
+    value: str,
+    filepath: str,
+    env: Mapping[str, str],
+    ttl: Optional[float] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> Tuple[str, Optional[float]]:
+    """
+    Replace every $(command) in a value by the command's (cached) output.
+
+    Commands run in the directory of the file. A failed command is replaced
+    by an empty string and not cached.
+
+    Like in a shell, ${VAR} in command output is not expanded. When an output
+    contains one, the value is returned as a LiteralValue, with the references
+    around the commands resolved right away from env (so they do not see
+    variables inherited from other env files).
+
+    Args:
+        value: Value with the quotes already removed
+        filepath: File the value comes from
+        env: Environment for the commands
+        ttl: How long cached outputs stay valid (None: until the file changes)
+        timeout: Seconds a command may run
+
+    Returns:
+        Tuple of (value, time when the earliest cached output used expires, or None)
+    """
+    global default_command_cache
+    if "$(" not in value:
+        return value, None
+
+    from dirdotenv.filehash import blake2b, file_digest
+
+    if default_command_cache is None:
+        default_command_cache = CommandCache()
+    cache = default_command_cache
+    filepath = os.path.abspath(filepath)
+    digest = file_digest(filepath)
+    expires = []
+
+    def replace(match):
+        command = match.group(1).strip()
+        key = blake2b(
+            f"{filepath}\0{digest}\0{command}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        entry = cache.get(key, ttl)
+        if entry is None:
+            output = run_command(command, os.path.dirname(filepath), env, timeout)
+            if output is None:
+                return ""
+            cache.put(key, output)
+            entry = cache.get(key)
+        if ttl is not None:
+            expires.append(entry[0] + ttl)
+        return entry[1]
+
+    # Alternating text around the commands and command outputs
+    pieces = []
+    position = 0
+    for match in COMMAND_RE.finditer(value):
+        pieces.append(value[position:match.start()])
+        pieces.append(replace(match))
+        position = match.end()
+    pieces.append(value[position:])
+    expires_at = min(expires) if expires else None
+
+    if not any("${" in output for output in pieces[1::2]):
+        return "".join(pieces), expires_at
+
+    from dirdotenv.interpolate import LiteralValue, interpolate_layers
+
+    for index in range(0, len(pieces), 2):
+        if "${" in pieces[index]:
+            pieces[index] = interpolate_layers([{"": pieces[index]}], env)[""]
+    return LiteralValue("".join(pieces)), expires_at
+
+
+__all__ = [
+    "ALLOW_COMMANDS_VAR",
+    "CommandCache",
+    "commands_allowed",
+    "parse_options",
+    "run_command",
+    "substitute_commands",
+]
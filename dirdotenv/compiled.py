@@ -0,0 +1,133 @@
+"""Compiled sidecars of large env files in the cache directory.
+
+Parsing a file with tens of thousands of lines takes longer than loading a
+prebuilt table, so files of at least MIN_SIZE bytes are stored after parsing
+as marshal-encoded key and value tables, keyed by the file path and
+validated by (device, inode, size, mtime). Every sidecar starts with a
+header holding the format and marshal versions; a sidecar with another
+header, or for another version of the file, is rebuilt by the next parse.
+
+.envrc files are only compiled when they consist of plain exports: the
+result of directives and $(...) depends on more than the file itself.
+Set DIRDOTENV_COMPILED_CACHE=0 to disable sidecars.
+"""
+
+import marshal
+import os
+import time
+from typing import Dict, Optional
+
+from dirdotenv.filehash import RACY_WINDOW_NS, blake2b
+from dirdotenv.interpolate import LiteralValue
+from dirdotenv.paths import ensure_private_dir, get_cache_dir, write_file_atomic
+
+COMPILED_CACHE_VAR = "DIRDOTENV_COMPILED_CACHE"
+
+# Smaller files are parsed faster than a sidecar is read
+MIN_SIZE = 64 * 1024
+
+FORMAT_VERSION = 1
+HEADER = b"DDENVC" + bytes([FORMAT_VERSION, marshal.version])
+
+
+def compiled_enabled(size: int) -> bool:
+    """Whether a file of this size is loaded through a sidecar."""
+    if size < MIN_SIZE:
+        return False
+    return os.environ.get(COMPILED_CACHE_VAR, "").lower() not in ("0", "false", "no", "off")
+
+
+class CompiledCache:
+    """
+    Sidecars of parsed env files, one file each.
+
+    Values may be secrets, so sidecars are kept in a directory only the
+    current user can access.
+
+    Args:
+        directory: Sidecar directory (default: <cache dir>/compiled)
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(get_cache_dir(), "compiled")
+
+    def _path(self, filepath: str, kind: str) -> str:
+        key = blake2b(os.fsencode(os.path.abspath(filepath)), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{key}.{kind}")
+
+    def load(self, filepath: str, kind: str, st: os.stat_result) -> Optional[Dict[str, str]]:
+        """
+        Get the parsed variables of a file from its sidecar.
+
+        Args:
+            filepath: Env file
+            kind: "env" or "envrc"
+            st: Current stat of the file
+
+        Returns:
+            Dictionary of variables, or None if there is no valid sidecar for
+            this version of the file
+        """
+        try:
+            with open(self._path(filepath, kind), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if not data.startswith(HEADER):
+            return None
+
+        try:
+            identity, keys, values, literal = marshal.loads(data[len(HEADER):])
+        except (EOFError, ValueError, TypeError):
+            return None
+        if identity != (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns):
+            return None
+
+        env_vars = dict(zip(keys, values))
+        for key in literal:
+            env_vars[key] = LiteralValue(env_vars[key])
+        return env_vars
+
+    def store(self, filepath: str, kind: str, st: os.stat_result, env_vars: Dict[str, str]) -> None:
+        """
+        Write the sidecar of a file that was just parsed.
+
+        Files modified within the last RACY_WINDOW_NS are skipped: they may
+        change again without a new mtime.
+        """
+        if time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS:
+            return
+
+        payload = (
+            (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns),
+            tuple(env_vars),
+            tuple(str(value) for value in env_vars.values()),
+            tuple(key for key, value in env_vars.items() if isinstance(value, LiteralValue)),
+        )
+        try:
+            ensure_private_dir(self.directory)
+            write_file_atomic(self._path(filepath, kind), HEADER + marshal.dumps(payload))
+        except OSError:
+            # The sidecar is an optimization only
+            pass
+
+
+# Shared by all parses in one process
+default_compiled_cache = None  # type: Optional[CompiledCache]
+
+
+def get_compiled_cache() -> CompiledCache:
+    """Get the shared CompiledCache, created on first use."""
+    global default_compiled_cache
+    if default_compiled_cache is None:
+        default_compiled_cache = CompiledCache()
+    return default_compiled_cache
+
+
+__all__ = [
+    "COMPILED_CACHE_VAR",
+    "CompiledCache",
+    "MIN_SIZE",
+    "compiled_enabled",
+    "get_compiled_cache",
+]
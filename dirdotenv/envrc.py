@@ -0,0 +1,337 @@
+"""Native evaluation of the direnv stdlib directives commonly used in .envrc files.
+
+Supported, besides `export KEY=value`:
+
+- dotenv [PATH], dotenv_if_exists [PATH]: load a .env file (default: .env)
+- source_env PATH, source_env_if_exists PATH: evaluate another .envrc (or
+  the .envrc of a directory)
+- source_up [NAME]: evaluate the nearest NAME (default: .envrc) above the
+  file's directory
+- PATH_add DIR..., path_add VAR DIR...: prepend directories to PATH or VAR,
+  removing duplicates
+- watch_file PATH...: reload when the given files change
+
+Relative paths are resolved against the directory of the .envrc file, like
+direnv does. Files that are read or watched are reported, so the hooks can
+reload when they change. Other lines are ignored, as before. When the hooks
+require allowed files, sourced files must be allowed too.
+
+`$(...)` in values is only executed when enabled and the file is allowed,
+see dirdotenv.commands.
+"""
+
+import os
+import stat
+import sys
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from dirdotenv.commands import (
+    DEFAULT_TIMEOUT,
+    commands_allowed,
+    parse_options,
+    substitute_commands,
+)
+from dirdotenv.compiled import compiled_enabled, get_compiled_cache
+from dirdotenv.interpolate import literal_or_str
+from dirdotenv.parser import ENVRC_LINE_RE, parse_env_file, strip_quotes
+
+DIRECTIVES = frozenset(
+    [
+        "dotenv",
+        "dotenv_if_exists",
+        "source_env",
+        "source_env_if_exists",
+        "source_up",
+        "PATH_add",
+        "path_add",
+        "watch_file",
+    ]
+)
+
+
+class EnvrcResult(NamedTuple):
+    """
+    Result of evaluating a .envrc file.
+
+    Attributes:
+        env_vars: Variables set by the file
+        watched: Other files the result depends on (they need not exist)
+        path_additions: Directories prepended to each path-like variable
+        expires: Time when a cached command output used expires (None: never)
+        untrusted: Sourced files that were not loaded because they are not
+            allowed (only with require_allow; denied files are not listed)
+        self_contained: Whether the variables only depend on the file's own
+            content (no directives or commands), so they can be cached by it
+    """
+
+    env_vars: Dict[str, str]
+    watched: List[str]
+    path_additions: Dict[str, List[str]]
+    expires: Optional[float] = None
+    untrusted: Tuple[str, ...] = ()
+    self_contained: bool = True
+
+
+def prepend_paths(value: Optional[str], entries: List[str]) -> str:
+    """
+    Prepend directories to a path list, removing their existing occurrences.
+
+    Args:
+        value: Current value (os.pathsep-separated), or None
+        entries: Directories to put first, in order
+
+    Returns:
+        New value
+    """
+    rest = [part for part in value.split(os.pathsep) if part not in entries] if value else []
+    return os.pathsep.join(entries + rest)
+
+
+def remove_paths(value: str, entries: List[str]) -> str:
+    """Remove directories from a path list."""
+    return os.pathsep.join(part for part in value.split(os.pathsep) if part not in entries)
+
+
+class _Evaluator:
+    def __init__(self, environ: Mapping[str, str], allowlist=None, require_allow: bool = False):
+        self.environ = environ
+        self.allowlist = allowlist
+        self.require_allow = require_allow
+        self.env_vars = {}  # type: Dict[str, str]
+        self.watched = []  # type: List[str]
+        self.path_additions = {}  # type: Dict[str, List[str]]
+        self.expires = None  # type: Optional[float]
+        self.untrusted = []  # type: List[str]
+        self.self_contained = True
+        self.run_commands = commands_allowed()
+        self._active = set()
+        # filepath -> trust status
+        self._status = {}  # type: Dict[str, str]
+        self._refused = set()
+
+    def lookup(self, key: str) -> Optional[str]:
+        if key in self.env_vars:
+            return self.env_vars[key]
+        return self.environ.get(key)
+
+    def status(self, filepath: str) -> str:
+        """Get the trust status of a file (see dirdotenv.trust)."""
+        if filepath not in self._status:
+            from dirdotenv.trust import UNTRUSTED, Allowlist
+
+            if self.allowlist is None:
+                self.allowlist = Allowlist()
+            try:
+                self._status[filepath] = self.allowlist.status(filepath)
+            except OSError:
+                self._status[filepath] = UNTRUSTED
+        return self._status[filepath]
+
+    def allowed(self, filepath: str) -> bool:
+        """Whether a file is in the allowlist with its current content."""
+        from dirdotenv.trust import ALLOWED
+
+        return self.status(filepath) == ALLOWED
+
+    def may_source(self, filepath: str) -> bool:
+        """Whether a file sourced by a directive may be loaded."""
+        if not self.require_allow or self.allowed(filepath):
+            return True
+        from dirdotenv.trust import UNTRUSTED
+
+        if self.status(filepath) == UNTRUSTED and filepath not in self.untrusted:
+            self.untrusted.append(filepath)
+        return False
+
+    def may_run_commands(self, filepath: str) -> bool:
+        """Whether commands in a file may run: a cloned repository must not run code without approval."""
+        if self.allowed(filepath):
+            return True
+        if filepath not in self._refused:
+            self._refused.add(filepath)
+            print(
+                f"dirdotenv: not running commands in {filepath}, run 'dirdotenv allow {filepath}' first",
+                file=sys.stderr,
+            )
+        return False
+
+    def watch(self, filepath: str) -> None:
+        if filepath not in self.watched:
+            self.watched.append(filepath)
+
+    def add_paths(self, key: str, base_dir: str, paths: List[str]) -> None:
+        entries = []
+        for path in paths:
+            entry = os.path.normpath(os.path.join(base_dir, path))
+            if entry not in entries:
+                entries.append(entry)
+        if not entries:
+            return
+        self.env_vars[key] = prepend_paths(self.lookup(key), entries)
+        added = self.path_additions.setdefault(key, [])
+        added.extend(entry for entry in entries if entry not in added)
+
+    def evaluate(self, filepath: str, sourced: bool = False) -> None:
+        filepath = os.path.abspath(filepath)
+        if filepath in self._active:
+            # Sourcing itself
+            return
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return
+        if not stat.S_ISREG(st.st_mode):
+            return
+        if sourced and not self.may_source(filepath):
+            return
+
+        # Exports of a file without directives or commands, for its sidecar
+        exports = None
+        if compiled_enabled(st.st_size):
+            cached = get_compiled_cache().load(filepath, "envrc", st)
+            if cached is not None:
+                self.env_vars.update(cached)
+                return
+            exports = {}
+
+        self._active.add(filepath)
+        base_dir = os.path.dirname(filepath)
+
+        options = None
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+
+                    # Skip empty lines and comments
+                    if not line:
+                        continue
+                    if line.startswith("#"):
+                        if self.run_commands and "dirdotenv:" in line:
+                            options = parse_options(line)
+                        continue
+
+                    match = ENVRC_LINE_RE.match(line)
+                    if match:
+                        key = match.group(1)
+                        self.export(filepath, key, match.group(2), options or {})
+                        if exports is not None:
+                            exports[key] = self.env_vars[key]
+                            if "$(" in match.group(2):
+                                exports = None
+                    elif line.split(None, 1)[0] in DIRECTIVES:
+                        exports = None
+                        self.directive(line, base_dir)
+                    options = None
+        finally:
+            self._active.discard(filepath)
+
+        if exports is not None:
+            get_compiled_cache().store(filepath, "envrc", st, exports)
+
+    def export(self, filepath: str, key: str, raw_value: str, options: Dict[str, float]) -> None:
+        value = literal_or_str(raw_value, strip_quotes(raw_value))
+        if "$(" in value and not raw_value.startswith("'"):
+            # The value depends on the command settings, trust and output
+            self.self_contained = False
+        # Like a shell, single quotes keep $(...) literal
+        if (
+            self.run_commands
+            and "$(" in value
+            and not raw_value.startswith("'")
+            and self.may_run_commands(filepath)
+        ):
+            env = dict(self.environ)
+            env.update(self.env_vars)
+            value, expires = substitute_commands(
+                value,
+                filepath,
+                env,
+                ttl=options.get("ttl"),
+                timeout=options.get("timeout", DEFAULT_TIMEOUT),
+            )
+            if expires is not None and (self.expires is None or expires < self.expires):
+                self.expires = expires
+        self.env_vars[key] = value
+
+    def directive(self, line: str, base_dir: str) -> None:
+        import shlex
+
+        self.self_contained = False
+
+        try:
+            words = shlex.split(line, comments=True)
+        except ValueError:
+            # Unbalanced quotes
+            return
+        name, args = words[0], words[1:]
+
+        if name in ("dotenv", "dotenv_if_exists"):
+            target = os.path.normpath(os.path.join(base_dir, args[0] if args else ".env"))
+            self.watch(target)
+            if os.path.isfile(target) and self.may_source(target):
+                self.env_vars.update(parse_env_file(target))
+        elif name in ("source_env", "source_env_if_exists"):
+            if not args:
+                return
+            target = os.path.join(base_dir, args[0])
+            if os.path.isdir(target):
+                target = os.path.join(target, ".envrc")
+            self.watch(os.path.abspath(target))
+            self.evaluate(target, sourced=True)
+        elif name == "source_up":
+            filename = args[0] if args else ".envrc"
+            directory = base_dir
+            while True:
+                parent = os.path.dirname(directory)
+                if parent == directory:  # Reached root
+                    return
+                directory = parent
+                target = os.path.join(directory, filename)
+                if os.path.isfile(target):
+                    self.watch(target)
+                    self.evaluate(target, sourced=True)
+                    return
+        elif name == "PATH_add":
+            self.add_paths("PATH", base_dir, args)
+        elif name == "path_add":
+            if args:
+                self.add_paths(args[0], base_dir, args[1:])
+        elif name == "watch_file":
+            for path in args:
+                self.watch(os.path.normpath(os.path.join(base_dir, path)))
+
+
+def evaluate_envrc(
+    filepath: str,
+    environ: Optional[Mapping[str, str]] = None,
+    allowlist=None,
+    require_allow: bool = False,
+) -> EnvrcResult:
+    """
+    Evaluate a .envrc file without running a shell.
+
+    Args:
+        filepath: Path to the .envrc file
+        environ: Values that path_add/PATH_add build on (default: os.environ)
+        allowlist: Allowlist deciding which files may run commands and, with
+            require_allow, be sourced (default: the user's allowlist)
+        require_allow: Only load files sourced by dotenv, source_env and
+            source_up if they are allowed (the file itself is not checked)
+
+    Returns:
+        EnvrcResult with the variables, the watched files and the path additions
+    """
+    evaluator = _Evaluator(os.environ if environ is None else environ, allowlist, require_allow)
+    evaluator.evaluate(filepath)
+    return EnvrcResult(
+        evaluator.env_vars,
+        evaluator.watched,
+        evaluator.path_additions,
+        evaluator.expires,
+        tuple(evaluator.untrusted),
+        evaluator.self_contained,
+    )
+
+
+__all__ = ["DIRECTIVES", "EnvrcResult", "evaluate_envrc", "prepend_paths", "remove_paths"]
@@ -0,0 +1,151 @@
+"""Content hashes of env files, cached by inode.
+
+Change detection uses mtime and size as a fast gate and the content hash as
+the authority: a file rewritten with identical content (git checkout, touch,
+editors that save unchanged buffers) keeps its hash, so it does not cause a
+reload. Hashes are cached by (device, inode, size, mtime) in the cache
+directory, so a file is read at most once per change.
+"""
+
+import os
+import time
+from hashlib import blake2b
+from typing import Dict, Optional, Tuple
+
+from dirdotenv.paths import get_cache_dir, write_file_atomic
+
+DIGEST_SIZE = 8
+
+# Entries kept in the cache file when it is compacted
+MAX_ENTRIES = 512
+
+# A file modified this recently may change again within the same mtime tick,
+# so its hash is not cached
+RACY_WINDOW_NS = 2 * 10**9
+
+
+def hash_file(filepath: str) -> str:
+    """
+    Compute the content hash of a file.
+
+    Args:
+        filepath: Path of the file
+
+    Returns:
+        Hex digest of the content
+    """
+    with open(filepath, "rb") as f:
+        return blake2b(f.read(), digest_size=DIGEST_SIZE).hexdigest()
+
+
+class HashCache:
+    """
+    Content hashes keyed by inode, persisted as a small text file.
+
+    Each line is "dev ino size mtime_ns digest". An entry is only used when
+    size and mtime still match, so a modified file is always hashed again.
+    New entries are appended (later lines win); the file is rewritten with
+    the newest MAX_ENTRIES entries once it has twice as many lines.
+
+    Args:
+        path: Cache file (default: <cache dir>/hashes)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(get_cache_dir(), "hashes")
+        self._entries = None  # type: Optional[Dict[Tuple[int, int], Tuple[int, int, str]]]
+        # Lines in the cache file, including superseded entries
+        self._lines = 0
+
+    def _load(self) -> Dict[Tuple[int, int], Tuple[int, int, str]]:
+        if self._entries is None:
+            self._entries = {}
+            self._lines = 0
+            try:
+                with open(self.path, "r", encoding="ascii") as f:
+                    for line in f:
+                        self._lines += 1
+                        fields = line.split()
+                        if len(fields) != 5:
+                            continue
+                        try:
+                            dev, ino, size, mtime_ns = (int(x) for x in fields[:4])
+                        except ValueError:
+                            # Torn line from an interrupted append
+                            continue
+                        self._entries.pop((dev, ino), None)
+                        self._entries[(dev, ino)] = (size, mtime_ns, fields[4])
+            except (OSError, ValueError):
+                pass
+        return self._entries
+
+    def _save(self, key: Tuple[int, int]) -> None:
+        """Persist the entry of key, compacting the file when it grew too long."""
+        try:
+            if self._lines >= 2 * MAX_ENTRIES:
+                entries = list(self._entries.items())[-MAX_ENTRIES:]
+                self._entries = dict(entries)
+                content = "".join(
+                    f"{dev} {ino} {size} {mtime_ns} {digest}\n"
+                    for (dev, ino), (size, mtime_ns, digest) in entries
+                )
+                write_file_atomic(self.path, content.encode("ascii"))
+                self._lines = len(entries)
+                return
+
+            size, mtime_ns, digest = self._entries[key]
+            line = f"{key[0]} {key[1]} {size} {mtime_ns} {digest}\n"
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # One small O_APPEND write, so concurrent shells do not interleave
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, line.encode("ascii"))
+            finally:
+                os.close(fd)
+            self._lines += 1
+        except OSError:
+            # The cache is an optimization only
+            pass
+
+    def digest(self, filepath: str, st: Optional[os.stat_result] = None) -> str:
+        """
+        Get the content hash of a file, reading it only if the cache has no valid entry.
+
+        Args:
+            filepath: Path of the file
+            st: Result of os.stat(filepath), if already known
+
+        Returns:
+            Hex digest of the content
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        st = st or os.stat(filepath)
+        entries = self._load()
+        key = (st.st_dev, st.st_ino)
+        cached = entries.get(key)
+        if cached is not None and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+
+        digest = hash_file(filepath)
+        if time.time_ns() - st.st_mtime_ns >= RACY_WINDOW_NS:
+            entries.pop(key, None)
+            entries[key] = (st.st_size, st.st_mtime_ns, digest)
+            self._save(key)
+        return digest
+
+
+# Shared by compute_env_state and has_state_changed within one process
+default_hash_cache = None  # type: Optional[HashCache]
+
+
+def file_digest(filepath: str, st: Optional[os.stat_result] = None) -> str:
+    """Get the content hash of a file through the shared HashCache."""
+    global default_hash_cache
+    if default_hash_cache is None:
+        default_hash_cache = HashCache()
+    return default_hash_cache.digest(filepath, st)
+
+
+__all__ = ["HashCache", "file_digest", "hash_file"]
@@ -0,0 +1,87 @@
+"""Machine-readable output formats for tools that consume dirdotenv environments.
+
+Unlike format_export_commands, these formats are not meant to be evaluated by
+a shell. Output is written to a stream piece by piece, so environments of many
+directories can be emitted without building the whole output in memory.
+"""
+
+from typing import Dict, Optional, TextIO
+
+FORMATS = ["json", "ndjson", "env0", "dotenv", "systemd"]
+
+# Formats that describe several directories when written repeatedly
+MULTI_DIRECTORY_FORMATS = ["ndjson"]
+
+# Characters systemd unescapes inside double quotes in an EnvironmentFile.
+# Line breaks are kept as they are: double-quoted values may span lines.
+_SYSTEMD_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "$": "\\$", "`": "\\`"})
+
+# Escapes of double-quoted values in python-dotenv, Docker Compose and Node's dotenv
+_DOTENV_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
+
+
+def _dotenv_line(key: str, value: str) -> str:
+    if "\n" in value or "\r" in value:
+        # A line break cannot be quoted on one line: escape it, like the
+        # common dotenv implementations (dirdotenv's own parser has no escapes)
+        return f'{key}="{value.translate(_DOTENV_ESCAPES)}"\n'
+    # The parser strips one pair of matching quotes and has no escapes
+    if "'" in value:
+        return f'{key}="{value}"\n'
+    return f"{key}='{value}'\n"
+
+
+def write_env(
+    env_vars: Dict[str, str],
+    fmt: str,
+    stream: TextIO,
+    directory: Optional[str] = None,
+) -> None:
+    """
+    Write environment variables to a stream in a machine-readable format.
+
+    Formats:
+    - json: one object mapping keys to values
+    - ndjson: one line {"directory": ..., "env": {...}} per call
+    - env0: KEY=VALUE records terminated by NUL, like `env -0`
+    - dotenv: KEY='value' lines; values with line breaks are written as
+      KEY="...\\n..." with backslash escapes
+    - systemd: KEY="value" lines for an EnvironmentFile= of a systemd unit
+      (values with line breaks span several lines inside the quotes)
+
+    Args:
+        env_vars: Dictionary of environment variables
+        fmt: One of FORMATS
+        stream: Text stream to write to
+        directory: Directory the variables belong to (used by ndjson)
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if fmt == "json":
+        import json
+
+        json.dump(env_vars, stream, ensure_ascii=False)
+        stream.write("\n")
+    elif fmt == "ndjson":
+        import json
+
+        record = {"directory": directory, "env": env_vars}
+        stream.write(json.dumps(record, ensure_ascii=False))
+        stream.write("\n")
+    elif fmt == "env0":
+        for key, value in env_vars.items():
+            stream.write(f"{key}={value}\0")
+    elif fmt == "dotenv":
+        for key, value in env_vars.items():
+            stream.write(_dotenv_line(key, value))
+    elif fmt == "systemd":
+        for key, value in env_vars.items():
+            stream.write(f'{key}="{value.translate(_SYSTEMD_ESCAPES)}"\n')
+    else:
+        raise ValueError(
+            f"Unsupported format: {fmt}. Supported formats: {', '.join(FORMATS)}"
+        )
+
+
+__all__ = ["FORMATS", "MULTI_DIRECTORY_FORMATS", "write_env"]
@@ -1,15 +1,80 @@
 """Hook files for shell integration."""
 
+import os
 from pathlib import Path
+from typing import Optional
 
+# Map shell names to hook file names
+HOOK_FILES = {
+    "bash": "bash.sh",
+    "zsh": "zsh.sh",
+    "fish": "fish.fish",
+    "powershell": "powershell.ps1",
+    "xonsh": "xonsh.xsh",
+}
 
-def get_hook(shell: str, cmd: str) -> str:
+# Templates wrapping a rendered hook with a version check, for --install
+INSTALL_FILES = {
+    "bash": "sh_install.sh",
+    "zsh": "sh_install.sh",
+    "fish": "fish_install.fish",
+    "powershell": "powershell_install.ps1",
+    "xonsh": "xonsh_install.xsh",
+}
+
+# Hooks that load in the background without blocking the prompt
+ASYNC_HOOK_FILES = {
+    "zsh": "zsh_async.sh",
+    "fish": "fish_async.fish",
+}
+
+# Arguments passing the PID of the shell to `load --session`
+SESSION_LOAD_ARGS = {
+    "bash": " --session $$",
+    "zsh": " --session $$",
+    "fish": " --session $fish_pid",
+    "powershell": " --session $PID",
+}
+
+# Run by the interpreter instead of `-m dirdotenv`, which would put the
+# directory just entered first on sys.path: a dirdotenv/ package there would
+# run instead, and the shell evals its output. Contains no quotes, so it is
+# a single literal argument in every shell once quoted.
+RUN_MAIN = "import sys; sys.path[:] = filter(None, sys.path); from dirdotenv.cli import main; sys.exit(main())"
+
+# Extensions of installed hook files
+INSTALL_EXTENSIONS = {
+    "bash": "bash",
+    "zsh": "zsh",
+    "fish": "fish",
+    "powershell": "ps1",
+    "xonsh": "xsh",
+}
+
+
+def get_hook(
+    shell: str,
+    cmd: str,
+    python: Optional[str] = None,
+    background: bool = False,
+    session: bool = False,
+) -> str:
     """
     Get shell hook code for the specified shell.
 
     Args:
-        shell: Shell type (bash, zsh, fish, powershell)
+        shell: Shell type (bash, zsh, fish, powershell, xonsh)
         cmd: Command to use for invoking dirdotenv (e.g. "dirdotenv", "uvx dirdotenv")
+        python: Interpreter with dirdotenv installed. When given, the hook runs
+            dirdotenv with it directly as long as it and this installation of
+            dirdotenv exist, and only falls back to cmd otherwise (e.g. after
+            the environment was removed or rebuilt without dirdotenv)
+        background: Load in the background and apply the result when it arrives,
+            instead of blocking the prompt (zsh and fish only)
+        session: Keep bookkeeping in a session file instead of exported
+            variables (see dirdotenv.session). Not available with background:
+            a background load saves the session before the shell decides
+            whether to apply or discard its result
 
     Returns:
         String containing the hook code for the shell
@@ -17,29 +82,170 @@ def get_hook(shell: str, cmd: str) -> str:
     Raises:
         ValueError: If shell is not supported
     """
-    # Map shell names to hook file names
-    hook_files = {
-        "bash": "bash.sh",
-        "zsh": "zsh.sh",
-        "fish": "fish.fish",
-        "powershell": "powershell.ps1",
-    }
-
-    if shell not in hook_files:
+    if shell not in HOOK_FILES:
+        raise ValueError(
+            f"Unsupported shell: {shell}. Supported shells: {', '.join(HOOK_FILES.keys())}"
+        )
+    if background and shell not in ASYNC_HOOK_FILES:
         raise ValueError(
-            f"Unsupported shell: {shell}. Supported shells: {', '.join(hook_files.keys())}"
+            f"Background loading is not supported for {shell}. "
+            f"Supported shells: {', '.join(ASYNC_HOOK_FILES.keys())}"
         )
+    if background and session:
+        raise ValueError("Background loading cannot be combined with session state")
 
     # Get the path to the hooks directory (this file is in hooks/)
     hooks_dir = Path(__file__).parent
+    hook_files = ASYNC_HOOK_FILES if background else HOOK_FILES
     hook_file = hooks_dir / hook_files[shell]
 
     # Read and return the hook content
     try:
         content = hook_file.read_text(encoding="utf-8")
-        return content.replace("{{cmd}}", cmd)
     except FileNotFoundError:
         raise FileNotFoundError(f"Hook file not found: {hook_file}")
 
+    # The xonsh hook imports dirdotenv; this lets it find the same installation
+    pythonpath = str(hooks_dir.resolve().parent.parent)
+    # Hooks only run the interpreter while this installation is still there
+    module_file = str(hooks_dir.resolve().parent / "cli.py")
+    return (
+        content.replace("{{cmd}}", cmd)
+        .replace("{{python}}", quote_for_shell(python or "", shell))
+        .replace("{{module_file}}", quote_for_shell(module_file, shell))
+        .replace("{{run_main}}", quote_for_shell(RUN_MAIN, shell))
+        .replace("{{load_args}}", SESSION_LOAD_ARGS.get(shell, "") if session else "")
+        .replace("{{pythonpath}}", repr(pythonpath))
+    )
+
+
+def quote_for_shell(value: str, shell: str) -> str:
+    """
+    Quote a string as a literal for the given shell.
+
+    Args:
+        value: String to quote
+        shell: Shell type (bash, zsh, fish, powershell, xonsh)
+
+    Returns:
+        Quoted string
+    """
+    if shell in ["bash", "zsh"]:
+        return "'" + value.replace("'", "'\\''") + "'"
+    if shell == "fish":
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    if shell == "powershell":
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+
+def get_installed_hook_path(shell: str) -> str:
+    """Get the location of the pre-rendered hook file for a shell."""
+    from dirdotenv.paths import get_data_dir
+
+    return os.path.join(get_data_dir(), f"hook.{INSTALL_EXTENSIONS[shell]}")
+
+
+def render_installed_hook(
+    shell: str,
+    cmd: str,
+    hook_path: str,
+    python: Optional[str] = None,
+    background: bool = False,
+    session: bool = False,
+) -> str:
+    """
+    Render a hook that can be sourced directly, without running dirdotenv at shell startup.
+
+    The hook is wrapped in a check that reads the first line of the installed
+    dirdotenv/__version__.py (with shell builtins only) and regenerates the file
+    when it no longer matches, i.e. after an upgrade.
+
+    Args:
+        shell: Shell type (bash, zsh, fish, powershell, xonsh)
+        cmd: Command to use for invoking dirdotenv
+        hook_path: Where the rendered hook will be written
+        python: Interpreter to run directly (see get_hook)
+        background: Whether to render the background-loading hook (see get_hook)
+        session: Whether to keep bookkeeping in a session file (see get_hook)
+
+    Returns:
+        String containing the hook file content
+    """
+    from dirdotenv.__version__ import __version__
+
+    hook = get_hook(shell, cmd, python, background, session)
+    hooks_dir = Path(__file__).parent
+    template = (hooks_dir / INSTALL_FILES[shell]).read_text(encoding="utf-8")
+
+    version_file = hooks_dir.resolve().parent / "__version__.py"
+    version_line = version_file.read_text(encoding="utf-8").splitlines()[0]
+
+    indented_hook = "\n".join(
+        "    " + line if line.strip() else "" for line in hook.splitlines()
+    )
+
+    # Regenerate with the same options. Without an interpreter the command was
+    # given explicitly with --cmd; otherwise let the new version detect both.
+    hook_args = []
+    if python is None:
+        hook_args += ["--cmd", cmd]
+    if background:
+        hook_args.append("--async")
+    if session:
+        hook_args.append("--session-state")
+    if shell == "xonsh":
+        rendered_args = f" + {hook_args!r}" if hook_args else ""
+    else:
+        rendered_args = "".join(
+            " " + (arg if arg.startswith("--") else quote_for_shell(arg, shell))
+            for arg in hook_args
+        )
+
+    replacements = {
+        "{{version}}": __version__,
+        "{{shell}}": shell,
+        "{{version_file}}": quote_for_shell(str(version_file), shell),
+        "{{version_line}}": quote_for_shell(version_line, shell),
+        "{{hook_file}}": quote_for_shell(hook_path, shell),
+        "{{hook_args}}": rendered_args,
+        "{{cmd_quoted}}": quote_for_shell(cmd, shell),
+        "{{cmd}}": cmd,
+        "{{hook}}": indented_hook,
+    }
+    for placeholder, value in replacements.items():
+        template = template.replace(placeholder, value)
+    return template
+
+
+def install_hook(
+    shell: str,
+    cmd: str,
+    hook_path: Optional[str] = None,
+    python: Optional[str] = None,
+    background: bool = False,
+    session: bool = False,
+) -> str:
+    """
+    Write the pre-rendered hook for a shell to the data directory.
+
+    Args:
+        shell: Shell type (bash, zsh, fish, powershell, xonsh)
+        cmd: Command to use for invoking dirdotenv
+        hook_path: Destination (default: get_installed_hook_path(shell))
+        python: Interpreter to run directly (see get_hook)
+        background: Whether to install the background-loading hook (see get_hook)
+        session: Whether to keep bookkeeping in a session file (see get_hook)
+
+    Returns:
+        Path of the written hook file
+    """
+    from dirdotenv.paths import write_file_atomic
+
+    hook_path = os.path.abspath(hook_path or get_installed_hook_path(shell))
+    content = render_installed_hook(shell, cmd, hook_path, python, background, session)
+    write_file_atomic(hook_path, content.encode("utf-8"))
+    return hook_path
+
 
-__all__ = ["get_hook"]
+__all__ = ["get_hook", "get_installed_hook_path", "install_hook", "quote_for_shell"]
@@ -2,11 +2,29 @@ function _dirdotenv_load --on-variable PWD
     # Call dirdotenv load - it handles state tracking internally
     set -l cmd "{{cmd}}"
     
-    # We execute the command directly to support complex commands like "uvx dirdotenv"
-    set -l output (eval $cmd load --shell fish 2>&1)
-    if test $status -eq 0
-        eval (string join "; " $output)
+    # load writes NUL-terminated KEY=VALUE (set) and KEY (unset) records to a
+    # file and prints its path; applying them with builtins avoids eval
+    set -l data_file
+    if test -x {{python}} -a -r {{module_file}}
+        # Run the interpreter resolved when the hook was generated: no PATH lookup or uvx.
+        # The command is the fallback once dirdotenv was removed from its environment.
+        set data_file ({{python}} -c {{run_main}} load --shell fish --data-file{{load_args}})
+    else
+        # We execute the command directly to support complex commands like "uvx dirdotenv"
+        set data_file (eval $cmd load --shell fish --data-file{{load_args}})
     end
+    test $status -eq 0 -a -n "$data_file"; or return
+
+    for record in (string split0 < $data_file)
+        set -l key_value (string split -m 1 = -- $record)
+        if set -q key_value[2]
+            set -gx $key_value[1] $key_value[2]
+        else
+            set -e $key_value[1]
+        end
+    end
+    # The file can hold secrets: don't leave it behind
+    command rm -f -- $data_file
 end
 
 _dirdotenv_load
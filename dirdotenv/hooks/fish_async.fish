@@ -0,0 +1,58 @@
+set -g _dirdotenv_cmd "{{cmd}}"
+set -g _dirdotenv_generation 0
+set -g _dirdotenv_async_dir (command mktemp -d)
+
+function _dirdotenv_load --on-variable PWD
+    # Every load gets a new generation; only the result of the latest one is applied,
+    # so a slow load for a directory we already left cannot overwrite a newer one
+    set -g _dirdotenv_generation (math $_dirdotenv_generation + 1)
+    set -l stale $_dirdotenv_async_dir/*
+    test (count $stale) -gt 0; and command rm -f $stale
+
+    set -l load_cmd
+    if test -x {{python}} -a -r {{module_file}}
+        set load_cmd {{python}} -c {{run_main}}
+    else
+        set load_cmd (string split ' ' -- $_dirdotenv_cmd)
+    end
+    # load writes NUL-terminated KEY=VALUE (set) and KEY (unset) records to a
+    # data file and prints its path; messages go straight to the terminal
+    set -a load_cmd load --shell fish --data-file{{load_args}}
+
+    # sh detaches the worker, so fish does not track it as a job. When done,
+    # the worker signals this shell, which applies the data file it names.
+    command sh -c '
+        pid=$1; result=$2; shift 2
+        (
+            "$@" > "$result.tmp" && mv "$result.tmp" "$result"
+            kill -USR1 "$pid"
+        ) </dev/null >/dev/null &
+    ' sh $fish_pid $_dirdotenv_async_dir/$_dirdotenv_generation $load_cmd
+end
+
+function _dirdotenv_async_done --on-signal SIGUSR1
+    set -l result $_dirdotenv_async_dir/$_dirdotenv_generation
+    test -f $result; or return
+
+    set -l data_file (cat $result)
+    command rm -f $result
+    test -n "$data_file"; or return
+
+    for record in (string split0 < $data_file)
+        set -l key_value (string split -m 1 = -- $record)
+        if set -q key_value[2]
+            set -gx $key_value[1] $key_value[2]
+        else
+            set -e $key_value[1]
+        end
+    end
+    # The file can hold secrets: don't leave it behind
+    command rm -f -- $data_file
+    commandline -f repaint
+end
+
+function _dirdotenv_async_cleanup --on-event fish_exit
+    command rm -rf $_dirdotenv_async_dir
+end
+
+_dirdotenv_load
@@ -0,0 +1,17 @@
+# dirdotenv {{version}} hook for fish, generated by `dirdotenv hook fish --install`
+# Source this file from config.fish. It regenerates itself after dirdotenv is upgraded.
+set -l _dirdotenv_version_line ''
+if test -r {{version_file}}
+    read _dirdotenv_version_line < {{version_file}}
+end
+
+if test "$_dirdotenv_version_line" != {{version_line}}; and not set -q _dirdotenv_regenerated
+    # dirdotenv was upgraded, moved or removed: render the hook again
+    if {{cmd}} hook fish --install {{hook_file}}{{hook_args}} >/dev/null
+        set -g _dirdotenv_regenerated 1
+        source {{hook_file}}
+        set -e _dirdotenv_regenerated
+    end
+else
+{{hook}}
+end
@@ -5,10 +5,36 @@ function global:_dirdotenv_load {
     # but generic invocation of string in expression works for simple cases.
     # For "uvx dirdotenv load ...", it needs to be executed as a command.
     
-    # Using Invoke-Expression for the command execution to handle space-separated arguments in cmd
-    $output = (Invoke-Expression "$cmd load --shell powershell 2>&1") -join "`n"
-    if ($LASTEXITCODE -eq 0 -and $output) {
-        Invoke-Expression $output
+    # load writes NUL-terminated KEY=VALUE (set) and KEY (unset) records to a
+    # file and prints its path; applying them in one loop avoids Invoke-Expression
+    $python = {{python}}
+    if ($python -and (Test-Path -LiteralPath $python -PathType Leaf) -and (Test-Path -LiteralPath {{module_file}} -PathType Leaf)) {
+        # Run the interpreter resolved when the hook was generated: no PATH lookup or uvx.
+        # The command is the fallback once dirdotenv was removed from its environment.
+        $dataFile = & $python -c {{run_main}} load --shell powershell --data-file{{load_args}}
+    }
+    else {
+        # Using Invoke-Expression for the command execution to handle space-separated arguments in cmd
+        $dataFile = Invoke-Expression "$cmd load --shell powershell --data-file{{load_args}}"
+    }
+    if ($LASTEXITCODE -ne 0 -or -not $dataFile) {
+        return
+    }
+
+    $data = [System.IO.File]::ReadAllText($dataFile, [System.Text.Encoding]::UTF8)
+    # The file can hold secrets: don't leave it behind
+    Remove-Item -LiteralPath $dataFile -ErrorAction SilentlyContinue
+    foreach ($record in $data.Split([char]0)) {
+        if (-not $record) {
+            continue
+        }
+        $separator = $record.IndexOf('=')
+        if ($separator -lt 0) {
+            [Environment]::SetEnvironmentVariable($record, $null)
+        }
+        else {
+            [Environment]::SetEnvironmentVariable($record.Substring(0, $separator), $record.Substring($separator + 1))
+        }
     }
 }
 
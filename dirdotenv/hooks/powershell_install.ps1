@@ -0,0 +1,19 @@
+# dirdotenv {{version}} hook for powershell, generated by `dirdotenv hook powershell --install`
+# Dot-source this file from $PROFILE. It regenerates itself after dirdotenv is upgraded.
+$_dirdotenv_version_line = $null
+if (Test-Path -LiteralPath {{version_file}}) {
+    $_dirdotenv_version_line = Get-Content -LiteralPath {{version_file}} -TotalCount 1
+}
+
+if ($_dirdotenv_version_line -ne {{version_line}} -and -not $global:_dirdotenv_regenerated) {
+    # dirdotenv was upgraded, moved or removed: render the hook again
+    Invoke-Expression "{{cmd}} hook powershell --install {{hook_file}}{{hook_args}}" | Out-Null
+    if ($LASTEXITCODE -eq 0) {
+        $global:_dirdotenv_regenerated = $true
+        . {{hook_file}}
+        Remove-Variable -Name _dirdotenv_regenerated -Scope Global
+    }
+}
+else {
+{{hook}}
+}
@@ -0,0 +1,19 @@
+# dirdotenv {{version}} hook for {{shell}}, generated by `dirdotenv hook {{shell}} --install`
+# Source this file from your rc file. It regenerates itself after dirdotenv is upgraded.
+_dirdotenv_version_line=''
+if [[ -r {{version_file}} ]]; then
+    IFS= read -r _dirdotenv_version_line < {{version_file}}
+fi
+
+if [[ "$_dirdotenv_version_line" != {{version_line}} && -z "$_dirdotenv_regenerated" ]]; then
+    # dirdotenv was upgraded, moved or removed: render the hook again
+    unset _dirdotenv_version_line
+    if {{cmd}} hook {{shell}} --install {{hook_file}}{{hook_args}} >/dev/null; then
+        _dirdotenv_regenerated=1
+        source {{hook_file}}
+        unset _dirdotenv_regenerated
+    fi
+else
+    unset _dirdotenv_version_line
+{{hook}}
+fi
@@ -2,9 +2,20 @@ _dirdotenv_load() {
     # Call dirdotenv load - it handles state tracking internally
     local cmd="{{cmd}}"
 
-    local output
-    if output=$($cmd load --shell zsh 2>&1); then
-        eval "$output"
+    # load writes the script to a file and prints its path; sourcing the file is
+    # faster than eval of a captured string. Messages go straight to stderr.
+    local script
+    if [[ -x {{python}} && -r {{module_file}} ]]; then
+        # Run the interpreter resolved when the hook was generated: no PATH lookup or uvx.
+        # The command is the fallback once dirdotenv was removed from its environment.
+        script=$({{python}} -c {{run_main}} load --shell zsh --script-file{{load_args}}) || return
+    else
+        script=$(${=cmd} load --shell zsh --script-file{{load_args}}) || return
+    fi
+    if [[ -n "$script" ]]; then
+        source "$script"
+        # The script can hold secrets: don't leave it behind
+        command rm -f -- "$script"
     fi
 }
 
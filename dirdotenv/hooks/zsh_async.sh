@@ -0,0 +1,69 @@
+typeset -g _dirdotenv_cmd="{{cmd}}"
+typeset -gi _dirdotenv_async_fd=0
+typeset -g _dirdotenv_async_dir=""
+
+_dirdotenv_load_output() {
+    # load writes the script to a file and prints its path. Print it only if
+    # the load succeeded, so a failed load changes nothing. Messages go
+    # straight to the terminal, not into the script.
+    local script
+    if [[ -x {{python}} && -r {{module_file}} ]]; then
+        script=$({{python}} -c {{run_main}} load --shell zsh --script-file{{load_args}}) || return
+    else
+        script=$(${=_dirdotenv_cmd} load --shell zsh --script-file{{load_args}}) || return
+    fi
+    [[ -n "$script" ]] && print -r -- "$script"
+}
+
+_dirdotenv_apply() {
+    [[ -n "$1" ]] || return
+    source "$1"
+    # The script can hold secrets: don't leave it behind
+    command rm -f -- "$1"
+}
+
+_dirdotenv_load() {
+    # Synchronous load, used when zle is not available
+    _dirdotenv_apply "$(_dirdotenv_load_output)"
+}
+
+_dirdotenv_async_cancel() {
+    # Only the most recent load may be applied: drop the handler and the pipe
+    # of a load that is still running, its output is computed for an old state
+    if (( _dirdotenv_async_fd )); then
+        zle -F $_dirdotenv_async_fd 2>/dev/null
+        exec {_dirdotenv_async_fd}<&-
+        _dirdotenv_async_fd=0
+    fi
+}
+
+_dirdotenv_async_done() {
+    local fd=$1 script=""
+    IFS= read -r -u $fd script
+    zle -F $fd
+    exec {fd}<&-
+    (( fd == _dirdotenv_async_fd )) || return
+    _dirdotenv_async_fd=0
+
+    if [[ -n "$script" ]]; then
+        # Let messages print above the prompt, which is redrawn afterwards
+        zle -I
+        _dirdotenv_apply "$script"
+    fi
+}
+
+_dirdotenv_async_start() {
+    if [[ ! -o zle ]]; then
+        _dirdotenv_load
+        return
+    fi
+    # A load for this directory is already running: let it finish
+    (( _dirdotenv_async_fd )) && [[ "$_dirdotenv_async_dir" == "$PWD" ]] && return
+    _dirdotenv_async_cancel
+    _dirdotenv_async_dir=$PWD
+    exec {_dirdotenv_async_fd}< <(_dirdotenv_load_output)
+    zle -F $_dirdotenv_async_fd _dirdotenv_async_done
+}
+
+autoload -U add-zsh-hook
+add-zsh-hook precmd _dirdotenv_async_start
@@ -0,0 +1,296 @@
+"""Persistent index of which env files define which keys in a directory tree."""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from dirdotenv.cache import stat_fingerprint
+from dirdotenv.check import DEFAULT_EXCLUDES, ENV_FILE_NAMES, map_files
+from dirdotenv.loader import scan_env_tree
+from dirdotenv.parser import ENV_LINE_RE, ENVRC_LINE_RE
+from dirdotenv.paths import get_cache_dir, write_file_atomic
+from dirdotenv.profiles import file_kind
+
+INDEX_VERSION = 2
+
+# Entries modified this close to the previous scan may have changed again
+# within the same timestamp tick, so they are not trusted (like git's racy check)
+RACY_WINDOW_NS = 2 * 10**9
+
+Definition = Tuple[str, int]
+
+
+def scan_file(filepath: str) -> Dict[str, List[int]]:
+    """
+    Find the lines defining each key in an env file.
+
+    In .envrc files, PATH_add and path_add lines count as definitions of the
+    variable they prepend to. Variables pulled in with dotenv, source_env or
+    source_up are not attributed to the .envrc: they are found in the sourced
+    file if it is itself an env file under the indexed root.
+
+    Args:
+        filepath: Path to a .env or .envrc file
+
+    Returns:
+        Dictionary mapping each key to the line numbers defining it
+    """
+    is_envrc = file_kind(filepath) == "envrc"
+    pattern = ENVRC_LINE_RE if is_envrc else ENV_LINE_RE
+    keys = {}
+
+    try:
+        with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+            for lineno, line in enumerate(f, start=1):
+                match = pattern.match(line.strip())
+                if match:
+                    keys.setdefault(match.group(1), []).append(lineno)
+                elif is_envrc:
+                    words = line.split()
+                    if words[:1] == ["PATH_add"]:
+                        keys.setdefault("PATH", []).append(lineno)
+                    elif words[:1] == ["path_add"] and len(words) > 1:
+                        keys.setdefault(words[1], []).append(lineno)
+    except OSError:
+        pass
+
+    return keys
+
+
+def _encode_keys(keys: Dict[str, List[int]]) -> str:
+    """Encode key definitions as "\nKEY:1,2\nOTHER:3\n" (one string keeps the index small)."""
+    lines = "".join(
+        f"{key}:{','.join(map(str, linenos))}\n" for key, linenos in keys.items()
+    )
+    return "\n" + lines
+
+
+def _lookup_lines(encoded: str, key: str) -> Optional[List[int]]:
+    """Get the definition lines of key from an encoded key string."""
+    start = encoded.find(f"\n{key}:")
+    if start == -1:
+        return None
+
+    start += len(key) + 2
+    end = encoded.index("\n", start)
+    return [int(lineno) for lineno in encoded[start:end].split(",")]
+
+
+def get_index_path(root: str) -> str:
+    """Get the location of the persistent index for a root directory."""
+    digest = hashlib.sha256(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(get_cache_dir(), "index", f"{digest}.json")
+
+
+class KeyIndex:
+    """
+    Key to file index for all env files under a root directory.
+
+    The index is stored in the cache directory. On refresh, directories whose
+    mtime is unchanged are not listed again and files whose stat fingerprint is
+    unchanged are not parsed again; the remaining files are scanned in parallel.
+    """
+
+    def __init__(self, root: str, index_path: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.index_path = index_path or get_index_path(self.root)
+        # directory -> [mtime_ns, "/"-joined subdirectories, "/"-joined env file names]
+        self.dirs = {}
+        # file path -> [fingerprint string, encoded keys]
+        self.files = {}
+        self.scanned_at = 0
+        self.dirty = False
+
+    def load(self) -> bool:
+        """
+        Load the stored index.
+
+        Returns:
+            True if a usable index was loaded
+        """
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if data.get("version") != INDEX_VERSION or data.get("root") != self.root:
+            return False
+
+        self.dirs = data["dirs"]
+        self.files = data["files"]
+        self.scanned_at = data["scanned_at"]
+        self.dirty = False
+        return True
+
+    def save(self) -> None:
+        """Store the index in the cache directory."""
+        data = {
+            "version": INDEX_VERSION,
+            "root": self.root,
+            "scanned_at": self.scanned_at,
+            "dirs": self.dirs,
+            "files": self.files,
+        }
+        write_file_atomic(self.index_path, json.dumps(data).encode("utf-8"))
+        self.dirty = False
+
+    def _is_trusted(self, mtime_ns: int) -> bool:
+        return mtime_ns < self.scanned_at - RACY_WINDOW_NS
+
+    def _list_env_files(self) -> List[str]:
+        """Walk the tree, reusing listings of directories that have not changed."""
+        old_dirs = self.dirs
+        new_dirs = {}
+        env_files = []
+        stack = [self.root]
+        sep = os.sep
+
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+
+            cached = old_dirs.get(directory)
+            if cached and cached[0] == mtime_ns and self._is_trusted(mtime_ns):
+                entry = cached
+            else:
+                subdirs, names = [], []
+                try:
+                    for dir_entry in os.scandir(directory):
+                        try:
+                            if dir_entry.is_dir(follow_symlinks=False):
+                                if dir_entry.name not in DEFAULT_EXCLUDES:
+                                    subdirs.append(dir_entry.name)
+                            elif dir_entry.name in ENV_FILE_NAMES and dir_entry.is_file():
+                                names.append(dir_entry.name)
+                        except OSError:
+                            continue
+                except OSError:
+                    continue
+                entry = [mtime_ns, "/".join(sorted(subdirs)), "/".join(names)]
+                self.dirty = True
+
+            new_dirs[directory] = entry
+            prefix = directory if directory.endswith(sep) else directory + sep
+            if entry[2]:
+                env_files.extend(prefix + name for name in entry[2].split("/"))
+            if entry[1]:
+                stack.extend(prefix + name for name in reversed(entry[1].split("/")))
+
+        if len(new_dirs) != len(old_dirs):
+            self.dirty = True
+        self.dirs = new_dirs
+        return env_files
+
+    def refresh(self, jobs: Optional[int] = None) -> int:
+        """
+        Bring the index up to date with the filesystem.
+
+        Args:
+            jobs: Number of worker processes for scanning changed files
+
+        Returns:
+            Number of files that had to be scanned
+        """
+        scan_started = time.time_ns()
+        env_files = self._list_env_files()
+
+        new_files = {}
+        to_scan = []
+        for filepath in env_files:
+            fingerprint = stat_fingerprint(filepath)
+            if fingerprint is None:
+                continue
+
+            cached = self.files.get(filepath)
+            fingerprint_str = ":".join(map(str, fingerprint))
+            if cached and cached[0] == fingerprint_str and self._is_trusted(fingerprint[3]):
+                new_files[filepath] = cached
+            else:
+                new_files[filepath] = [fingerprint_str, "\n"]
+                to_scan.append(filepath)
+
+        for filepath, keys in zip(to_scan, map_files(scan_file, to_scan, jobs)):
+            new_files[filepath][1] = _encode_keys(keys)
+
+        if to_scan or len(new_files) != len(self.files):
+            self.dirty = True
+        self.files = new_files
+        if self.dirty:
+            self.scanned_at = scan_started
+        return len(to_scan)
+
+    def lines(self, filepath: str, key: str) -> Optional[List[int]]:
+        """
+        Get the lines defining key in an indexed file.
+
+        Args:
+            filepath: Absolute path of the env file
+            key: Variable name
+
+        Returns:
+            Line numbers, or None if the file is not indexed or does not define key
+        """
+        entry = self.files.get(filepath)
+        if entry is None:
+            return None
+        return _lookup_lines(entry[1], key)
+
+    def definitions(self, key: str) -> List[Definition]:
+        """
+        Get every definition of key in the tree.
+
+        Args:
+            key: Variable name
+
+        Returns:
+            List of (file path, line number) sorted by path and line
+        """
+        needle = f"\n{key}:"
+        definitions = []
+        for filepath, entry in self.files.items():
+            if needle in entry[1]:
+                definitions.extend((filepath, line) for line in _lookup_lines(entry[1], key))
+        return sorted(definitions)
+
+
+def winning_definition(
+    key: str, directory: str, index: Optional[KeyIndex] = None
+) -> Optional[Definition]:
+    """
+    Find the definition of key that load_env_with_inheritance uses for directory.
+
+    Files from root to directory are loaded in order, with .envrc before .env in
+    each directory (or the configured file names, see dirdotenv.profiles), and
+    the last definition of a key wins.
+
+    Args:
+        key: Variable name
+        directory: Directory whose inherited environment is resolved
+        index: Index to take file contents from (files outside it are scanned directly)
+
+    Returns:
+        (file path, line number) of the winning definition, or None if key is not set
+    """
+    winner = None
+
+    for _, entries in scan_env_tree(directory):
+        for entry in entries:
+            filepath = entry.path
+            if index is not None and filepath in index.files:
+                lines = index.lines(filepath, key)
+            else:
+                lines = scan_file(filepath).get(key)
+
+            if lines:
+                winner = (filepath, lines[-1])
+
+    return winner
+
+
+__all__ = ["KeyIndex", "get_index_path", "scan_file", "winning_definition"]
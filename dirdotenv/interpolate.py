@@ -0,0 +1,319 @@
+"""Variable interpolation across inherited env file layers.
+
+Values may reference other variables as ${VAR}, ${VAR:-default} (default if
+unset or empty) and ${VAR-default} (default if unset). Single-quoted values
+are taken literally.
+
+Each env file is a layer, from the root directory's .envrc to the current
+directory's .env. A reference in a layer resolves to the variable defined in
+the same layer, otherwise to the nearest lower layer that defines it,
+otherwise to the process environment. A variable referencing itself
+(PATH=${PATH}:bin) therefore gets the value from below.
+
+Definitions form a dependency graph. References that close a cycle resolve
+to an empty string and are reported in Interpolator.cycles. When layers are
+updated, only definitions that transitively reference changed keys are
+evaluated again, as are definitions whose references fell back to a process
+environment value that changed since.
+"""
+
+import os
+import re
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Definition of a key in a layer: (layer index, key)
+Node = Tuple[int, str]
+
+
+class LiteralValue(str):
+    """A value that is not interpolated (it was single-quoted in the file)."""
+
+    __slots__ = ()
+
+
+def literal_or_str(raw_value: str, value: str) -> str:
+    """
+    Mark a value as literal if it was single-quoted and could be mistaken for a reference.
+
+    Args:
+        raw_value: Value as written in the file
+        value: Value with the quotes removed
+    """
+    if "${" in value and len(raw_value) >= 2 and raw_value[0] == raw_value[-1] == "'":
+        return LiteralValue(value)
+    return value
+
+
+def _parse(value: str, start: int = 0, nested: bool = False):
+    """Parse a value into parts: strings and (name, default parts or None, colon) references."""
+    parts = []
+    literal = []
+    i = start
+    while i < len(value):
+        if nested and value[i] == "}":
+            break
+        if value.startswith("${", i):
+            match = _NAME_RE.match(value, i + 2)
+            if match:
+                end = match.end()
+                if value.startswith("}", end):
+                    parts.append("".join(literal))
+                    literal = []
+                    parts.append((match.group(), None, False))
+                    i = end + 1
+                    continue
+                for operator in (":-", "-"):
+                    if value.startswith(operator, end):
+                        default, stop = _parse(value, end + len(operator), nested=True)
+                        if stop < len(value):
+                            parts.append("".join(literal))
+                            literal = []
+                            parts.append((match.group(), default, operator == ":-"))
+                            i = stop + 1
+                            break
+                else:
+                    literal.append(value[i])
+                    i += 1
+                continue
+        literal.append(value[i])
+        i += 1
+    parts.append("".join(literal))
+    return [part for part in parts if part != ""], i
+
+
+def parse_template(value: str) -> Optional[list]:
+    """
+    Parse the references in a value.
+
+    Returns:
+        List of parts (strings and references), or None if the value has no references
+    """
+    if "${" not in value or isinstance(value, LiteralValue):
+        return None
+    parts, _ = _parse(value)
+    if all(isinstance(part, str) for part in parts):
+        return None
+    return parts
+
+
+def _references(parts: list) -> Set[str]:
+    names = set()
+    for part in parts:
+        if not isinstance(part, str):
+            names.add(part[0])
+            if part[1]:
+                names |= _references(part[1])
+    return names
+
+
+def referenced_names(layers: Sequence[Dict[str, str]]) -> Set[str]:
+    """Get the names referenced by the values of layers."""
+    names = set()
+    for variables in layers:
+        for value in variables.values():
+            parts = parse_template(value)
+            if parts is not None:
+                names |= _references(parts)
+    return names
+
+
+class Interpolator:
+    """
+    Resolved values of a stack of layers, updated incrementally.
+
+    Args:
+        environ: Process environment that references fall back to (default: os.environ)
+
+    Attributes:
+        env_vars: Merged, resolved variables
+        cycles: Reference cycles found in the last evaluation, as lists of keys
+        evaluated: Number of definitions evaluated in the last update
+    """
+
+    def __init__(self, environ: Optional[Mapping[str, str]] = None):
+        self.environ = os.environ if environ is None else environ
+        self.env_vars = {}  # type: Dict[str, str]
+        self.cycles = []  # type: List[List[str]]
+        self.evaluated = 0
+        self._ids = []  # type: List[str]
+        self._layers = []  # type: List[Dict[str, str]]
+        self._templates = {}  # type: Dict[Node, list]
+        self._values = {}  # type: Dict[Node, str]
+        self._referrers = {}  # type: Dict[str, Set[Node]]
+        # name -> process value (or None) that a reference fell back to
+        self._process_values = {}  # type: Dict[str, Optional[str]]
+
+    def _target(self, node: Node, name: str) -> Optional[Node]:
+        """Find the definition a reference from node to name resolves to."""
+        index, key = node
+        if name != key and name in self._layers[index]:
+            return (index, name)
+        for lower in range(index - 1, -1, -1):
+            if name in self._layers[lower]:
+                return (lower, name)
+        return None
+
+    def _evaluate(self, node: Node, visiting: List[Node]) -> str:
+        if node in self._values:
+            return self._values[node]
+        if node in visiting:
+            cycle = [key for _, key in visiting[visiting.index(node):]] + [node[1]]
+            if cycle not in self.cycles:
+                self.cycles.append(cycle)
+            return ""
+
+        parts = self._templates.get(node)
+        if parts is None:
+            value = str(self._layers[node[0]][node[1]])
+        else:
+            visiting.append(node)
+            value = self._render(node, parts, visiting)
+            visiting.pop()
+        self.evaluated += 1
+        self._values[node] = value
+        return value
+
+    def _render(self, node: Node, parts: list, visiting: List[Node]) -> str:
+        rendered = []
+        for part in parts:
+            if isinstance(part, str):
+                rendered.append(part)
+                continue
+            name, default, colon = part
+            target = self._target(node, name)
+            if target is not None:
+                value = self._evaluate(target, visiting)
+            else:
+                value = self.environ.get(name)
+                self._process_values[name] = value
+            if default is not None and (value is None or (colon and value == "")):
+                value = self._render(node, default, visiting)
+            rendered.append(value or "")
+        return "".join(rendered)
+
+    def update(self, layers: Sequence[Tuple[str, Dict[str, str]]]) -> Set[str]:
+        """
+        Replace the layers and resolve the values again.
+
+        If the layers are the same files as before, only definitions whose key
+        changed or that (transitively) reference a changed key or a changed
+        process environment value are evaluated.
+
+        Args:
+            layers: (layer id, raw variables) pairs, from lowest to highest
+                priority. Ids identify layers between updates (e.g. file paths).
+
+        Returns:
+            Keys whose resolved, merged value changed (including added and removed keys)
+        """
+        ids = [layer_id for layer_id, _ in layers]
+        new_layers = [dict(variables) for _, variables in layers]
+
+        if ids != self._ids:
+            changed_keys = None
+        else:
+            changed_keys = set()
+            for old, new in zip(self._layers, new_layers):
+                for key in old.keys() | new.keys():
+                    if old.get(key) != new.get(key) or type(old.get(key)) is not type(new.get(key)):
+                        changed_keys.add(key)
+
+        self._ids = ids
+        self._layers = new_layers
+        self.cycles = []
+        self.evaluated = 0
+
+        if changed_keys is None:
+            self._values = {}
+            self._templates = {}
+            self._referrers = {}
+            self._process_values = {}
+            for index, variables in enumerate(new_layers):
+                for key, value in variables.items():
+                    self._add_template((index, key), value)
+        else:
+            # Definitions of changed keys and of changed process values that
+            # references fell back to, and everything that depends on them
+            dirty_keys = set(changed_keys)
+            for name, value in self._process_values.items():
+                if self.environ.get(name) != value:
+                    dirty_keys.add(name)
+            pending = list(dirty_keys)
+            while pending:
+                for node in self._referrers.get(pending.pop(), ()):
+                    if node[1] not in dirty_keys:
+                        dirty_keys.add(node[1])
+                        pending.append(node[1])
+
+            for node in list(self._values):
+                if node[1] in dirty_keys:
+                    del self._values[node]
+            for node in list(self._templates):
+                if node[1] in changed_keys:
+                    self._remove_template(node)
+            for index, variables in enumerate(new_layers):
+                for key in changed_keys & variables.keys():
+                    self._add_template((index, key), variables[key])
+
+        env_vars = {}
+        for index, variables in enumerate(new_layers):
+            for key in variables:
+                env_vars[key] = self._evaluate((index, key), [])
+
+        old_vars = self.env_vars
+        self.env_vars = env_vars
+        return {
+            key
+            for key in old_vars.keys() | env_vars.keys()
+            if old_vars.get(key) != env_vars.get(key)
+        }
+
+    def _add_template(self, node: Node, value: str) -> None:
+        parts = parse_template(value)
+        if parts is None:
+            return
+        self._templates[node] = parts
+        for name in _references(parts):
+            self._referrers.setdefault(name, set()).add(node)
+
+    def _remove_template(self, node: Node) -> None:
+        parts = self._templates.pop(node)
+        for name in _references(parts):
+            self._referrers[name].discard(node)
+
+
+def interpolate_layers(
+    layers: Sequence[Dict[str, str]], environ: Optional[Mapping[str, str]] = None
+) -> Dict[str, str]:
+    """
+    Merge layers from lowest to highest priority, resolving references.
+
+    Args:
+        layers: Raw variables of each layer
+        environ: Process environment that references fall back to (default: os.environ)
+
+    Returns:
+        Merged, resolved variables
+    """
+    if not any("${" in value for variables in layers for value in variables.values()):
+        # Nothing to resolve
+        merged = {}
+        for variables in layers:
+            merged.update(variables)
+        return {key: str(value) for key, value in merged.items()}
+
+    interpolator = Interpolator(environ)
+    interpolator.update([(str(index), variables) for index, variables in enumerate(layers)])
+    return interpolator.env_vars
+
+
+__all__ = [
+    "Interpolator",
+    "LiteralValue",
+    "interpolate_layers",
+    "literal_or_str",
+    "parse_template",
+    "referenced_names",
+]
@@ -1,113 +1,415 @@
 """Directory-aware environment variable loading with inheritance and cleanup."""
 
+import math
 import os
 import sys
-from typing import Dict, Set, Tuple, Optional
-from dirdotenv.parser import load_env
+import time
+from collections import ChainMap
+from typing import Dict, List, Mapping, NamedTuple, Set, Tuple, Optional
+from dirdotenv.interpolate import interpolate_layers
+from dirdotenv.parser import parse_env_file
+from dirdotenv.profiles import file_kind, get_file_names, scan_env_files
 
 
-def find_env_files_in_tree(current_dir: str) -> list:
-    """
-    Find all directories with .env or .envrc files from current directory up to root.
-    
-    Returns list of directories from root to current, each containing env files.
-    """
-    directories = []
+def _ancestors(current_dir: str) -> list:
+    """List a directory and its parents, from root to current."""
     path = os.path.abspath(current_dir)
+    directories = []
     
     while True:
-        if os.path.isfile(os.path.join(path, '.env')) or os.path.isfile(os.path.join(path, '.envrc')):
-            directories.insert(0, path)  # Insert at beginning to go root->leaf
-        
+        directories.append(path)
         parent = os.path.dirname(path)
         if parent == path:  # Reached root
             break
         path = parent
     
+    directories.reverse()
     return directories
 
 
-def load_env_with_inheritance(current_dir: str) -> Tuple[Dict[str, str], list]:
+def scan_env_tree(current_dir: str, names: Optional[Tuple[str, ...]] = None) -> list:
+    """
+    Find the env files of a directory and its parents, one directory listing each.
+    
+    Args:
+        current_dir: Current directory path
+        names: File names each directory can contribute (default: get_file_names())
+        
+    Returns:
+        List of (directory, list of os.DirEntry) from root to current, for
+        directories with at least one env file, files in load order
+    """
+    names = names or get_file_names()
+    tree = []
+    for directory in _ancestors(current_dir):
+        entries = scan_env_files(directory, names)
+        if entries:
+            tree.append((directory, entries))
+    return tree
+
+
+def find_env_files_in_tree(current_dir: str) -> list:
+    """
+    Find all directories with env files from current directory up to root.
+    
+    Returns list of directories from root to current, each containing env files.
+    """
+    return [directory for directory, _ in scan_env_tree(current_dir)]
+
+
+def env_file_candidates(directory: str, inherit: bool = True) -> list:
+    """
+    List every env file path that can contribute to a directory's environment.
+    
+    Paths are in load order (root first, .envrc before .env) and need not exist.
+    
+    Args:
+        directory: Directory whose environment is loaded
+        inherit: Whether to include parent directories
+        
+    Returns:
+        List of file paths
+    """
+    directories = _ancestors(directory) if inherit else [os.path.abspath(directory)]
+    names = get_file_names()
+    
+    return [os.path.join(env_dir, name) for env_dir in directories for name in names]
+
+
+class TreeLoadResult(NamedTuple):
+    """
+    Result of loading the env files from root to a directory.
+    
+    Attributes:
+        env_vars: Merged variables
+        directories: Directories with env files, from root to current
+        watched: Other files the variables depend on (from .envrc directives)
+        path_additions: Directories prepended to each path-like variable
+        expires: Time when a cached command output used expires (None: never)
+        untrusted: Files sourced from .envrc that were not loaded because
+            they are not allowed
+    """
+    
+    env_vars: Dict[str, str]
+    directories: list
+    watched: List[str]
+    path_additions: Dict[str, List[str]]
+    expires: Optional[float] = None
+    untrusted: Tuple[str, ...] = ()
+
+
+def load_env_tree(
+    current_dir: str,
+    skip: Optional[Set[str]] = None,
+    environ: Optional[Mapping[str, str]] = None,
+    allowlist=None,
+) -> TreeLoadResult:
+    """
+    Load environment variables with directory inheritance, keeping track of what they depend on.
+    
+    Args:
+        current_dir: Current directory path
+        skip: Absolute paths of env files not to load (e.g. untrusted files)
+        environ: Environment that PATH_add/path_add build on (default: os.environ)
+        allowlist: If given, files sourced from .envrc files are only loaded
+            when allowed in it (the env files themselves are checked by skip)
+    
+    Returns:
+        TreeLoadResult
+    """
+    from dirdotenv.envrc import evaluate_envrc
+    
+    skip = skip or set()
+    environ = os.environ if environ is None else environ
+    tree = scan_env_tree(current_dir)
+    layers = []
+    env_vars = {}
+    watched = []
+    path_additions = {}
+    expires = None
+    untrusted = []
+    
+    # Load from root to current, allowing later files to override
+    for _, entries in tree:
+        for entry in entries:
+            if entry.path in skip:
+                continue
+            if file_kind(entry.path) == 'env':
+                layers.append(parse_env_file(entry.path))
+                env_vars.update(layers[-1])
+                continue
+            
+            # Path directives build on the variables loaded before
+            result = evaluate_envrc(
+                entry.path, ChainMap(env_vars, environ), allowlist, allowlist is not None
+            )
+            layers.append(result.env_vars)
+            env_vars.update(result.env_vars)
+            watched.extend(filepath for filepath in result.watched if filepath not in watched)
+            for key, added_entries in result.path_additions.items():
+                added = path_additions.setdefault(key, [])
+                added.extend(path for path in added_entries if path not in added)
+            if result.expires is not None and (expires is None or result.expires < expires):
+                expires = result.expires
+            untrusted.extend(filepath for filepath in result.untrusted if filepath not in untrusted)
+    
+    # Resolve ${VAR} references across all layers
+    env_vars = interpolate_layers(layers, environ)
+    
+    directories = [directory for directory, _ in tree]
+    return TreeLoadResult(
+        env_vars, directories, watched, path_additions, expires, tuple(untrusted)
+    )
+
+
+def load_env_with_inheritance(
+    current_dir: str, skip: Optional[Set[str]] = None
+) -> Tuple[Dict[str, str], list]:
     """
     Load environment variables with directory inheritance.
     
     Loads from root to current directory, allowing child directories to override parent values.
     
+    Args:
+        current_dir: Current directory path
+        skip: Absolute paths of env files not to load (e.g. untrusted files)
+    
     Returns:
         Tuple of (env_vars dict, list of directory paths that were loaded)
     """
-    directories = find_env_files_in_tree(current_dir)
-    env_vars = {}
-    
-    # Load from root to current, allowing later directories to override
-    for directory in directories:
-        env_vars.update(load_env(directory))
+    result = load_env_tree(current_dir, skip)
+    return result.env_vars, result.directories
+
+
+def stat_env_files(current_dir: str) -> list:
+    """
+    List the existing env files from root to current directory.
     
-    return env_vars, directories
+    Returns:
+        List of (path, os.stat_result) tuples, in load order
+    """
+    files = []
+    for _, entries in scan_env_tree(current_dir):
+        for entry in entries:
+            try:
+                files.append((entry.path, entry.stat()))
+            except (OSError, IOError):
+                continue
+    return files
 
 
-def compute_env_state(current_dir: str) -> str:
+def compute_env_state(
+    current_dir: str,
+    watched: Optional[List[str]] = None,
+    path_additions: Optional[Dict[str, List[str]]] = None,
+    expires: Optional[float] = None,
+) -> str:
     """
     Compute a state string representing the current state of .env and .envrc files.
     
-    This includes the directory path and modification times of all relevant env files
-    from root to current directory.
+    This includes the directory path and, for all relevant env files from root
+    to current directory and the files they watch, their modification time,
+    size and content hash. When allowing files is required, it also includes
+    the allowlist version.
+    
+    Path additions are recorded too, so they can be taken out of the path
+    variables again when the directory is left, and so is the time when a
+    cached command output expires.
     
     Args:
         current_dir: Current directory path
+        watched: Other files the variables depend on (TreeLoadResult.watched)
+        path_additions: Directories prepended to path variables (TreeLoadResult.path_additions)
+        expires: Time when the variables must be reloaded (TreeLoadResult.expires)
         
     Returns:
         State string that changes when files are added, removed, or modified
     """
-    state_parts = []
-    path = os.path.abspath(current_dir)
-    
-    # Collect all parent directories up to root
-    check_paths = []
-    while True:
-        check_paths.append(path)
-        parent = os.path.dirname(path)
-        if parent == path:  # Reached root
-            break
-        path = parent
+    from dirdotenv.filehash import file_digest
+    
+    # The same directory gives the same state however it is spelled
+    current_dir = os.path.abspath(current_dir)
+    state_parts = [f"dir:{current_dir}"]
+    
+    for filepath, st in stat_env_files(current_dir):
+        try:
+            digest = file_digest(filepath, st)
+        except (OSError, IOError):
+            # If we can't read the file, skip it
+            continue
+        state_parts.append(f"{filepath}:{st.st_mtime_ns}:{st.st_size}:{digest}")
+    
+    for filepath in watched or []:
+        try:
+            st = os.stat(filepath)
+            digest = file_digest(filepath, st)
+            state_parts.append(f"watch:{filepath}:{st.st_mtime_ns}:{st.st_size}:{digest}")
+        except (OSError, IOError):
+            # Watched while missing: creating it is a change
+            state_parts.append(f"watch:{filepath}:-1:-1:-")
+    
+    for key, entries in (path_additions or {}).items():
+        state_parts.extend(f"path:{key}={entry}" for entry in entries)
+    
+    if expires is not None:
+        state_parts.append(f"expires:{math.ceil(expires)}")
+    
+    trust = _trust_stamp()
+    if trust is not None:
+        state_parts.append(f"trust:{trust}")
     
-    # Reverse to go from root to current
-    check_paths.reverse()
+    return ";".join(state_parts)
+
+
+def _trust_stamp() -> Optional[str]:
+    """Get the allowlist version if only allowed files are loaded, else None."""
+    from dirdotenv.trust import Allowlist, trust_required
     
-    # Check each directory for .env or .envrc files and record their state
-    for directory in check_paths:
-        for filename in ['.env', '.envrc']:
-            filepath = os.path.join(directory, filename)
-            if os.path.isfile(filepath):
-                try:
-                    mtime = os.path.getmtime(filepath)
-                    state_parts.append(f"{filepath}:{mtime}")
-                except (OSError, IOError):
-                    # If we can't read the file, skip it
-                    pass
+    if not trust_required():
+        return None
+    return Allowlist().stamp()
+
+
+def _parse_state(state: str):
+    """
+    Parse a state string into (directory, env files, watched files, trust, expires).
     
-    # Include the current directory in the state
-    state_parts.insert(0, f"dir:{current_dir}")
+    Files map paths to (mtime_ns, size, digest). Returns None if the state
+    cannot be parsed.
+    """
+    parts = state.split(';')
+    if not parts[0].startswith('dir:'):
+        return None
+    
+    files = {}
+    watched = {}
+    trust = None
+    expires = None
+    try:
+        for part in parts[1:]:
+            if part.startswith('path:'):
+                continue
+            if part.startswith('trust:'):
+                trust = part[6:]
+                continue
+            if part.startswith('expires:'):
+                expires = int(part[8:])
+                continue
+            target = files
+            if part.startswith('watch:'):
+                part = part[6:]
+                target = watched
+            filepath, mtime_ns, size, digest = part.rsplit(':', 3)
+            target[filepath] = (int(mtime_ns), int(size), digest)
+    except ValueError:
+        return None
+    
+    return parts[0][4:], files, watched, trust, expires
+
+
+def get_path_additions(state: Optional[str]) -> Dict[str, List[str]]:
+    """
+    Get the directories a state records as prepended to path variables.
     
-    return ";".join(state_parts)
+    Args:
+        state: State string from compute_env_state (or None)
+        
+    Returns:
+        Dictionary mapping variable names to the added directories
+    """
+    path_additions = {}
+    for part in (state or '').split(';'):
+        if part.startswith('path:') and '=' in part:
+            key, entry = part[5:].split('=', 1)
+            path_additions.setdefault(key, []).append(entry)
+    return path_additions
 
 
-def has_state_changed(old_state: Optional[str], current_dir: str) -> bool:
+def _file_changed(filepath: str, st: Optional[os.stat_result], entry: Tuple[int, int, str]) -> bool:
+    """Check a file against its state entry, hashing it only if mtime or size moved."""
+    mtime_ns, size, digest = entry
+    if st is None:
+        return mtime_ns != -1
+    if st.st_mtime_ns == mtime_ns and st.st_size == size:
+        return False
+    from dirdotenv.filehash import file_digest
+    try:
+        return file_digest(filepath, st) != digest
+    except (OSError, IOError):
+        return True
+
+
+def check_state(old_state: Optional[str], current_dir: str) -> Tuple[bool, Optional[str]]:
     """
     Check if the environment state has changed.
     
+    A file whose modification time and size are unchanged is assumed unchanged.
+    Otherwise its content hash decides, so rewriting a file with identical
+    content (git checkout, touch) is not a change. The state of such files is
+    refreshed, so later checks take the fast path again instead of looking up
+    the hash on every call.
+    
     Args:
         old_state: Previous state string (None if first run)
         current_dir: Current directory path
         
     Returns:
-        True if state has changed, False otherwise
+        Tuple of (whether the state changed, refreshed state string if it did
+        not change but files were rewritten with the same content, else None)
     """
     if old_state is None:
-        return True
+        return True, None
+    
+    parsed = _parse_state(old_state)
+    if parsed is None:
+        # Written by an older version, or a path that cannot be parsed back
+        return old_state != compute_env_state(current_dir), None
+    
+    old_dir, old_files, old_watched, old_trust, expires = parsed
+    if old_dir != os.path.abspath(current_dir) or old_trust != _trust_stamp():
+        return True, None
+    if expires is not None and time.time() >= expires:
+        return True, None
+    
+    current_files = stat_env_files(current_dir)
+    if [filepath for filepath, _ in current_files] != list(old_files):
+        return True, None
+    
+    touched = False
+    checks = [(filepath, st, old_files[filepath]) for filepath, st in current_files]
+    for filepath, entry in old_watched.items():
+        try:
+            st = os.stat(filepath)
+        except (OSError, IOError):
+            st = None
+        checks.append((filepath, st, entry))
+    
+    for filepath, st, entry in checks:
+        if _file_changed(filepath, st, entry):
+            return True, None
+        if st is not None and (st.st_mtime_ns, st.st_size) != entry[:2]:
+            touched = True
+    
+    if not touched:
+        return False, None
+    refreshed = compute_env_state(
+        current_dir, list(old_watched), get_path_additions(old_state), expires
+    )
+    return False, refreshed
+
+
+def has_state_changed(old_state: Optional[str], current_dir: str) -> bool:
+    """
+    Check if the environment state has changed (see check_state).
     
-    new_state = compute_env_state(current_dir)
-    return old_state != new_state
+    Args:
+        old_state: Previous state string (None if first run)
+        current_dir: Current directory path
+        
+    Returns:
+        True if state has changed, False otherwise
+    """
+    return check_state(old_state, current_dir)[0]
 
 
 def get_loaded_keys(old_vars: Dict[str, str], new_vars: Dict[str, str]) -> Set[str]:
@@ -4,6 +4,24 @@ import re
 import os
 from typing import Dict
 
+from dirdotenv.compiled import compiled_enabled, get_compiled_cache
+from dirdotenv.interpolate import interpolate_layers, literal_or_str
+
+# KEY=value, KEY='value', or KEY="value"
+ENV_LINE_RE = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*)=(.*)$')
+
+# export KEY=value, export KEY='value', or export KEY="value"
+ENVRC_LINE_RE = re.compile(r'^export\s+([A-Za-z_][A-Za-z0-9_]*)=(.*)$')
+
+
+def strip_quotes(value: str) -> str:
+    """Remove one pair of matching quotes around a value, if present."""
+    if len(value) >= 2:
+        if (value.startswith("'") and value.endswith("'")) or \
+           (value.startswith('"') and value.endswith('"')):
+            return value[1:-1]
+    return value
+
 
 def parse_env_file(filepath: str) -> Dict[str, str]:
     """
@@ -14,6 +32,9 @@ def parse_env_file(filepath: str) -> Dict[str, str]:
     - KEY='value'
     - KEY="value"
     
+    Large files are loaded from a compiled sidecar when it matches, see
+    dirdotenv.compiled.
+    
     Args:
         filepath: Path to the .env file
         
@@ -22,9 +43,17 @@ def parse_env_file(filepath: str) -> Dict[str, str]:
     """
     env_vars = {}
     
-    if not os.path.exists(filepath):
+    try:
+        st = os.stat(filepath)
+    except (OSError, ValueError):
         return env_vars
     
+    compiled = compiled_enabled(st.st_size)
+    if compiled:
+        cached = get_compiled_cache().load(filepath, 'env', st)
+        if cached is not None:
+            return cached
+    
     with open(filepath, 'r', encoding='utf-8') as f:
         for line in f:
             line = line.strip()
@@ -34,18 +63,13 @@ def parse_env_file(filepath: str) -> Dict[str, str]:
                 continue
             
             # Match KEY=value, KEY='value', or KEY="value"
-            match = re.match(r'^([A-Za-z_][A-Za-z0-9_]*)=(.*)$', line)
+            match = ENV_LINE_RE.match(line)
             if match:
-                key = match.group(1)
-                value = match.group(2)
-                
-                # Remove quotes if present (only if balanced and matching)
-                if len(value) >= 2:
-                    if (value.startswith("'") and value.endswith("'")) or \
-                       (value.startswith('"') and value.endswith('"')):
-                        value = value[1:-1]
-                
-                env_vars[key] = value
+                raw_value = match.group(2)
+                env_vars[match.group(1)] = literal_or_str(raw_value, strip_quotes(raw_value))
+    
+    if compiled:
+        get_compiled_cache().store(filepath, 'env', st, env_vars)
     
     return env_vars
 
@@ -59,40 +83,19 @@ def parse_envrc_file(filepath: str) -> Dict[str, str]:
     - export KEY='value'
     - export KEY="value"
     
+    and the common direnv directives (dotenv, source_env, source_up,
+    PATH_add, path_add, watch_file), see dirdotenv.envrc. Large files of
+    plain exports are loaded from a compiled sidecar, see dirdotenv.compiled.
+    
     Args:
         filepath: Path to the .envrc file
         
     Returns:
         Dictionary of environment variable key-value pairs
     """
-    env_vars = {}
+    from dirdotenv.envrc import evaluate_envrc
     
-    if not os.path.exists(filepath):
-        return env_vars
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            
-            # Skip empty lines and comments
-            if not line or line.startswith('#'):
-                continue
-            
-            # Match export KEY=value, export KEY='value', or export KEY="value"
-            match = re.match(r'^export\s+([A-Za-z_][A-Za-z0-9_]*)=(.*)$', line)
-            if match:
-                key = match.group(1)
-                value = match.group(2)
-                
-                # Remove quotes if present (only if balanced and matching)
-                if len(value) >= 2:
-                    if (value.startswith("'") and value.endswith("'")) or \
-                       (value.startswith('"') and value.endswith('"')):
-                        value = value[1:-1]
-                
-                env_vars[key] = value
-    
-    return env_vars
+    return evaluate_envrc(filepath).env_vars
 
 
 def load_env(directory: str = '.') -> Dict[str, str]:
@@ -103,20 +106,23 @@ def load_env(directory: str = '.') -> Dict[str, str]:
     1. .envrc file
     2. .env file (takes precedence)
     
+    The file names can be configured and extended with a profile, see
+    dirdotenv.profiles. ${VAR} references are resolved, see dirdotenv.interpolate.
+    
     Args:
         directory: Directory to search for .env and .envrc files (default: current directory)
         
     Returns:
         Dictionary of environment variable key-value pairs
     """
-    env_vars = {}
-    
-    # Load .envrc file first
-    envrc_file = os.path.join(directory, '.envrc')
-    env_vars.update(parse_envrc_file(envrc_file))
+    from dirdotenv.profiles import file_kind, get_file_names, scan_env_files
     
-    # Load .env file (overrides .envrc)
-    env_file = os.path.join(directory, '.env')
-    env_vars.update(parse_env_file(env_file))
+    # Load .envrc file first, then .env file (overrides .envrc)
+    layers = []
+    for entry in scan_env_files(directory, get_file_names()):
+        if file_kind(entry.path) == 'envrc':
+            layers.append(parse_envrc_file(entry.path))
+        else:
+            layers.append(parse_env_file(entry.path))
     
-    return env_vars
+    return interpolate_layers(layers)
@@ -0,0 +1,136 @@
+"""Locations of files dirdotenv keeps outside of project directories."""
+
+import os
+import stat
+import sys
+import threading
+
+
+def get_cache_dir() -> str:
+    """
+    Get the directory for caches that can be safely deleted at any time.
+
+    Resolution order: $DIRDOTENV_CACHE_DIR, $XDG_CACHE_HOME/dirdotenv,
+    %LOCALAPPDATA%\\dirdotenv\\cache on Windows, ~/.cache/dirdotenv elsewhere.
+
+    Returns:
+        Absolute path of the cache directory (not necessarily existing yet)
+    """
+    override = os.environ.get("DIRDOTENV_CACHE_DIR")
+    if override:
+        return os.path.abspath(override)
+
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache:
+        return os.path.join(xdg_cache, "dirdotenv")
+
+    if sys.platform == "win32" and os.environ.get("LOCALAPPDATA"):
+        return os.path.join(os.environ["LOCALAPPDATA"], "dirdotenv", "cache")
+
+    return os.path.join(os.path.expanduser("~"), ".cache", "dirdotenv")
+
+
+def get_data_dir() -> str:
+    """
+    Get the directory for persistent user data (installed hooks, settings).
+
+    Resolution order: $DIRDOTENV_DATA_DIR, $XDG_DATA_HOME/dirdotenv,
+    %APPDATA%\\dirdotenv on Windows, ~/.local/share/dirdotenv elsewhere.
+
+    Returns:
+        Absolute path of the data directory (not necessarily existing yet)
+    """
+    override = os.environ.get("DIRDOTENV_DATA_DIR")
+    if override:
+        return os.path.abspath(override)
+
+    xdg_data = os.environ.get("XDG_DATA_HOME")
+    if xdg_data:
+        return os.path.join(xdg_data, "dirdotenv")
+
+    if sys.platform == "win32" and os.environ.get("APPDATA"):
+        return os.path.join(os.environ["APPDATA"], "dirdotenv")
+
+    return os.path.join(os.path.expanduser("~"), ".local", "share", "dirdotenv")
+
+
+def get_runtime_dir() -> str:
+    """
+    Get the directory for short-lived per-session files, such as load scripts.
+
+    Resolution order: $DIRDOTENV_RUNTIME_DIR, $XDG_RUNTIME_DIR/dirdotenv,
+    dirdotenv-<user> in the system temporary directory.
+
+    Returns:
+        Absolute path of the runtime directory (not necessarily existing yet)
+    """
+    override = os.environ.get("DIRDOTENV_RUNTIME_DIR")
+    if override:
+        return os.path.abspath(override)
+
+    xdg_runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if xdg_runtime:
+        return os.path.join(xdg_runtime, "dirdotenv")
+
+    # Imported here: tempfile is slow to import, and hooks run this on every prompt
+    import tempfile
+
+    if hasattr(os, "getuid"):
+        user = str(os.getuid())
+    else:
+        user = os.environ.get("USERNAME", "user")
+    return os.path.join(tempfile.gettempdir(), f"dirdotenv-{user}")
+
+
+def ensure_private_dir(directory: str) -> str:
+    """
+    Create a directory only the current user can access, or verify an existing one.
+
+    Files in it are executed by the shell, so a directory another user created
+    or can write to (e.g. planted in a shared /tmp) is refused.
+
+    Args:
+        directory: Directory to create or verify
+
+    Returns:
+        The directory
+
+    Raises:
+        OSError: If the directory is not owned by the current user or is
+            writable by others
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if hasattr(os, "getuid"):
+        st = os.lstat(directory)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+            raise OSError(f"{directory} is not a directory owned by the current user")
+        if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            raise OSError(f"{directory} is writable by other users")
+    return directory
+
+
+def write_file_atomic(filepath: str, data: bytes) -> None:
+    """
+    Write data to filepath so that readers never see a partially written file.
+
+    Creates the parent directory if needed.
+
+    Args:
+        filepath: Destination path
+        data: File content
+    """
+    directory = os.path.dirname(filepath)
+    os.makedirs(directory, exist_ok=True)
+
+    # Unique per thread: threads of one process may write the same file
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
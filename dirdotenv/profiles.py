@@ -0,0 +1,134 @@
+"""Configurable env file names per directory and profile selection.
+
+By default each directory contributes `.envrc` and `.env`, in that order.
+$DIRDOTENV_FILES replaces the list with comma-separated file names, from
+lowest to highest priority. A name containing {profile} is only used when
+$DIRDOTENV_PROFILE is set, with the profile substituted:
+
+    DIRDOTENV_FILES=.envrc,.env,.env.local,.env.{profile},.env.{profile}.local
+    DIRDOTENV_PROFILE=dev
+
+Without $DIRDOTENV_FILES, setting a profile adds `.env.{profile}` and
+`.env.{profile}.local` after `.envrc` and `.env`.
+
+Files whose name starts with `.envrc` use .envrc syntax, all others .env
+syntax.
+"""
+
+import os
+import stat
+from typing import List, Optional, Tuple
+
+FILES_VAR = "DIRDOTENV_FILES"
+PROFILE_VAR = "DIRDOTENV_PROFILE"
+
+DEFAULT_FILES = (".envrc", ".env")
+DEFAULT_PROFILE_FILES = (".env.{profile}", ".env.{profile}.local")
+
+
+def get_profile() -> Optional[str]:
+    """Get the selected profile ($DIRDOTENV_PROFILE), or None."""
+    return os.environ.get(PROFILE_VAR) or None
+
+
+def get_file_names(profile: Optional[str] = None, files: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Get the env file names each directory can contribute, from lowest to highest priority.
+
+    Args:
+        profile: Profile to use (default: $DIRDOTENV_PROFILE)
+        files: Comma-separated names, possibly with {profile} (default: $DIRDOTENV_FILES)
+
+    Returns:
+        Tuple of file names
+    """
+    profile = profile if profile is not None else get_profile()
+    files = files if files is not None else os.environ.get(FILES_VAR)
+
+    if files:
+        templates = [name.strip() for name in files.split(",") if name.strip()]
+    else:
+        templates = list(DEFAULT_FILES)
+        if profile:
+            templates.extend(DEFAULT_PROFILE_FILES)
+
+    names = []
+    for template in templates:
+        if "{profile}" in template:
+            if not profile:
+                continue
+            template = template.replace("{profile}", profile)
+        if template not in names and os.sep not in template:
+            names.append(template)
+    return tuple(names)
+
+
+def file_kind(filepath: str) -> str:
+    """Get the syntax of an env file: 'envrc' or 'env'."""
+    return "envrc" if os.path.basename(filepath).startswith(".envrc") else "env"
+
+
+class _StatEntry:
+    """Stand-in for the os.DirEntry of a file found with stat instead of a listing."""
+
+    __slots__ = ("name", "path", "_stat")
+
+    def __init__(self, name: str, path: str, st: os.stat_result):
+        self.name = name
+        self.path = path
+        self._stat = st
+
+    def is_file(self) -> bool:
+        return True
+
+    def stat(self) -> os.stat_result:
+        return self._stat
+
+
+def scan_env_files(directory: str, names: Tuple[str, ...]) -> List[os.DirEntry]:
+    """
+    Find the env files of a directory with a single directory listing.
+
+    Directories that can be entered but not listed (e.g. mode 0711) are
+    checked with one stat per name instead.
+
+    Args:
+        directory: Directory to look in
+        names: File names, from lowest to highest priority
+
+    Returns:
+        Directory entries of the existing regular files, in the order of names
+    """
+    found = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name in names:
+                    try:
+                        if entry.is_file():
+                            found[entry.name] = entry
+                    except OSError:
+                        continue
+    except PermissionError:
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                found[name] = _StatEntry(name, path, st)
+    except OSError:
+        return []
+    return [found[name] for name in names if name in found]
+
+
+__all__ = [
+    "DEFAULT_FILES",
+    "FILES_VAR",
+    "PROFILE_VAR",
+    "file_kind",
+    "get_file_names",
+    "get_profile",
+    "scan_env_files",
+]
@@ -0,0 +1,129 @@
+"""pytest plugin applying the inherited environment of each test file's directory.
+
+Enable it with ``pytest --dirdotenv`` or ``dirdotenv = true`` in the ini file.
+"""
+
+import os
+import time
+from typing import Dict, Optional
+
+import pytest
+
+from dirdotenv.cache import EnvCache
+from dirdotenv.loader import get_loaded_keys, get_unloaded_keys
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("dirdotenv")
+    group.addoption(
+        "--dirdotenv",
+        action="store_true",
+        default=None,
+        help="Apply the .env/.envrc environment of each test file's directory",
+    )
+    group.addoption(
+        "--no-dirdotenv",
+        action="store_false",
+        dest="dirdotenv",
+        help="Disable the dirdotenv plugin even if enabled in the ini file",
+    )
+    parser.addini(
+        "dirdotenv",
+        type="bool",
+        default=False,
+        help="Apply the .env/.envrc environment of each test file's directory",
+    )
+
+
+def pytest_configure(config):
+    enabled = config.getoption("dirdotenv")
+    if enabled is None:
+        enabled = config.getini("dirdotenv")
+    if enabled:
+        config.pluginmanager.register(DirdotenvPlugin(), "dirdotenv-plugin")
+
+
+class DirdotenvPlugin:
+    """
+    Keeps os.environ in sync with the directory of the test being run.
+
+    Environments are resolved once per directory for the whole session, and
+    os.environ is only modified when moving to a directory whose environment
+    differs. Original values are restored at the end of the session.
+    """
+
+    def __init__(self):
+        self.cache = EnvCache()
+        self.environments = {}  # directory -> resolved environment
+        self.current = {}  # environment currently applied
+        self.saved = {}  # key -> value before the plugin touched it (None if unset)
+        self.switches = 0
+        self.resolve_time = 0.0
+        self.apply_time = 0.0
+
+    def resolve(self, directory: str) -> Dict[str, str]:
+        env_vars = self.environments.get(directory)
+        if env_vars is None:
+            start = time.perf_counter()
+            env_vars, _ = self.cache.load_env_with_inheritance(directory)
+            self.environments[directory] = env_vars
+            self.resolve_time += time.perf_counter() - start
+        return env_vars
+
+    def apply(self, directory: str) -> None:
+        env_vars = self.resolve(directory)
+        if env_vars == self.current:
+            return
+
+        start = time.perf_counter()
+        for key in get_unloaded_keys(self.current, env_vars):
+            self._restore(key)
+        for key in get_loaded_keys(self.current, env_vars):
+            if key not in self.saved:
+                self.saved[key] = os.environ.get(key)
+            os.environ[key] = env_vars[key]
+
+        self.current = env_vars
+        self.switches += 1
+        self.apply_time += time.perf_counter() - start
+
+    def _restore(self, key: str) -> None:
+        original = self.saved.pop(key, None)
+        if original is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = original
+
+    @staticmethod
+    def _directory(node) -> Optional[str]:
+        path = getattr(node, "path", None) or getattr(node, "fspath", None)
+        if path is None:
+            return None
+        return os.path.dirname(str(path))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_make_collect_report(self, collector):
+        # Modules may read os.environ at import time
+        if isinstance(collector, pytest.Module):
+            directory = self._directory(collector)
+            if directory:
+                self.apply(directory)
+        yield
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        directory = self._directory(item)
+        if directory:
+            self.apply(directory)
+
+    def pytest_sessionfinish(self, session):
+        for key in list(self.saved):
+            self._restore(key)
+        self.current = {}
+
+    def pytest_terminal_summary(self, terminalreporter):
+        terminalreporter.write_line(
+            f"dirdotenv: {len(self.environments)} directories resolved in "
+            f"{self.resolve_time * 1000:.1f}ms, environment switched "
+            f"{self.switches} times in {self.apply_time * 1000:.1f}ms"
+        )
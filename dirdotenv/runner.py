@@ -0,0 +1,153 @@
+"""Run a command in many directories, each with its own inherited environment."""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from dirdotenv.cache import EnvCache
+from dirdotenv.interpolate import interpolate_layers
+
+
+class RunResult(NamedTuple):
+    """Outcome of running the command in one directory."""
+
+    directory: str
+    returncode: int
+    duration: float
+
+
+def resolve_environments(
+    directories: Iterable[str], cache: Optional[EnvCache] = None
+) -> Dict[str, Dict[str, str]]:
+    """
+    Resolve the inherited environment of many directories at once.
+
+    Gives the same result as load_env_with_inheritance for each directory, but
+    every ancestor directory is checked and parsed only once, however many of
+    the requested directories share it.
+
+    Args:
+        directories: Directories to resolve
+        cache: Cache for parsed files (default: a new EnvCache)
+
+    Returns:
+        Dictionary mapping each directory (as given) to its environment
+    """
+    cache = cache or EnvCache()
+    # absolute directory -> layers of it and all its parents
+    resolved = {}
+    result = {}
+
+    for directory in directories:
+        path = os.path.abspath(directory)
+
+        # Walk up until we reach a directory that is already resolved
+        pending = []
+        current = path
+        while current not in resolved:
+            pending.append(current)
+            parent = os.path.dirname(current)
+            if parent == current:
+                break
+            current = parent
+
+        layers = resolved.get(current, [])
+        for current in reversed(pending):
+            own = [variables for variables in cache.load_layers(current, parents=layers) if variables]
+            if own:
+                layers = layers + own
+            resolved[current] = layers
+
+        # References resolve across all layers, so they are merged per directory
+        result[directory] = interpolate_layers(resolved[path])
+
+    return result
+
+
+class _OutputWriter:
+    """Writes prefixed lines to a binary stream, one whole line at a time."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def write_line(self, prefix: bytes, line: bytes) -> None:
+        if not line.endswith(b"\n"):
+            line += b"\n"
+        with self.lock:
+            self.stream.write(prefix + line)
+            self.stream.flush()
+
+
+def _run_one(
+    directory: str, command: List[str], env: Dict[str, str], writer: _OutputWriter
+) -> RunResult:
+    prefix = f"[{directory}] ".encode("utf-8", errors="replace")
+    start = time.monotonic()
+
+    if not os.path.isdir(directory):
+        writer.write_line(prefix, b"Directory not found")
+        return RunResult(directory, 1, 0.0)
+
+    try:
+        process = subprocess.Popen(
+            command,
+            cwd=directory,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+    except FileNotFoundError:
+        writer.write_line(prefix, f"Command not found: {command[0]}".encode("utf-8"))
+        return RunResult(directory, 127, time.monotonic() - start)
+    except OSError as e:
+        writer.write_line(prefix, f"Cannot run command: {e}".encode("utf-8"))
+        return RunResult(directory, 126, time.monotonic() - start)
+
+    with process.stdout:
+        for line in process.stdout:
+            writer.write_line(prefix, line)
+    returncode = process.wait()
+
+    return RunResult(directory, returncode, time.monotonic() - start)
+
+
+def run_many(
+    directories: List[str],
+    command: List[str],
+    jobs: Optional[int] = None,
+    output=None,
+) -> List[RunResult]:
+    """
+    Run command in every directory with that directory's inherited environment.
+
+    Output of each run is streamed line by line, prefixed with the directory.
+
+    Args:
+        directories: Directories to run the command in
+        command: Command and its arguments
+        jobs: Maximum number of commands running at once (default: number of CPUs)
+        output: Binary stream for the prefixed output (default: stdout)
+
+    Returns:
+        Results in the same order as directories
+    """
+    environments = resolve_environments(directories)
+    writer = _OutputWriter(output or sys.stdout.buffer)
+    base_env = os.environ.copy()
+
+    def run(directory):
+        env = dict(base_env)
+        env.update(environments[directory])
+        return _run_one(directory, command, env, writer)
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        return list(executor.map(run, directories))
+
+
+__all__ = ["RunResult", "resolve_environments", "run_many"]
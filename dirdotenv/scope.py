@@ -0,0 +1,91 @@
+"""Temporarily applying a directory's environment to os.environ."""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from dirdotenv.cache import EnvCache, default_cache
+from dirdotenv.loader import get_loaded_keys, get_unloaded_keys
+
+# Serializes changes to os.environ by scoped() blocks in different threads
+_lock = threading.Lock()
+
+# Per thread: environments applied by its active scoped() blocks, innermost last
+_local = threading.local()
+
+
+def _active() -> List[Dict[str, str]]:
+    stack = getattr(_local, "active", None)
+    if stack is None:
+        stack = _local.active = []
+    return stack
+
+
+@contextmanager
+def scoped(
+    directory: str = ".", inherit: bool = True, cache: Optional[EnvCache] = None
+) -> Iterator[Dict[str, str]]:
+    """
+    Apply the environment of a directory to os.environ for the duration of a block.
+
+    Only keys whose value differs from os.environ are set. Inside another
+    scoped() block, keys managed by the outer block but not defined for this
+    directory are removed, like the shell hooks do when changing directory.
+    On exit, exactly the keys that were changed are restored.
+
+    Parsed files are cached (validated by stat), so entering the same directory
+    repeatedly is cheap.
+
+    Nesting is tracked per thread, and entering and leaving blocks is
+    serialized. os.environ is still shared by the whole process: blocks that
+    overlap in different threads see each other's variables. To run code with
+    different environments concurrently, pass the variables explicitly (e.g.
+    dirdotenv.runner.run_many) instead.
+
+    Args:
+        directory: Directory to load .env and .envrc files from (default: current directory)
+        inherit: Whether to include parent directories (default: True)
+        cache: Cache for parsed files (default: dirdotenv.cache.default_cache)
+
+    Yields:
+        Dictionary of the variables loaded for the directory
+    """
+    cache = cache or default_cache
+    if inherit:
+        new_vars, _ = cache.load_env_with_inheritance(directory)
+    else:
+        new_vars = cache.load_env(directory)
+
+    active = _active()
+    outer_vars = active[-1] if active else {}
+    with _lock:
+        current = {key: os.environ[key] for key in new_vars if key in os.environ}
+        loaded_keys = get_loaded_keys(current, new_vars)
+        unloaded_keys = {
+            key
+            for key in get_unloaded_keys(outer_vars, new_vars)
+            if os.environ.get(key) == outer_vars[key]
+        }
+
+        saved = {key: os.environ.get(key) for key in loaded_keys | unloaded_keys}
+
+        for key in loaded_keys:
+            os.environ[key] = new_vars[key]
+        for key in unloaded_keys:
+            del os.environ[key]
+
+    active.append(new_vars)
+    try:
+        yield dict(new_vars)
+    finally:
+        active.pop()
+        with _lock:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+__all__ = ["scoped"]
@@ -0,0 +1,205 @@
+"""Per-shell-session bookkeeping kept in a file instead of the environment.
+
+By default the hooks export _DIRDOTENV_KEYS and _DIRDOTENV_STATE, so every
+process started from the shell inherits them. In session mode only a short
+session id is exported (_DIRDOTENV_SESSION) and the keys and state are kept
+in a file in the runtime directory.
+
+Each file records the PID of the shell that owns it. A shell started from
+another one inherits the session id; since its PID differs, it gets a new
+session that starts from a copy of the inherited state. Files whose owner is
+gone are removed when a new session is created.
+"""
+
+import os
+import time
+from typing import Optional
+
+from dirdotenv.paths import ensure_private_dir, get_runtime_dir, write_file_atomic
+
+SESSION_VAR = "_DIRDOTENV_SESSION"
+
+# Files not written for this long are removed even if the owner looks alive
+# (PIDs are reused, and liveness cannot be checked on Windows)
+STALE_AFTER = 30 * 24 * 3600
+
+# Sessions in use touch their file this often, so they never look stale
+REFRESH_AFTER = 24 * 3600
+
+
+def _session_path(runtime_dir: str, session_id: str) -> str:
+    return os.path.join(runtime_dir, f"session-{session_id}")
+
+
+def _read_session(path: str):
+    """Read (owner, keys, state) from a session file, or None if unusable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            owner, keys, state = f.read().split("\0")
+        return int(owner), keys, state
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill would terminate the process on Windows; rely on STALE_AFTER
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to someone else
+        return True
+    return True
+
+
+def cleanup_stale_sessions(runtime_dir: str, now: Optional[float] = None) -> int:
+    """
+    Remove session files whose shell has exited or that were not written for STALE_AFTER.
+
+    Args:
+        runtime_dir: Directory containing the session files
+        now: Current time (default: time.time())
+
+    Returns:
+        Number of removed files
+    """
+    now = time.time() if now is None else now
+    removed = 0
+    try:
+        entries = list(os.scandir(runtime_dir))
+    except OSError:
+        return 0
+
+    for entry in entries:
+        if not entry.name.startswith("session-"):
+            continue
+        try:
+            mtime = entry.stat().st_mtime
+        except OSError:
+            continue
+        session = _read_session(entry.path)
+        if session is None or now - mtime > STALE_AFTER or not _pid_alive(session[0]):
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def cleanup_stale_load_files(runtime_dir: str, keep: Optional[str] = None) -> int:
+    """
+    Remove load-PID.* files (see dirdotenv.cli.write_load_file) whose shell has exited.
+
+    The hooks remove these files after applying them, but a shell that exits
+    in between leaves the values it was about to load behind.
+
+    Args:
+        runtime_dir: Directory containing the load files
+        keep: Path of a file to keep
+
+    Returns:
+        Number of removed files
+    """
+    removed = 0
+    try:
+        entries = list(os.scandir(runtime_dir))
+    except OSError:
+        return 0
+
+    for entry in entries:
+        if not entry.name.startswith("load-") or entry.path == keep:
+            continue
+        try:
+            pid = int(entry.name[len("load-"):].split(".", 1)[0])
+        except ValueError:
+            continue
+        if not _pid_alive(pid):
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+class Session:
+    """
+    Bookkeeping of one shell session.
+
+    Attributes:
+        session_id: Id exported in _DIRDOTENV_SESSION
+        owner: PID of the shell
+        keys: Managed keys joined by ":" (like _DIRDOTENV_KEYS)
+        state: State string from compute_env_state (like _DIRDOTENV_STATE)
+        is_new: True if the shell does not know this session id yet and
+            it must be exported
+    """
+
+    def __init__(
+        self, session_id: str, owner: int, keys: str, state: Optional[str], is_new: bool
+    ):
+        self.session_id = session_id
+        self.owner = owner
+        self.keys = keys
+        self.state = state
+        self.is_new = is_new
+        self.path = None
+
+    @classmethod
+    def open(cls, owner: int) -> "Session":
+        """
+        Open the session of the shell with PID owner.
+
+        Uses the session named by _DIRDOTENV_SESSION if that shell owns it.
+        Otherwise starts a new session, initialized from the inherited session
+        or from the exported _DIRDOTENV_KEYS/_DIRDOTENV_STATE variables.
+
+        Args:
+            owner: PID of the shell
+
+        Returns:
+            The session
+
+        Raises:
+            OSError: If the runtime directory is not usable
+        """
+        runtime_dir = ensure_private_dir(get_runtime_dir())
+        session_id = os.environ.get(SESSION_VAR, "")
+
+        inherited = None
+        if session_id and "/" not in session_id and "\\" not in session_id:
+            inherited = _read_session(_session_path(runtime_dir, session_id))
+
+        if inherited is not None and inherited[0] == owner:
+            session = cls(session_id, owner, inherited[1], inherited[2] or None, False)
+            path = _session_path(runtime_dir, session_id)
+            try:
+                if time.time() - os.stat(path).st_mtime > REFRESH_AFTER:
+                    os.utime(path)
+            except OSError:
+                pass
+        else:
+            if inherited is not None:
+                keys, state = inherited[1], inherited[2] or None
+            else:
+                keys = os.environ.get("_DIRDOTENV_KEYS", "")
+                state = os.environ.get("_DIRDOTENV_STATE")
+            cleanup_stale_sessions(runtime_dir)
+            session = cls(os.urandom(4).hex(), owner, keys, state, True)
+
+        session.path = _session_path(runtime_dir, session.session_id)
+        return session
+
+    def save(self, keys: str, state: str) -> None:
+        """Store the managed keys and the state for the next load."""
+        self.keys = keys
+        self.state = state
+        content = f"{self.owner}\0{keys}\0{state}"
+        write_file_atomic(self.path, content.encode("utf-8"))
+
+
+__all__ = ["SESSION_VAR", "Session", "cleanup_stale_load_files", "cleanup_stale_sessions"]
@@ -0,0 +1,172 @@
+"""Allowlist of env files the shell hooks may load.
+
+When DIRDOTENV_REQUIRE_ALLOW (or DIRDOTENV_ALLOW_COMMANDS) is set, the hooks
+only load files that were approved with `dirdotenv allow`. Approval is tied to the content hash, so a
+file that changes after it was allowed has to be allowed again. Hashes come
+from the stat-keyed hash cache (dirdotenv.filehash), so checking a trusted,
+unchanged file does not read it.
+
+The allowlist is a text file in the data directory with one
+"<status> <digest> <path>" line per file, where status is "allow" or "deny".
+"""
+
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from dirdotenv.commands import commands_allowed
+from dirdotenv.paths import get_data_dir, write_file_atomic
+
+REQUIRE_ALLOW_VAR = "DIRDOTENV_REQUIRE_ALLOW"
+
+ALLOWED = "allowed"
+DENIED = "denied"
+UNTRUSTED = "untrusted"
+
+
+def trust_required() -> bool:
+    """
+    Whether the hooks only load allowed files.
+
+    True if $DIRDOTENV_REQUIRE_ALLOW is set, and whenever commands are
+    allowed: otherwise entering a cloned repository would run its commands.
+    """
+    if os.environ.get(REQUIRE_ALLOW_VAR, "").lower() not in ("", "0", "false", "no"):
+        return True
+    return commands_allowed()
+
+
+class Allowlist:
+    """
+    Approved and denied env files, persisted in the data directory.
+
+    Args:
+        path: Allowlist file (default: <data dir>/allowed)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(get_data_dir(), "allowed")
+        self._entries = None  # type: Optional[Dict[str, Tuple[str, str]]]
+
+    def _load(self) -> Dict[str, Tuple[str, str]]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        fields = line.rstrip("\n").split(" ", 2)
+                        if len(fields) == 3 and fields[0] in ("allow", "deny"):
+                            self._entries[fields[2]] = (fields[0], fields[1])
+            except OSError:
+                pass
+        return self._entries
+
+    def _save(self) -> None:
+        content = "".join(
+            f"{action} {digest} {filepath}\n"
+            for filepath, (action, digest) in sorted(self._entries.items())
+        )
+        write_file_atomic(self.path, content.encode("utf-8"))
+
+    def stamp(self) -> str:
+        """
+        Identify the current version of the allowlist.
+
+        Included in the hook state, so allowing or denying a file makes the
+        hooks reload.
+        """
+        try:
+            return str(os.stat(self.path).st_mtime_ns)
+        except OSError:
+            return "0"
+
+    def status(self, filepath: str, st: Optional[os.stat_result] = None) -> str:
+        """
+        Get the trust status of a file.
+
+        Args:
+            filepath: Absolute path of the file
+            st: Result of os.stat(filepath), if already known
+
+        Returns:
+            ALLOWED if the file was allowed with its current content, DENIED if
+            it was denied, UNTRUSTED otherwise
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        entry = self._load().get(filepath)
+        if entry is None:
+            return UNTRUSTED
+        action, digest = entry
+        if action == "deny":
+            return DENIED
+
+        from dirdotenv.filehash import file_digest
+
+        if file_digest(filepath, st) == digest:
+            return ALLOWED
+        return UNTRUSTED
+
+    def allow(self, filepath: str) -> None:
+        """
+        Allow a file with its current content.
+
+        Raises:
+            OSError: If the file cannot be read or the allowlist cannot be written
+        """
+        from dirdotenv.filehash import file_digest
+
+        self._load()[filepath] = ("allow", file_digest(filepath))
+        self._save()
+
+    def deny(self, filepath: str) -> None:
+        """
+        Deny a file: the hooks skip it without a message, whatever its content.
+
+        Raises:
+            OSError: If the allowlist cannot be written
+        """
+        self._load()[filepath] = ("deny", "-")
+        self._save()
+
+
+def find_untrusted(
+    current_dir: str, allowlist: Optional[Allowlist] = None
+) -> Tuple[Set[str], List[str]]:
+    """
+    Find the env files from root to current directory that must not be loaded.
+
+    Args:
+        current_dir: Current directory path
+        allowlist: Allowlist to check against (default: the user's allowlist)
+
+    Returns:
+        Tuple of (paths to skip, untrusted paths to tell the user about).
+        Denied files are skipped silently.
+    """
+    from dirdotenv.loader import stat_env_files
+
+    allowlist = allowlist or Allowlist()
+    skip = set()
+    untrusted = []
+    for filepath, st in stat_env_files(current_dir):
+        try:
+            status = allowlist.status(filepath, st)
+        except OSError:
+            status = UNTRUSTED
+        if status != ALLOWED:
+            skip.add(filepath)
+        if status == UNTRUSTED:
+            untrusted.append(filepath)
+    return skip, untrusted
+
+
+__all__ = [
+    "ALLOWED",
+    "Allowlist",
+    "DENIED",
+    "REQUIRE_ALLOW_VAR",
+    "UNTRUSTED",
+    "find_untrusted",
+    "trust_required",
+]
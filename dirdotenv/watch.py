@@ -0,0 +1,595 @@
+"""Watching env files for changes and restarting commands when they change."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import signal
+import struct
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from dirdotenv import parser
+from dirdotenv.cache import stat_fingerprint
+from dirdotenv.interpolate import Interpolator
+from dirdotenv.loader import env_file_candidates
+from dirdotenv.profiles import file_kind
+
+DEFAULT_DEBOUNCE = 0.1
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Seconds a child gets to exit after SIGTERM before it is killed
+STOP_TIMEOUT = 5.0
+
+# inotify event masks from <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_libc():
+    """Load libc with the inotify functions, or return None when unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+class FileWatcher:
+    """
+    Wait for changes to a set of files.
+
+    Uses inotify on Linux, watching the parent directory of each file so that
+    files created, deleted or replaced by rename (as editors do on save) are
+    noticed. Directories that cannot be watched (they do not exist yet, or
+    were removed or renamed) are retried and their files polled every
+    `poll_interval` seconds. Elsewhere, or if inotify is unavailable, files are
+    polled by stat fingerprint. A burst of events is reported as a single
+    change once no new event arrived for `debounce` seconds.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True,
+    ):
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._paths = set()
+        self._snapshot = {}
+        self._wake_event = threading.Event()
+        self._inotify_fd = None
+        self._watches = {}  # watch descriptor -> directory
+        self._unwatched = set()  # directories inotify could not watch
+        self._wake_r = self._wake_w = None
+
+        libc = _load_libc() if use_inotify else None
+        if libc is not None:
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                self._libc = libc
+                self._inotify_fd = fd
+                self._wake_r, self._wake_w = os.pipe()
+                os.set_blocking(self._wake_r, False)
+                os.set_blocking(self._wake_w, False)
+
+        self.set_paths(paths)
+
+    @property
+    def backend(self) -> str:
+        """Name of the mechanism in use: 'inotify' or 'polling'."""
+        return "inotify" if self._inotify_fd is not None else "polling"
+
+    @property
+    def paths(self) -> List[str]:
+        """Files being watched."""
+        return sorted(self._paths)
+
+    def set_paths(self, paths: Iterable[str]) -> None:
+        """
+        Replace the set of watched files.
+
+        Args:
+            paths: Files to watch; they do not need to exist yet
+        """
+        self._paths = {os.path.abspath(p) for p in paths}
+        self._snapshot = self._take_snapshot()
+
+        if self._inotify_fd is None:
+            return
+
+        directories = {os.path.dirname(p) for p in self._paths}
+        for wd, directory in list(self._watches.items()):
+            if directory not in directories:
+                self._libc.inotify_rm_watch(self._inotify_fd, wd)
+                del self._watches[wd]
+        self._unwatched = directories - set(self._watches.values())
+        self._arm()
+
+    def _arm(self) -> None:
+        """Try to add inotify watches for the directories that have none."""
+        for directory in list(self._unwatched):
+            wd = self._libc.inotify_add_watch(
+                self._inotify_fd, os.fsencode(directory), _WATCH_MASK
+            )
+            if wd >= 0:
+                self._watches[wd] = directory
+                self._unwatched.discard(directory)
+
+    def _take_snapshot(self) -> Dict[str, Optional[tuple]]:
+        return {path: stat_fingerprint(path) for path in self._paths}
+
+    def _poll_changed(self) -> bool:
+        snapshot = self._take_snapshot()
+        changed = snapshot != self._snapshot
+        self._snapshot = snapshot
+        return changed
+
+    def wake(self) -> None:
+        """Make a blocked wait() return False. Safe to call from other threads."""
+        self._wake_event.set()
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b"x")
+            except OSError:
+                pass
+
+    def _consume_wake(self) -> bool:
+        if not self._wake_event.is_set():
+            return False
+        self._wake_event.clear()
+        if self._wake_r is not None:
+            try:
+                while os.read(self._wake_r, 512):
+                    pass
+            except (BlockingIOError, OSError):
+                pass
+        return True
+
+    def _read_inotify(self) -> bool:
+        """Drain pending inotify events and tell whether any concerns a watched file."""
+        relevant = False
+        while True:
+            try:
+                data = os.read(self._inotify_fd, 65536)
+            except BlockingIOError:
+                return relevant
+            if not data:
+                return relevant
+
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset : offset + name_len].rstrip(b"\0")
+                offset += name_len
+
+                directory = self._watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & (_IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                    # The directory itself went away: treat as a change, and
+                    # watch it again once it exists (polling until then)
+                    relevant = True
+                    if mask & _IN_MOVE_SELF:
+                        # The watch follows the directory to its new name
+                        self._libc.inotify_rm_watch(self._inotify_fd, wd)
+                    self._watches.pop(wd, None)
+                    self._unwatched.add(directory)
+                    self._arm()
+                elif os.path.join(directory, os.fsdecode(name)) in self._paths:
+                    relevant = True
+
+    def _wait_raw(self, timeout: Optional[float]) -> Optional[bool]:
+        """
+        Wait for a single change, wake-up, or timeout.
+
+        Returns:
+            True on change, False on wake-up, None on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            if self._consume_wake():
+                return False
+
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+
+            if self._inotify_fd is not None:
+                timeout = remaining
+                if self._unwatched and (timeout is None or timeout > self.poll_interval):
+                    timeout = self.poll_interval
+                ready, _, _ = select.select(
+                    [self._inotify_fd, self._wake_r], [], [], timeout
+                )
+                if self._inotify_fd in ready and self._read_inotify():
+                    self._snapshot = self._take_snapshot()
+                    return True
+                if self._unwatched:
+                    self._arm()
+                    if self._poll_changed():
+                        return True
+            else:
+                interval = self.poll_interval
+                if remaining is not None:
+                    interval = min(interval, remaining)
+                self._wake_event.wait(interval)
+                if not self._wake_event.is_set() and self._poll_changed():
+                    return True
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a watched file changes, wake() is called, or timeout expires.
+
+        Args:
+            timeout: Maximum number of seconds to wait (default: no limit)
+
+        Returns:
+            True if files changed, False on wake-up or timeout
+        """
+        result = self._wait_raw(timeout)
+        if not result:
+            return False
+
+        # Debounce: absorb the rest of the burst (e.g. write to temp file + rename)
+        while True:
+            result = self._wait_raw(self.debounce)
+            if result is None:
+                return True
+            if result is False:
+                # Keep the wake-up for the next wait() call
+                self.wake()
+                return True
+
+    def close(self) -> None:
+        """Release the inotify descriptor and wake-up pipe."""
+        for fd in (self._inotify_fd, self._wake_r, self._wake_w):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._inotify_fd = self._wake_r = self._wake_w = None
+        self._watches = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class EnvChange(NamedTuple):
+    """Keys that changed between two loads of an environment."""
+
+    added: Set[str]
+    changed: Set[str]
+    removed: Set[str]
+    env_vars: Dict[str, str]
+
+
+class Watcher:
+    """
+    Watch a directory's environment in a background thread and report changes.
+
+    All .env/.envrc files that contribute to the environment (including files
+    that do not exist yet) are watched. When one of them changes, only that
+    file is parsed again, the layers are merged (re-resolving only the ${VAR}
+    references that depend on changed keys, or on process environment values
+    that changed since the last reload), and every callback is called
+    with an EnvChange describing the added, changed and removed keys. Callbacks
+    run in the watcher thread and are not called if the result is unchanged.
+
+    Example:
+        with dirdotenv.Watcher("/srv/app", on_change) as watcher:
+            ...
+    """
+
+    def __init__(
+        self,
+        directory: str = ".",
+        callback: Optional[Callable[[EnvChange], None]] = None,
+        inherit: bool = True,
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True,
+    ):
+        self.directory = os.path.abspath(directory)
+        self.inherit = inherit
+        self.callbacks = [callback] if callback else []
+        self._candidates = env_file_candidates(self.directory, inherit)
+        self._file_watcher = FileWatcher(
+            self._candidates,
+            debounce=debounce,
+            poll_interval=poll_interval,
+            use_inotify=use_inotify,
+        )
+        self._lock = threading.Lock()
+        self._layers = {}  # path -> (fingerprint, variables)
+        self._interpolator = Interpolator()
+        self._env_vars = {}
+        self._stopping = False
+        self._thread = None
+        self.reload()
+
+    @property
+    def env_vars(self) -> Dict[str, str]:
+        """The current merged environment."""
+        with self._lock:
+            return dict(self._env_vars)
+
+    def add_callback(self, callback: Callable[[EnvChange], None]) -> None:
+        """Register a function to call with an EnvChange when the environment changes."""
+        self.callbacks.append(callback)
+
+    def reload(self) -> Optional[EnvChange]:
+        """
+        Re-read changed layers and merge them.
+
+        Called automatically by the watcher thread; can also be called directly.
+
+        Returns:
+            EnvChange if the merged environment changed, otherwise None
+        """
+        with self._lock:
+            layers = []
+            for filepath in self._candidates:
+                fingerprint = stat_fingerprint(filepath)
+                cached = self._layers.get(filepath)
+                if fingerprint is None:
+                    self._layers.pop(filepath, None)
+                    continue
+
+                if cached is None or cached[0] != fingerprint:
+                    if file_kind(filepath) == "envrc":
+                        variables = parser.parse_envrc_file(filepath)
+                    else:
+                        variables = parser.parse_env_file(filepath)
+                    cached = self._layers[filepath] = (fingerprint, variables)
+
+                layers.append((filepath, cached[1]))
+
+            self._interpolator.update(layers)
+            env_vars = self._interpolator.env_vars
+            old_vars = self._env_vars
+            if env_vars == old_vars:
+                return None
+
+            self._env_vars = env_vars
+            return EnvChange(
+                added=set(env_vars) - set(old_vars),
+                changed={
+                    key
+                    for key, value in env_vars.items()
+                    if key in old_vars and old_vars[key] != value
+                },
+                removed=set(old_vars) - set(env_vars),
+                env_vars=dict(env_vars),
+            )
+
+    def _run(self) -> None:
+        while not self._stopping:
+            if not self._file_watcher.wait():
+                continue
+
+            change = self.reload()
+            if change is None:
+                continue
+
+            for callback in list(self.callbacks):
+                try:
+                    callback(change)
+                except Exception:
+                    traceback.print_exc()
+
+    def start(self) -> "Watcher":
+        """Start the background thread. Returns self for chaining."""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name="dirdotenv-watcher", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the background thread and release file watching resources."""
+        self._stopping = True
+        self._file_watcher.wake()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._file_watcher.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def _stop_process(process: subprocess.Popen, timeout: float = STOP_TIMEOUT) -> None:
+    """Terminate a process, killing it if it does not exit in time."""
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def _exit_code(returncode: int) -> int:
+    """Convert a Popen return code to a shell-style exit code."""
+    return 128 - returncode if returncode < 0 else returncode
+
+
+def exec_with_watch(
+    command: List[str],
+    watch_paths: List[str],
+    load: Callable[[], Dict[str, str]],
+    debounce: float = DEFAULT_DEBOUNCE,
+    use_inotify: bool = True,
+    watched: Optional[Callable[[], List[str]]] = None,
+) -> int:
+    """
+    Run a command with the loaded environment, restarting it when the environment changes.
+
+    The child is restarted only if the variables returned by load() differ from
+    the ones it was started with. If the child exits on its own, watching goes on
+    and it is started again on the next change. Signals received by this process
+    are forwarded to the child; SIGINT, SIGTERM and SIGHUP also end watching.
+
+    Args:
+        command: Command and its arguments
+        watch_paths: Env files to watch (they do not need to exist)
+        load: Function returning the environment variables to apply
+        debounce: Seconds of quiet required before reacting to a change
+        use_inotify: Whether to use inotify when available
+        watched: Function returning other files the environment depends on
+            (e.g. files sourced from .envrc), watched too; called after each load
+
+    Returns:
+        Exit code of the last child process, or 127 if the command could not
+        be found when starting or restarting it
+    """
+    state = {"process": None, "stopping": False}
+
+    with FileWatcher(watch_paths, debounce=debounce, use_inotify=use_inotify) as watcher:
+
+        def reload():
+            env_vars = load()
+            if watched is not None:
+                watcher.set_paths(list(watch_paths) + list(watched()))
+            return env_vars
+
+        def start(env_vars):
+            env = os.environ.copy()
+            env.update(env_vars)
+            process = subprocess.Popen(command, env=env)
+
+            def wait_for_exit():
+                process.wait()
+                watcher.wake()
+
+            threading.Thread(target=wait_for_exit, daemon=True).start()
+            state["process"] = process
+            return process
+
+        def forward(signum, frame):
+            process = state["process"]
+            if signum in stop_signals:
+                state["stopping"] = True
+            if process is not None and process.poll() is None:
+                try:
+                    process.send_signal(signum)
+                except OSError:
+                    pass
+            watcher.wake()
+
+        stop_signals = {signal.SIGINT, signal.SIGTERM}
+        forwarded = [signal.SIGINT, signal.SIGTERM]
+        for name in ("SIGHUP", "SIGQUIT", "SIGUSR1", "SIGUSR2", "SIGWINCH"):
+            if hasattr(signal, name):
+                forwarded.append(getattr(signal, name))
+        if hasattr(signal, "SIGHUP"):
+            stop_signals.add(signal.SIGHUP)
+
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in forwarded:
+                previous_handlers[signum] = signal.signal(signum, forward)
+
+        try:
+            env_vars = reload()
+            try:
+                process = start(env_vars)
+            except FileNotFoundError:
+                print(f"Command not found: {command[0]}", file=sys.stderr)
+                return 127
+
+            exit_reported = False
+            while True:
+                changed = watcher.wait()
+
+                if state["stopping"]:
+                    try:
+                        process.wait(STOP_TIMEOUT)
+                    except subprocess.TimeoutExpired:
+                        _stop_process(process)
+                    return _exit_code(process.returncode)
+
+                if not changed:
+                    if process.poll() is not None and not exit_reported:
+                        print(
+                            f"dirdotenv: command exited with code {process.returncode}, "
+                            "waiting for changes",
+                            file=sys.stderr,
+                        )
+                        exit_reported = True
+                    continue
+
+                new_vars = reload()
+                if new_vars == env_vars:
+                    continue
+
+                print("dirdotenv: environment changed, restarting", file=sys.stderr)
+                _stop_process(process)
+                env_vars = new_vars
+                try:
+                    process = start(env_vars)
+                except FileNotFoundError:
+                    # e.g. the new PATH no longer finds it
+                    print(f"Command not found: {command[0]}", file=sys.stderr)
+                    return 127
+                exit_reported = False
+        finally:
+            process = state["process"]
+            if process is not None:
+                _stop_process(process)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+
+__all__ = ["EnvChange", "FileWatcher", "Watcher", "exec_with_watch"]
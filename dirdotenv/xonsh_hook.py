@@ -0,0 +1,123 @@
+"""In-process integration for xonsh.
+
+xonsh runs Python, so instead of spawning `dirdotenv load` at every prompt like
+the other shell hooks, the hook imports this module and applies changes to
+$ENV directly. When nothing changed, a prompt costs a few stat calls: the env
+file candidates and the files the last load sourced or watched from .envrc.
+"""
+
+import os
+import sys
+from typing import Optional, Tuple
+
+from dirdotenv.cache import EnvCache, stat_fingerprint
+from dirdotenv.loader import env_file_candidates, get_loaded_keys, get_unloaded_keys
+from dirdotenv.trust import Allowlist, find_untrusted, trust_required
+
+
+class XonshSession:
+    """
+    Tracks the variables dirdotenv manages in one xonsh session.
+
+    Args:
+        env: The xonsh environment ($ENV / __xonsh__.env), or any mutable mapping
+        cache: Cache for parsed files (default: a new EnvCache)
+        stream: Where to print "+KEY -KEY" messages (default: stderr)
+    """
+
+    def __init__(self, env, cache: Optional[EnvCache] = None, stream=None):
+        self.env = env
+        self.cache = cache or EnvCache()
+        self.stream = stream
+        self.managed = {}  # key -> value dirdotenv set
+        self._state = None
+
+    def _compute_state(self, directory: str, allowlist: Optional[Allowlist]) -> Tuple:
+        candidates = env_file_candidates(directory) + self.cache.watched_files(directory)
+        # Allowing or denying a file is a change too
+        trust = allowlist.stamp() if allowlist else None
+        return (directory, trust) + tuple(stat_fingerprint(path) for path in candidates)
+
+    def update(self, directory: Optional[str] = None) -> bool:
+        """
+        Apply the environment of directory if it or its env files changed.
+
+        Args:
+            directory: Current directory (default: os.getcwd())
+
+        Returns:
+            True if the state changed and the environment was re-evaluated
+        """
+        directory = os.path.abspath(directory or os.getcwd())
+        # Only load allowed files if the user asked for it, like the other hooks
+        allowlist = Allowlist() if trust_required() else None
+        state = self._compute_state(directory, allowlist)
+        if state == self._state:
+            return False
+        self._state = state
+
+        skip, untrusted = find_untrusted(directory, allowlist) if allowlist else (set(), [])
+        new_vars, _ = self.cache.load_env_with_inheritance(
+            directory, skip=skip, allowlist=allowlist
+        )
+        # Include the files the load turned out to depend on
+        self._state = self._compute_state(directory, allowlist)
+        old_vars = {key: self.env[key] for key in self.managed if key in self.env}
+
+        loaded_keys = get_loaded_keys(old_vars, new_vars)
+        unloaded_keys = get_unloaded_keys(old_vars, new_vars)
+
+        for key in unloaded_keys:
+            del self.env[key]
+        for key in loaded_keys:
+            self.env[key] = new_vars[key]
+        self.managed = dict(new_vars)
+
+        stream = self.stream or sys.stderr
+        for filepath in untrusted:
+            print(
+                f"dirdotenv: {filepath} is not allowed, run 'dirdotenv allow {os.path.dirname(filepath)}' to load it",
+                file=stream,
+            )
+        # Files sourced by .envrc directives are allowed one by one
+        for filepath in self.cache.untrusted_files(directory):
+            print(
+                f"dirdotenv: {filepath} is not allowed, run 'dirdotenv allow {filepath}' to load it",
+                file=stream,
+            )
+        if unloaded_keys:
+            unloaded_msg = " ".join(f"-{key}" for key in sorted(unloaded_keys))
+            print(f"dirdotenv: {unloaded_msg}", file=stream)
+        if loaded_keys:
+            loaded_msg = " ".join(f"+{key}" for key in sorted(loaded_keys))
+            print(f"dirdotenv: {loaded_msg}", file=stream)
+
+        return True
+
+
+def install(env, events) -> XonshSession:
+    """
+    Register dirdotenv on xonsh's directory-change and prompt events.
+
+    Args:
+        env: The xonsh environment (__xonsh__.env)
+        events: The xonsh events object
+
+    Returns:
+        The session that applies changes
+    """
+    session = XonshSession(env)
+
+    @events.on_chdir
+    def _dirdotenv_on_chdir(olddir, newdir, **kwargs):
+        session.update(newdir)
+
+    @events.on_pre_prompt
+    def _dirdotenv_on_pre_prompt(**kwargs):
+        session.update()
+
+    session.update()
+    return session
+
+
+__all__ = ["XonshSession", "install"]
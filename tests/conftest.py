@@ -0,0 +1,16 @@
+"""Shared fixtures for the test suite."""
+
+import os
+
+import pytest
+
+
+@pytest.fixture
+def write_file():
+    """Return a function writing content to a path, creating parent directories."""
+    def write(path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    return write
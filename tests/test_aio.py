@@ -0,0 +1,115 @@
+"""Tests for the asyncio API."""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from dirdotenv import aio, loader
+
+
+def test_load_env_async():
+    """Test loading a single directory asynchronously."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("KEY1=value1\n")
+
+        result = asyncio.run(aio.load_env(tmpdir))
+        assert result == {'KEY1': 'value1'}
+
+
+def test_load_env_with_inheritance_async():
+    """Test loading with inheritance asynchronously."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("PARENT=parent\n")
+            f.write("SHARED=parent\n")
+
+        child_dir = os.path.join(tmpdir, 'child')
+        os.makedirs(child_dir)
+        with open(os.path.join(child_dir, '.env'), 'w') as f:
+            f.write("SHARED=child\n")
+
+        env_vars, dirs = asyncio.run(aio.load_env_with_inheritance(child_dir))
+        assert env_vars == {'PARENT': 'parent', 'SHARED': 'child'}
+        assert len(dirs) == 2
+
+
+def test_compute_env_state_async():
+    """Test that the async state matches the synchronous one."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("KEY=value\n")
+
+        state = asyncio.run(aio.compute_env_state(tmpdir))
+        assert state == loader.compute_env_state(os.path.abspath(tmpdir))
+
+
+def test_compute_env_state_relative_path(monkeypatch, tmp_path):
+    """Test that both APIs give the same state for a relative path."""
+    (tmp_path / '.env').write_text("KEY=value\n")
+    monkeypatch.chdir(tmp_path)
+
+    state = asyncio.run(aio.compute_env_state('.'))
+    assert state == loader.compute_env_state('.')
+    assert state == loader.compute_env_state(str(tmp_path))
+    assert not loader.has_state_changed(state, '.')
+
+
+def test_concurrent_requests_are_deduplicated(monkeypatch):
+    """Test that concurrent loads of the same directory share one load."""
+    calls = []
+    lock = threading.Lock()
+    original = loader.load_env_with_inheritance
+
+    def slow_load(current_dir):
+        with lock:
+            calls.append(current_dir)
+        time.sleep(0.05)
+        return original(current_dir)
+
+    monkeypatch.setattr(loader, 'load_env_with_inheritance', slow_load)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("KEY=value\n")
+
+        async def run():
+            return await asyncio.gather(
+                *(aio.load_env_with_inheritance(tmpdir) for _ in range(5))
+            )
+
+        results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(env_vars == {'KEY': 'value'} for env_vars, _ in results)
+    # Each caller gets its own copy
+    results[0][0]['KEY'] = 'changed'
+    assert results[1][0]['KEY'] == 'value'
+
+
+def test_load_many():
+    """Test gathering many directories keeps the input order."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dirs = []
+        for i in range(3):
+            directory = os.path.join(tmpdir, f'dir{i}')
+            os.makedirs(directory)
+            with open(os.path.join(directory, '.env'), 'w') as f:
+                f.write(f"INDEX={i}\n")
+            dirs.append(directory)
+
+        results = asyncio.run(aio.load_many(dirs))
+        assert [env['INDEX'] for env in results] == ['0', '1', '2']
+
+        results = asyncio.run(aio.load_many(dirs, inherit=False))
+        assert [env['INDEX'] for env in results] == ['0', '1', '2']
+
+
+def test_set_max_workers_rejects_zero():
+    """Test that the executor bound must be positive."""
+    with pytest.raises(ValueError):
+        aio.set_max_workers(0)
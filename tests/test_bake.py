@@ -0,0 +1,159 @@
+"""Tests for baked environment artifacts."""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from dirdotenv.bake import bake, dumps, is_fresh, loads, read_bake, write_bake
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def default_file_names(monkeypatch):
+    monkeypatch.delenv('DIRDOTENV_FILES', raising=False)
+    monkeypatch.delenv('DIRDOTENV_PROFILE', raising=False)
+
+
+def test_bake_round_trip(write_file):
+    """Test that an artifact holds the inherited environment and survives serialization."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        child = os.path.join(tmpdir, 'app')
+        write_file(os.path.join(tmpdir, '.env'), "BASE=https://internal\nLEVEL=root\n")
+        write_file(os.path.join(child, '.envrc'), 'export URL="${BASE}/app"\nwatch_file VERSION\n')
+        write_file(os.path.join(child, '.env'), "LEVEL=app\n")
+
+        baked = bake(child)
+        assert baked.env_vars == {'BASE': 'https://internal', 'LEVEL': 'app', 'URL': 'https://internal/app'}
+        assert (os.path.join(child, 'VERSION'), None) in baked.files
+        assert loads(dumps(baked)) == baked
+        assert is_fresh(baked)
+
+
+def test_changed_and_added_files_make_the_artifact_stale(monkeypatch, write_file):
+    """Test that changed and added files make the artifact stale, removed ones only when strict."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        child = os.path.join(tmpdir, 'app')
+        output = os.path.join(tmpdir, 'out', 'env.bake')
+        write_file(os.path.join(child, '.env'), "A=1\n")
+        write_bake(child, output)
+        assert is_fresh(read_bake(output))
+
+        # Rewritten with the same content: still fresh
+        os.utime(os.path.join(child, '.env'), ns=(0, 0))
+        assert is_fresh(read_bake(output))
+
+        write_file(os.path.join(child, '.env'), "A=2\n")
+        assert not is_fresh(read_bake(output))
+
+        write_bake(child, output)
+        write_file(os.path.join(tmpdir, '.env'), "B=2\n")
+        assert not is_fresh(read_bake(output))
+
+        write_bake(child, output)
+        os.remove(os.path.join(tmpdir, '.env'))
+        assert is_fresh(read_bake(output))
+        assert not is_fresh(read_bake(output), strict=True)
+
+        write_bake(child, output)
+        monkeypatch.setenv('DIRDOTENV_PROFILE', 'prod')
+        assert not is_fresh(read_bake(output))
+
+
+def test_invalid_artifacts():
+    """Test that other files and other versions are refused."""
+    with pytest.raises(ValueError):
+        loads('{"format": "something-else"}')
+    with pytest.raises(ValueError):
+        loads(json.dumps({'format': 'dirdotenv-bake', 'version': 99}))
+    with pytest.raises(ValueError):
+        loads(json.dumps({'format': 'dirdotenv-bake', 'version': 1}))
+    with pytest.raises(ValueError):
+        loads('not json')
+
+
+def test_cli_bake_and_from_bake(write_file):
+    """Test baking with the CLI and running a command from the artifact."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_file(os.path.join(tmpdir, '.env'), "BAKED=yes\n")
+        output = os.path.join(tmpdir, 'env.bake')
+        env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'bake', tmpdir, '-o', output],
+            capture_output=True,
+            text=True,
+            env=env
+        )
+        assert result.returncode == 0
+        assert 'baked 1 variables from 1 files' in result.stderr
+
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', '--from-bake', output, '--exec',
+             sys.executable, '-c', 'import os; print(os.environ["BAKED"])'],
+            capture_output=True,
+            text=True,
+            env=env
+        )
+        assert result.returncode == 0
+        assert result.stdout.strip() == 'yes'
+        assert result.stderr == ''
+
+        write_file(os.path.join(tmpdir, '.env'), "BAKED=changed\n")
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', '--from-bake', output, '--format', 'json'],
+            capture_output=True,
+            text=True,
+            env=env
+        )
+        assert json.loads(result.stdout) == {'BAKED': 'changed'}
+        assert 'out of date' in result.stderr
+
+
+def test_cli_from_bake_without_sources(tmp_path):
+    """Test that an artifact is used when the sources were not shipped, and --strict fails."""
+    source = tmp_path / 'src'
+    source.mkdir()
+    (source / '.env').write_text("BAKED=yes\n")
+    output = str(tmp_path / 'env.bake')
+    write_bake(str(source), output)
+    (source / '.env').unlink()
+    source.rmdir()
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+
+    def run(*args):
+        return subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', '--from-bake', output, *args],
+            capture_output=True,
+            text=True,
+            env=env
+        )
+
+    result = run('--exec', sys.executable, '-c', 'import os; print(os.environ["BAKED"])')
+    assert result.returncode == 0
+    assert result.stdout.strip() == 'yes'
+
+    result = run('--strict', '--exec', sys.executable, '-c', 'print("ran")')
+    assert result.returncode == 1
+    assert 'no variables found' in result.stderr
+    assert 'ran' not in result.stdout
+
+
+def test_cli_from_bake_runs_command_with_empty_environment(tmp_path):
+    """Test that --exec runs the command even if the baked environment is empty."""
+    (tmp_path / 'empty').mkdir()
+    output = str(tmp_path / 'env.bake')
+    write_bake(str(tmp_path / 'empty'), output)
+
+    result = subprocess.run(
+        [sys.executable, '-m', 'dirdotenv', '--from-bake', output, '--exec', sys.executable, '-c', 'print("ran")'],
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONPATH=PACKAGE_ROOT)
+    )
+    assert result.returncode == 0
+    assert result.stdout.strip() == 'ran'
@@ -0,0 +1,188 @@
+"""Tests for the thread-safe env file cache."""
+
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from dirdotenv import parser
+from dirdotenv.cache import EnvCache, stat_fingerprint
+
+
+def test_stat_fingerprint_missing_file():
+    """Test that missing files have no fingerprint."""
+    assert stat_fingerprint('/nonexistent/path/.env') is None
+
+
+def test_parse_file_hit_and_miss():
+    """Test that unchanged files are served from the cache."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        with open(env_file, 'w') as f:
+            f.write("KEY=value\n")
+
+        cache = EnvCache()
+        assert cache.parse_file(env_file, 'env') == {'KEY': 'value'}
+        assert cache.parse_file(env_file, 'env') == {'KEY': 'value'}
+
+        stats = cache.stats()
+        assert stats.misses == 1
+        assert stats.hits == 1
+        assert stats.size == 1
+
+
+def test_parse_file_invalidated_on_change():
+    """Test that a modified file is re-parsed."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        with open(env_file, 'w') as f:
+            f.write("KEY=value\n")
+
+        cache = EnvCache()
+        cache.parse_file(env_file, 'env')
+
+        with open(env_file, 'w') as f:
+            f.write("KEY=new_value\n")
+
+        assert cache.parse_file(env_file, 'env') == {'KEY': 'new_value'}
+        assert cache.stats().misses == 2
+
+
+def test_cached_values_are_copies():
+    """Test that mutating a returned dict does not corrupt the cache."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        with open(env_file, 'w') as f:
+            f.write("KEY=value\n")
+
+        cache = EnvCache()
+        cache.parse_file(env_file, 'env')['KEY'] = 'mutated'
+        assert cache.parse_file(env_file, 'env') == {'KEY': 'value'}
+
+
+def test_lru_eviction():
+    """Test that the least recently used entry is evicted."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = []
+        for i in range(3):
+            env_file = os.path.join(tmpdir, f'{i}.env')
+            with open(env_file, 'w') as f:
+                f.write(f"KEY={i}\n")
+            files.append(env_file)
+
+        cache = EnvCache(max_size=2)
+        cache.parse_file(files[0], 'env')
+        cache.parse_file(files[1], 'env')
+        cache.parse_file(files[0], 'env')  # files[1] is now least recently used
+        cache.parse_file(files[2], 'env')
+
+        stats = cache.stats()
+        assert stats.evictions == 1
+        assert stats.size == 2
+
+        cache.parse_file(files[0], 'env')
+        assert cache.stats().hits == 2
+
+
+def test_single_flight(monkeypatch):
+    """Test that concurrent threads parse a file only once."""
+    calls = []
+    original = parser.parse_env_file
+
+    def slow_parse(filepath):
+        calls.append(filepath)
+        time.sleep(0.05)
+        return original(filepath)
+
+    monkeypatch.setattr(parser, 'parse_env_file', slow_parse)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        with open(env_file, 'w') as f:
+            f.write("KEY=value\n")
+
+        cache = EnvCache()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.parse_file(env_file, 'env')))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(calls) == 1
+    assert results == [{'KEY': 'value'}] * 8
+    assert cache.stats().misses == 1
+    assert cache.stats().hits == 7
+
+
+def test_load_env_with_inheritance_cached():
+    """Test that cached inheritance matches the uncached loader."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, '.envrc'), 'w') as f:
+            f.write("export PARENT=parent\n")
+            f.write("export SHARED=envrc\n")
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("SHARED=env\n")
+
+        child_dir = os.path.join(tmpdir, 'child')
+        os.makedirs(child_dir)
+        with open(os.path.join(child_dir, '.env'), 'w') as f:
+            f.write("CHILD=child\n")
+
+        cache = EnvCache()
+        env_vars, dirs = cache.load_env_with_inheritance(child_dir)
+        assert env_vars == {'PARENT': 'parent', 'SHARED': 'env', 'CHILD': 'child'}
+        assert len(dirs) == 2
+
+        cache.load_env_with_inheritance(child_dir)
+        assert cache.stats().hits == 1
+
+
+def test_envrc_with_directives_is_not_cached(tmp_path):
+    """Test that an .envrc sourcing another file sees changes of that file."""
+    (tmp_path / '.envrc').write_text("dotenv .env.shared\nexport OWN=1\n")
+    shared = tmp_path / '.env.shared'
+    shared.write_text("SHARED=1\n")
+
+    cache = EnvCache()
+    assert cache.load_env(str(tmp_path)) == {'SHARED': '1', 'OWN': '1'}
+    assert cache.load_env_with_inheritance(str(tmp_path))[0] == {'SHARED': '1', 'OWN': '1'}
+    assert cache.watched_files(str(tmp_path)) == [str(shared)]
+
+    shared.write_text("SHARED=22\n")
+    assert cache.load_env(str(tmp_path)) == {'SHARED': '22', 'OWN': '1'}
+    assert cache.load_env_with_inheritance(str(tmp_path))[0] == {'SHARED': '22', 'OWN': '1'}
+    assert cache.stats().hits == 0
+    assert cache.stats().size == 0
+
+
+def test_nested_path_add_matches_loader(tmp_path, monkeypatch):
+    """Test that a child .envrc builds on the PATH its parent .envrc set."""
+    from dirdotenv.loader import load_env_tree
+
+    monkeypatch.setenv('PATH', '/usr/bin')
+    child = tmp_path / 'child'
+    child.mkdir()
+    (tmp_path / '.envrc').write_text("PATH_add pbin\n")
+    (child / '.envrc').write_text("PATH_add cbin\n")
+
+    expected = load_env_tree(str(child)).env_vars
+    assert expected['PATH'] == os.pathsep.join(
+        [str(child / 'cbin'), str(tmp_path / 'pbin'), '/usr/bin']
+    )
+    cache = EnvCache()
+    assert cache.load_env_with_inheritance(str(child))[0] == expected
+    assert cache.load_env_with_inheritance(str(child))[0] == expected
+
+
+def test_invalid_arguments():
+    """Test validation of cache arguments."""
+    with pytest.raises(ValueError):
+        EnvCache(max_size=0)
+    with pytest.raises(ValueError):
+        EnvCache().parse_file('.env', 'yaml')
@@ -0,0 +1,123 @@
+"""Tests for env file validation."""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+from dirdotenv import check
+from dirdotenv.check import check_file, check_paths, find_env_files
+
+
+def test_find_env_files_skips_excluded_dirs(write_file):
+    """Test discovery of env files, skipping excluded directories."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_file(os.path.join(tmpdir, '.env'), "A=1\n")
+        write_file(os.path.join(tmpdir, 'pkg', '.envrc'), "export B=2\n")
+        write_file(os.path.join(tmpdir, 'node_modules', 'dep', '.env'), "C=3\n")
+        write_file(os.path.join(tmpdir, 'pkg', 'other.txt'), "D=4\n")
+
+        result = sorted(find_env_files(tmpdir))
+        assert result == [
+            os.path.join(tmpdir, '.env'),
+            os.path.join(tmpdir, 'pkg', '.envrc'),
+        ]
+
+
+def test_check_file_valid(write_file):
+    """Test that a valid file has no diagnostics."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        write_file(env_file, "# comment\nKEY='value'\nOTHER=\"x\"  # note\n\nPORT=8080\n")
+
+        diagnostics, keys = check_file(env_file)
+        assert diagnostics == []
+        assert keys == {'KEY': 2, 'OTHER': 3, 'PORT': 5}
+
+
+def test_check_file_problems(write_file):
+    """Test detection of unparseable lines, unbalanced quotes and duplicates."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        write_file(env_file, "KEY=value\nnot a line\nQUOTED=\"open\nKEY=again\n")
+
+        diagnostics, _ = check_file(env_file)
+        lines = [(d.line, d.severity) for d in diagnostics]
+        assert lines == [(2, 'error'), (3, 'error'), (4, 'error')]
+        assert 'unparseable' in diagnostics[0].message
+        assert 'unbalanced' in diagnostics[1].message
+        assert 'duplicate key KEY' in diagnostics[2].message
+        assert diagnostics[0].format().startswith(f"{env_file}:2: error:")
+
+
+def test_check_file_envrc_syntax(write_file):
+    """Test that .envrc files require export statements or supported directives."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        envrc_file = os.path.join(tmpdir, '.envrc')
+        write_file(envrc_file, "export KEY=value\nKEY=value\nPATH_add bin\nsource_up\n")
+
+        diagnostics, _ = check_file(envrc_file)
+        assert [d.line for d in diagnostics] == [2]
+        assert 'export KEY=value' in diagnostics[0].message
+
+
+def test_check_paths_shadowed_keys(write_file):
+    """Test that keys overriding a parent definition are reported as warnings."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        parent_env = os.path.join(tmpdir, '.env')
+        child_env = os.path.join(tmpdir, 'child', '.env')
+        write_file(parent_env, "SHARED=parent\n")
+        write_file(child_env, "OWN=child\nSHARED=child\n")
+
+        diagnostics, file_count = check_paths([tmpdir])
+        assert file_count == 2
+        assert len(diagnostics) == 1
+        assert diagnostics[0].severity == 'warning'
+        assert diagnostics[0].path == os.path.abspath(child_env)
+        assert diagnostics[0].line == 2
+        assert f"{os.path.abspath(parent_env)}:1" in diagnostics[0].message
+
+
+def test_check_paths_parallel(monkeypatch, write_file):
+    """Test that the process pool gives the same results as the serial path."""
+    monkeypatch.setattr(check, 'PARALLEL_THRESHOLD', 2)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i in range(4):
+            write_file(os.path.join(tmpdir, f'pkg{i}', '.env'), "OK=1\nbroken\n")
+
+        parallel, _ = check_paths([tmpdir], jobs=2)
+        serial, _ = check_paths([tmpdir], jobs=1)
+        assert parallel == serial
+        assert len(parallel) == 4
+
+
+def test_cli_check_exit_codes(write_file):
+    """Test that check exits non-zero only when errors are found."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_file(os.path.join(tmpdir, '.env'), "KEY=value\n")
+
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'check', tmpdir],
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 0
+        assert 'checked 1 files' in result.stderr
+
+        write_file(os.path.join(tmpdir, 'sub', '.env'), "KEY='oops\n")
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'check', tmpdir],
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 1
+        assert 'unbalanced' in result.stdout
+
+        write_file(os.path.join(tmpdir, 'sub', '.env'), "KEY=override\n")
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'check', '--strict', tmpdir],
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 1
+        assert 'shadows' in result.stdout
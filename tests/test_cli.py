@@ -6,6 +6,9 @@ import tempfile
 import sys
 
 
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
 def test_cli_with_env_file():
     """Test CLI with .env file."""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -87,3 +90,98 @@ def test_cli_help():
     assert result.returncode == 0
     assert "usage:" in result.stdout or "usage:" in result.stderr
     assert "--export" in result.stdout or "--export" in result.stderr
+
+
+def test_cli_load_script_file():
+    """Test that load --script-file writes the script and prints only its path."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = os.path.join(tmpdir, 'project')
+        runtime_dir = os.path.join(tmpdir, 'runtime')
+        os.makedirs(project)
+        with open(os.path.join(project, '.env'), 'w') as f:
+            f.write("API_KEY=secret\n")
+
+        env = dict(os.environ, DIRDOTENV_RUNTIME_DIR=runtime_dir, PYTHONPATH=PACKAGE_ROOT)
+        env.pop('_DIRDOTENV_STATE', None)
+        env.pop('_DIRDOTENV_KEYS', None)
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'load', '--shell', 'bash', '--script-file'],
+            capture_output=True,
+            text=True,
+            cwd=project,
+            env=env
+        )
+
+        assert result.returncode == 0
+        script_path = result.stdout.strip()
+        assert os.path.dirname(script_path) == runtime_dir
+        assert result.stderr.strip() == 'dirdotenv: +API_KEY'
+
+        with open(script_path) as f:
+            script = f.read()
+        assert "export API_KEY='secret'" in script
+        assert 'echo' not in script
+
+
+def test_cli_load_script_file_refuses_shared_dir():
+    """Test that a runtime directory writable by others is not used."""
+    if not hasattr(os, 'getuid'):
+        return
+    with tempfile.TemporaryDirectory() as tmpdir:
+        runtime_dir = os.path.join(tmpdir, 'runtime')
+        os.makedirs(runtime_dir)
+        os.chmod(runtime_dir, 0o777)
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("API_KEY=secret\n")
+
+        env = dict(os.environ, DIRDOTENV_RUNTIME_DIR=runtime_dir, PYTHONPATH=PACKAGE_ROOT)
+        env.pop('_DIRDOTENV_STATE', None)
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'load', '--script-file'],
+            capture_output=True,
+            text=True,
+            cwd=tmpdir,
+            env=env
+        )
+
+        assert result.returncode == 1
+        assert result.stdout == ''
+        assert 'writable by other users' in result.stderr
+
+
+def test_cli_load_data_file():
+    """Test that load --data-file writes NUL-terminated set and unset records."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = os.path.join(tmpdir, 'project')
+        os.makedirs(project)
+        with open(os.path.join(project, '.env'), 'w') as f:
+            f.write('URL="a=b"\nQUOTE="it\'s"\n')
+
+        env = dict(
+            os.environ,
+            DIRDOTENV_RUNTIME_DIR=os.path.join(tmpdir, 'runtime'),
+            PYTHONPATH=PACKAGE_ROOT,
+            _DIRDOTENV_KEYS='OLD',
+            OLD='1'
+        )
+        env.pop('_DIRDOTENV_STATE', None)
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'load', '--shell', 'fish', '--data-file'],
+            capture_output=True,
+            text=True,
+            cwd=project,
+            env=env
+        )
+
+        assert result.returncode == 0
+        assert 'dirdotenv: -OLD' in result.stderr
+        assert 'dirdotenv: +QUOTE +URL' in result.stderr
+
+        with open(result.stdout.strip(), encoding='utf-8') as f:
+            records = f.read().split('\0')
+        assert records[-1] == ''
+        assert records[0] == 'OLD'
+        assert 'URL=a=b' in records
+        assert "QUOTE=it's" in records
+        assert '_DIRDOTENV_KEYS=QUOTE:URL' in records
+        assert records[-2].startswith('_DIRDOTENV_STATE=dir:')
@@ -0,0 +1,163 @@
+"""Tests for command substitution in .envrc values."""
+
+import os
+import tempfile
+import time
+
+import pytest
+
+from dirdotenv import commands, filehash
+from dirdotenv.envrc import evaluate_envrc
+from dirdotenv.parser import load_env
+from dirdotenv.trust import Allowlist, trust_required
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def command_cache(monkeypatch, tmp_path):
+    """Enable commands and use a private cache and allowlist for every test."""
+    monkeypatch.setenv('DIRDOTENV_ALLOW_COMMANDS', '1')
+    monkeypatch.delenv('DIRDOTENV_REQUIRE_ALLOW', raising=False)
+    monkeypatch.setenv('DIRDOTENV_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('DIRDOTENV_DATA_DIR', str(tmp_path / 'data'))
+    monkeypatch.setattr(filehash, 'default_hash_cache', None)
+    monkeypatch.setattr(commands, 'default_command_cache', None)
+
+
+def _envrc(tmpdir, content, allow=True):
+    envrc = os.path.join(tmpdir, '.envrc')
+    with open(envrc, 'w') as f:
+        f.write(content)
+    if allow:
+        Allowlist().allow(envrc)
+    return envrc
+
+
+def _runs(tmpdir):
+    with open(os.path.join(tmpdir, 'runs')) as f:
+        return len(f.readlines())
+
+
+def test_commands_are_opt_in(monkeypatch):
+    """Test that $(...) stays literal unless commands are allowed."""
+    monkeypatch.delenv('DIRDOTENV_ALLOW_COMMANDS')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        envrc = _envrc(tmpdir, "export SHA=$(echo abc)\n")
+        assert evaluate_envrc(envrc).env_vars == {'SHA': '$(echo abc)'}
+
+
+def test_commands_require_an_allowed_file(capsys):
+    """Test that commands only run from files allowed with their current content."""
+    assert trust_required()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        envrc = _envrc(tmpdir, "export SHA=$(echo abc)\n", allow=False)
+        assert evaluate_envrc(envrc).env_vars == {'SHA': '$(echo abc)'}
+        assert 'not running commands' in capsys.readouterr().err
+
+        Allowlist().allow(envrc)
+        assert evaluate_envrc(envrc).env_vars == {'SHA': 'abc'}
+
+        with open(envrc, 'a') as f:
+            f.write("export MORE=$(echo more)\n")
+        assert evaluate_envrc(envrc).env_vars == {'SHA': '$(echo abc)', 'MORE': '$(echo more)'}
+
+
+def test_hook_does_not_run_commands_of_new_files(tmp_path):
+    """Test that the hook neither loads nor runs an .envrc nobody allowed."""
+    import subprocess
+    import sys
+
+    project = tmp_path / 'project'
+    project.mkdir()
+    marker = tmp_path / 'pwned'
+    (project / '.envrc').write_text(f'export X="$(touch {marker})"\n')
+
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT, DIRDOTENV_RUNTIME_DIR=str(tmp_path / 'runtime'))
+    for key in ['_DIRDOTENV_KEYS', '_DIRDOTENV_STATE', '_DIRDOTENV_SESSION']:
+        env.pop(key, None)
+    result = subprocess.run(
+        [sys.executable, '-m', 'dirdotenv', 'load', '--shell', 'bash'],
+        capture_output=True,
+        text=True,
+        cwd=str(project),
+        env=env
+    )
+    assert result.returncode == 0
+    assert not marker.exists()
+    assert 'is not allowed' in result.stdout
+
+
+def test_substitution_and_quoting():
+    """Test that commands run in the file's directory and single quotes stay literal."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        envrc = _envrc(tmpdir, (
+            "export HERE=$(pwd)\n"
+            "export GREETING=\"hello $(echo world)\"\n"
+            "export LITERAL='$(echo no)'\n"
+            "export FAILED=$(exit 3)\n"
+        ))
+
+        env_vars = evaluate_envrc(envrc).env_vars
+        assert env_vars['HERE'] == os.path.realpath(tmpdir)
+        assert env_vars['GREETING'] == 'hello world'
+        assert env_vars['LITERAL'] == '$(echo no)'
+        assert env_vars['FAILED'] == ''
+
+
+def test_output_is_not_interpolated(monkeypatch):
+    """Test that ${...} in command output is kept, like in a shell."""
+    monkeypatch.setenv('HOME_DIR', '/home/me')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        envrc = _envrc(tmpdir, (
+            "export BASE=/srv\n"
+            "export TEMPLATE=$(echo '${HOME_DIR}/x')\n"
+            "export MIXED=\"${BASE}:$(echo '${HOME_DIR}')\"\n"
+            "export PLAIN=\"${HOME_DIR}/$(echo y)\"\n"
+        ))
+
+        assert load_env(tmpdir) == {
+            'BASE': '/srv',
+            'TEMPLATE': '${HOME_DIR}/x',
+            'MIXED': '/srv:${HOME_DIR}',
+            'PLAIN': '/home/me/y',
+        }
+
+
+def test_outputs_are_cached_until_the_file_changes(monkeypatch):
+    """Test that a command runs once per file content, across processes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        envrc = _envrc(tmpdir, "export VALUE=$(echo x >> runs; echo cached)\n")
+
+        assert evaluate_envrc(envrc).env_vars == {'VALUE': 'cached'}
+        assert evaluate_envrc(envrc).env_vars == {'VALUE': 'cached'}
+        # A new process reads the cache file
+        monkeypatch.setattr(commands, 'default_command_cache', None)
+        assert evaluate_envrc(envrc).env_vars == {'VALUE': 'cached'}
+        assert _runs(tmpdir) == 1
+
+        with open(envrc, 'a') as f:
+            f.write("export OTHER=1\n")
+        Allowlist().allow(envrc)
+        evaluate_envrc(envrc)
+        assert _runs(tmpdir) == 2
+
+
+def test_ttl_and_timeout():
+    """Test that the options comment sets the TTL and the timeout of the next export."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        envrc = _envrc(tmpdir, (
+            "# dirdotenv: ttl=0\n"
+            "export VALUE=$(echo x >> runs; echo fresh)\n"
+            "# dirdotenv: timeout=0.2\n"
+            "export SLOW=$(sleep 5; echo late)\n"
+        ))
+
+        start = time.time()
+        result = evaluate_envrc(envrc)
+        assert time.time() - start < 4
+        assert result.env_vars == {'VALUE': 'fresh', 'SLOW': ''}
+        assert result.expires is not None and result.expires <= time.time()
+
+        evaluate_envrc(envrc)
+        assert _runs(tmpdir) == 2
@@ -0,0 +1,101 @@
+"""Tests for compiled sidecars of large env files."""
+
+import os
+
+import pytest
+
+from dirdotenv import compiled
+from dirdotenv.compiled import HEADER, get_compiled_cache
+from dirdotenv.interpolate import LiteralValue
+from dirdotenv.parser import parse_env_file, parse_envrc_file
+
+
+@pytest.fixture(autouse=True)
+def compiled_cache(monkeypatch, tmp_path):
+    """Compile every file, into a temporary cache directory."""
+    monkeypatch.setenv('DIRDOTENV_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.delenv('DIRDOTENV_COMPILED_CACHE', raising=False)
+    monkeypatch.setattr(compiled, 'MIN_SIZE', 0)
+    monkeypatch.setattr(compiled, 'default_compiled_cache', None)
+
+
+def _write(path, content, mtime_ns=10**18):
+    with open(path, 'w') as f:
+        f.write(content)
+    # Older than the racy window, so the sidecar is written
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def _sidecar(path, kind):
+    return get_compiled_cache()._path(path, kind)
+
+
+def test_env_file_round_trip(tmp_path):
+    """Test that a sidecar gives the same variables, literal values included."""
+    env_file = _write(tmp_path / '.env', "A=1\nB='${A}'\nC=\"${A}\"\n")
+
+    parsed = parse_env_file(env_file)
+    assert os.path.exists(_sidecar(env_file, 'env'))
+
+    loaded = get_compiled_cache().load(env_file, 'env', os.stat(env_file))
+    assert loaded == parsed == {'A': '1', 'B': '${A}', 'C': '${A}'}
+    assert type(loaded['B']) is LiteralValue
+    assert type(loaded['C']) is str
+    assert parse_env_file(env_file) == parsed
+
+
+def test_changed_file_and_header_rebuild(tmp_path):
+    """Test that sidecars of another file version or format version are rebuilt."""
+    env_file = _write(tmp_path / '.env', "A=1\n")
+    assert parse_env_file(env_file) == {'A': '1'}
+
+    _write(env_file, "A=2\n", mtime_ns=15 * 10**17)
+    assert parse_env_file(env_file) == {'A': '2'}
+
+    sidecar = _sidecar(env_file, 'env')
+    with open(sidecar, 'rb') as f:
+        data = f.read()
+    with open(sidecar, 'wb') as f:
+        f.write(b'DDENVC\x00' + data[len(HEADER) - 1:])
+    assert get_compiled_cache().load(env_file, 'env', os.stat(env_file)) is None
+
+    assert parse_env_file(env_file) == {'A': '2'}
+    with open(sidecar, 'rb') as f:
+        assert f.read().startswith(HEADER)
+
+
+def test_recent_files_are_not_compiled(tmp_path):
+    """Test that a file modified within the racy window gets no sidecar."""
+    env_file = tmp_path / '.env'
+    env_file.write_text("A=1\n")
+
+    assert parse_env_file(str(env_file)) == {'A': '1'}
+    assert not os.path.exists(_sidecar(str(env_file), 'env'))
+
+
+def test_envrc_only_compiled_without_directives(tmp_path, monkeypatch):
+    """Test that .envrc files with directives or commands are always evaluated."""
+    plain = _write(tmp_path / 'plain.envrc', "export A=1\nexport B='$(x)'\n")
+    directives = _write(tmp_path / 'path.envrc', "export A=1\nPATH_add bin\n")
+
+    assert parse_envrc_file(plain) == {'A': '1', 'B': '$(x)'}
+    assert not os.path.exists(_sidecar(plain, 'envrc'))
+
+    plain = _write(tmp_path / 'plain.envrc', "export A=1\nexport B=2\n")
+    assert parse_envrc_file(plain) == {'A': '1', 'B': '2'}
+    assert os.path.exists(_sidecar(plain, 'envrc'))
+    assert parse_envrc_file(plain) == {'A': '1', 'B': '2'}
+
+    monkeypatch.setenv('PATH', '/usr/bin')
+    assert parse_envrc_file(directives)['PATH'].endswith('/usr/bin')
+    assert not os.path.exists(_sidecar(directives, 'envrc'))
+
+
+def test_disabled(tmp_path, monkeypatch):
+    """Test that DIRDOTENV_COMPILED_CACHE=0 turns sidecars off."""
+    monkeypatch.setenv('DIRDOTENV_COMPILED_CACHE', '0')
+    env_file = _write(tmp_path / '.env', "A=1\n")
+
+    assert parse_env_file(env_file) == {'A': '1'}
+    assert not os.path.exists(_sidecar(env_file, 'env'))
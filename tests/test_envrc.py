@@ -0,0 +1,115 @@
+"""Tests for the native evaluation of direnv directives in .envrc files."""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+from dirdotenv.envrc import evaluate_envrc
+from dirdotenv.loader import compute_env_state, has_state_changed, load_env_tree
+from dirdotenv.parser import parse_envrc_file
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_dotenv_and_source_env(write_file):
+    """Test that dotenv and source_env load other files relative to the .envrc."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        envrc = os.path.join(tmpdir, '.envrc')
+        write_file(os.path.join(tmpdir, '.env.shared'), "SHARED=1\n")
+        write_file(os.path.join(tmpdir, 'config', '.envrc'), "export CONFIG=2\n")
+        write_file(envrc, (
+            "dotenv .env.shared\n"
+            "dotenv_if_exists .env.missing\n"
+            "source_env config\n"
+            "export OWN=3\n"
+        ))
+
+        result = evaluate_envrc(envrc, environ={})
+        assert result.env_vars == {'SHARED': '1', 'CONFIG': '2', 'OWN': '3'}
+        assert result.watched == [
+            os.path.join(tmpdir, '.env.shared'),
+            os.path.join(tmpdir, '.env.missing'),
+            os.path.join(tmpdir, 'config', '.envrc'),
+        ]
+
+
+def test_source_up_and_self_reference(write_file):
+    """Test that source_up finds a parent .envrc and sourcing a file from itself stops."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_file(os.path.join(tmpdir, '.envrc'), "export PARENT=1\n")
+        child = os.path.join(tmpdir, 'child', '.envrc')
+        write_file(child, "source_up\nsource_env .envrc\nexport CHILD=2\n")
+
+        assert parse_envrc_file(child) == {'PARENT': '1', 'CHILD': '2'}
+
+
+def test_path_add_deduplicates(write_file):
+    """Test that PATH_add and path_add prepend directories without duplicates."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        envrc = os.path.join(tmpdir, '.envrc')
+        write_file(envrc, "PATH_add bin node_modules/.bin\npath_add PYTHONPATH src\nPATH_add bin\n")
+        bin_dir = os.path.join(tmpdir, 'bin')
+        node_dir = os.path.join(tmpdir, 'node_modules', '.bin')
+
+        environ = {'PATH': os.pathsep.join(['/usr/bin', bin_dir])}
+        result = evaluate_envrc(envrc, environ)
+
+        assert result.env_vars['PATH'] == os.pathsep.join([bin_dir, node_dir, '/usr/bin'])
+        assert result.env_vars['PYTHONPATH'] == os.path.join(tmpdir, 'src')
+        assert result.path_additions == {
+            'PATH': [bin_dir, node_dir],
+            'PYTHONPATH': [os.path.join(tmpdir, 'src')],
+        }
+
+
+def test_watched_file_changes_state(write_file):
+    """Test that a change to a watched file (or its creation) changes the state."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_file(os.path.join(tmpdir, '.envrc'), "watch_file VERSION\n")
+
+        result = load_env_tree(tmpdir)
+        state = compute_env_state(tmpdir, result.watched, result.path_additions)
+        assert not has_state_changed(state, tmpdir)
+
+        write_file(os.path.join(tmpdir, 'VERSION'), "1.0\n")
+        assert has_state_changed(state, tmpdir)
+
+
+def test_cli_path_add_is_undone_when_leaving(write_file):
+    """Test that leaving a directory restores PATH instead of unsetting it."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = os.path.join(tmpdir, 'project')
+        write_file(os.path.join(project, '.envrc'), "PATH_add bin\n")
+        bin_dir = os.path.join(os.path.realpath(project), 'bin')
+
+        env = dict(
+            os.environ,
+            DIRDOTENV_RUNTIME_DIR=os.path.join(tmpdir, 'runtime'),
+            PYTHONPATH=PACKAGE_ROOT
+        )
+        for key in ['_DIRDOTENV_KEYS', '_DIRDOTENV_STATE', '_DIRDOTENV_SESSION']:
+            env.pop(key, None)
+        original_path = env['PATH']
+
+        def load(cwd):
+            result = subprocess.run(
+                [sys.executable, '-m', 'dirdotenv', 'load', '--shell', 'fish', '--data-file'],
+                capture_output=True,
+                text=True,
+                cwd=cwd,
+                env=env
+            )
+            with open(result.stdout.strip()) as f:
+                for record in f.read().split('\0')[:-1]:
+                    key, sep, value = record.partition('=')
+                    if sep:
+                        env[key] = value
+                    else:
+                        env.pop(key, None)
+
+        load(project)
+        assert env['PATH'] == os.pathsep.join([bin_dir, original_path])
+
+        load(tmpdir)
+        assert env['PATH'] == original_path
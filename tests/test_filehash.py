@@ -0,0 +1,175 @@
+"""Tests for content-hash change detection."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+from dirdotenv import filehash
+from dirdotenv.loader import check_state, compute_env_state, has_state_changed
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def hash_cache_dir(monkeypatch, tmp_path):
+    """Use a private hash cache for every test."""
+    monkeypatch.setenv('DIRDOTENV_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(filehash, 'default_hash_cache', None)
+    return tmp_path / 'cache'
+
+
+def _write_old(path, content):
+    """Write a file with an mtime outside the racy window."""
+    with open(path, 'w') as f:
+        f.write(content)
+    old_time = time.time() - 60
+    os.utime(path, (old_time, old_time))
+
+
+def test_touch_is_not_a_change():
+    """Test that a new mtime with identical content does not change the state."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        _write_old(env_file, "KEY=value\n")
+        state = compute_env_state(tmpdir)
+
+        os.utime(env_file)
+
+        assert not has_state_changed(state, tmpdir)
+
+
+def test_touched_files_refresh_the_state(hash_cache_dir):
+    """Test that a rewrite with the same content refreshes the state, and load emits it."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = os.path.realpath(tmpdir)
+        env_file = os.path.join(tmpdir, '.env')
+        _write_old(env_file, "KEY=value\n")
+        state = compute_env_state(tmpdir)
+        assert check_state(state, tmpdir) == (False, None)
+
+        os.utime(env_file, (time.time() - 30, time.time() - 30))
+        changed, refreshed = check_state(state, tmpdir)
+        assert not changed
+        assert refreshed == compute_env_state(tmpdir) != state
+        assert check_state(refreshed, tmpdir) == (False, None)
+
+        env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT, _DIRDOTENV_STATE=state, _DIRDOTENV_KEYS='KEY', KEY='value')
+        env['DIRDOTENV_CACHE_DIR'] = str(hash_cache_dir)
+        env.pop('_DIRDOTENV_SESSION', None)
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'load', '--shell', 'bash'],
+            capture_output=True,
+            text=True,
+            cwd=tmpdir,
+            env=env
+        )
+        assert result.returncode == 0
+        assert result.stdout.strip() == f"export _DIRDOTENV_STATE='{refreshed}'"
+        assert result.stderr == ''
+
+
+def test_checkout_rewrite_is_not_a_change():
+    """Test that replacing a file by an identical copy (new inode) does not change the state."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        _write_old(env_file, "KEY=value\n")
+        state = compute_env_state(tmpdir)
+
+        # git checkout writes a new file and renames it over the old one
+        new_file = os.path.join(tmpdir, '.env.tmp')
+        with open(new_file, 'w') as f:
+            f.write("KEY=value\n")
+        os.replace(new_file, env_file)
+
+        assert not has_state_changed(state, tmpdir)
+
+
+def test_content_change_is_detected():
+    """Test that changed content changes the state, even with the same size."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        _write_old(env_file, "KEY=value\n")
+        state = compute_env_state(tmpdir)
+
+        with open(env_file, 'w') as f:
+            f.write("KEY=other\n")
+
+        assert has_state_changed(state, tmpdir)
+
+
+def test_old_state_format_is_compared_as_string():
+    """Test that a state written by an older version is not misparsed."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        _write_old(env_file, "KEY=value\n")
+
+        assert has_state_changed(f"dir:{tmpdir};{env_file}:1700000000.5", tmpdir)
+
+
+def test_unchanged_file_is_not_read(monkeypatch):
+    """Test that matching mtime and size skip hashing entirely."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _write_old(os.path.join(tmpdir, '.env'), "KEY=value\n")
+        state = compute_env_state(tmpdir)
+
+        def fail(filepath):
+            raise AssertionError(f"{filepath} was read")
+
+        monkeypatch.setattr(filehash, 'hash_file', fail)
+        assert not has_state_changed(state, tmpdir)
+
+
+def test_hash_cache_is_persisted(monkeypatch, hash_cache_dir):
+    """Test that a cached hash is reused by a new process without reading the file."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        _write_old(env_file, "KEY=value\n")
+        digest = filehash.file_digest(env_file)
+        assert (hash_cache_dir / 'hashes').exists()
+
+        def fail(filepath):
+            raise AssertionError(f"{filepath} was read")
+
+        monkeypatch.setattr(filehash, 'hash_file', fail)
+        assert filehash.HashCache().digest(env_file) == digest
+
+
+def test_recently_modified_file_is_not_cached(hash_cache_dir):
+    """Test that hashes of files inside the racy window are not stored."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        with open(env_file, 'w') as f:
+            f.write("KEY=value\n")
+
+        filehash.file_digest(env_file)
+        assert not (hash_cache_dir / 'hashes').exists()
+
+
+def test_hash_cache_appends_and_compacts(monkeypatch, tmp_path):
+    """Test that new hashes are appended and the file is compacted when it grows."""
+    monkeypatch.setattr(filehash, 'MAX_ENTRIES', 2)
+    cache_file = tmp_path / 'hashes'
+    cache = filehash.HashCache(str(cache_file))
+
+    files = []
+    for i in range(5):
+        path = str(tmp_path / f'{i}.env')
+        _write_old(path, f"KEY={i}\n")
+        files.append(path)
+        cache.digest(path)
+        if i < 3:
+            assert len(cache_file.read_text().splitlines()) == i + 1
+
+    # Compacted at the 5th entry, keeping the newest two
+    lines = cache_file.read_text().splitlines()
+    assert len(lines) == 2
+    assert filehash.HashCache(str(cache_file)).digest(files[4]) == filehash.hash_file(files[4])
+
+    with open(cache_file, 'a') as f:
+        f.write("1 2 torn\n")
+    reloaded = filehash.HashCache(str(cache_file))
+    assert len(reloaded._load()) == 2
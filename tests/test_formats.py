@@ -0,0 +1,134 @@
+"""Tests for machine-readable output formats."""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from dirdotenv.formats import write_env
+
+
+ENV_VARS = {'URL': 'postgres://a b', 'QUOTE': 'it\'s "x" $HOME'}
+
+
+def _render(fmt, directory=None):
+    stream = io.StringIO()
+    write_env(ENV_VARS, fmt, stream, directory=directory)
+    return stream.getvalue()
+
+
+def test_json():
+    """Test that json output is a single object."""
+    assert json.loads(_render('json')) == ENV_VARS
+
+
+def test_ndjson():
+    """Test that ndjson output is one record per directory."""
+    line = _render('ndjson', directory='/srv/app')
+    assert line.endswith('\n') and line.count('\n') == 1
+    assert json.loads(line) == {'directory': '/srv/app', 'env': ENV_VARS}
+
+
+def test_env0():
+    """Test that env0 output is NUL-terminated KEY=VALUE records."""
+    output = _render('env0')
+    assert output.split('\0') == ['URL=postgres://a b', 'QUOTE=it\'s "x" $HOME', '']
+
+
+def test_dotenv_round_trips_through_parser():
+    """Test that dotenv output is parsed back to the same values."""
+    from dirdotenv.parser import parse_env_file
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        with open(env_file, 'w') as f:
+            f.write(_render('dotenv'))
+
+        assert parse_env_file(env_file) == ENV_VARS
+
+
+def test_systemd_escapes():
+    """Test that systemd output escapes quotes, backslashes and dollars."""
+    assert _render('systemd') == (
+        'URL="postgres://a b"\n'
+        'QUOTE="it\'s \\"x\\" \\$HOME"\n'
+    )
+
+
+def test_line_breaks_stay_in_one_record():
+    """Test that values with line breaks are escaped in dotenv and quoted in systemd."""
+    env_vars = {'CERT': 'line 1\nline "2"\\', 'NEXT': 'x'}
+
+    stream = io.StringIO()
+    write_env(env_vars, 'dotenv', stream)
+    assert stream.getvalue() == 'CERT="line 1\\nline \\"2\\"\\\\"\nNEXT=\'x\'\n'
+
+    stream = io.StringIO()
+    write_env(env_vars, 'systemd', stream)
+    assert stream.getvalue() == 'CERT="line 1\nline \\"2\\"\\\\"\nNEXT="x"\n'
+
+
+def test_unknown_format():
+    """Test that an unknown format is rejected."""
+    with pytest.raises(ValueError):
+        _render('xml')
+
+
+def test_cli_format_reads_directories_from_stdin():
+    """Test that --format ndjson with '-' streams one record per directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        first = os.path.join(tmpdir, 'first')
+        second = os.path.join(tmpdir, 'second')
+        os.makedirs(first)
+        os.makedirs(second)
+        with open(os.path.join(first, '.env'), 'w') as f:
+            f.write("NAME=first\n")
+
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', '-', '--format', 'ndjson'],
+            input=f"{first}\n{second}\n",
+            capture_output=True,
+            text=True
+        )
+
+        assert result.returncode == 0
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert records == [
+            {'directory': first, 'env': {'NAME': 'first'}},
+            {'directory': second, 'env': {}},
+        ]
+
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', '-', '--format', 'json'],
+            input=first,
+            capture_output=True,
+            text=True
+        )
+        assert result.returncode == 1
+
+
+def test_cli_load_format_includes_inherited_variables():
+    """Test that load --format prints the inherited environment."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        child = os.path.join(tmpdir, 'child')
+        os.makedirs(child)
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("PARENT=1\n")
+        with open(os.path.join(child, '.env'), 'w') as f:
+            f.write("CHILD=2\n")
+
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'load', '--format', 'env0'],
+            capture_output=True,
+            text=True,
+            cwd=child,
+            env=dict(os.environ, PYTHONPATH=package_root)
+        )
+
+        assert result.returncode == 0
+        assert sorted(result.stdout.split('\0')[:-1]) == ['CHILD=2', 'PARENT=1']
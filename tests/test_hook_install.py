@@ -0,0 +1,103 @@
+"""Tests for pre-rendered hook files (dirdotenv hook --install)."""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from dirdotenv.__version__ import __version__
+from dirdotenv.hooks import get_hook, install_hook, quote_for_shell
+
+
+SHELLS = ['bash', 'zsh', 'fish', 'powershell', 'xonsh']
+
+
+@pytest.mark.parametrize("shell", SHELLS)
+def test_installed_hook_contains_version_check_and_hook(shell):
+    """Test that the rendered file wraps the hook in a version check."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        hook_path = install_hook(shell, 'dirdotenv', os.path.join(tmpdir, 'hook'))
+        with open(hook_path) as f:
+            content = f.read()
+
+        assert '{{' not in content
+        assert __version__ in content
+        assert '__version__.py' in content
+        # The hook body is embedded, indented inside the else branch
+        first_line = next(line for line in get_hook(shell, 'dirdotenv').splitlines() if line.strip())
+        assert '    ' + first_line in content
+
+
+def test_quote_for_shell():
+    """Test quoting of values with single quotes."""
+    assert quote_for_shell("it's", 'bash') == "'it'\\''s'"
+    assert quote_for_shell("it's", 'fish') == "'it\\'s'"
+    assert quote_for_shell("it's", 'powershell') == "'it''s'"
+    assert quote_for_shell("it's", 'xonsh') == '"it\'s"'
+
+
+def test_cli_install_writes_to_data_dir():
+    """Test that --install writes to the data directory and prints the path."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ, DIRDOTENV_DATA_DIR=tmpdir)
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'hook', 'bash', '--install'],
+            capture_output=True,
+            text=True,
+            env=env
+        )
+
+        assert result.returncode == 0
+        hook_path = os.path.join(tmpdir, 'hook.bash')
+        assert result.stdout.strip() == hook_path
+        assert os.path.exists(hook_path)
+        assert 'source' in result.stderr
+
+
+@pytest.mark.skipif(shutil.which('bash') is None, reason="bash not installed")
+def test_bash_hook_regenerates_after_upgrade():
+    """Test that a hook rendered for another version re-renders itself when sourced."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        hook_path = os.path.join(tmpdir, 'hook.bash')
+        cmd = f'{sys.executable} -m dirdotenv'
+        install_hook('bash', cmd, hook_path)
+        with open(hook_path) as f:
+            fresh = f.read()
+
+        with open(hook_path, 'w') as f:
+            f.write(fresh.replace(f'__version__ = "{__version__}"', '__version__ = "0.0.0"'))
+
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, PYTHONPATH=package_root)
+        env.pop('PROMPT_COMMAND', None)
+        result = subprocess.run(
+            ['bash', '--norc', '-c', f'source {hook_path}; echo "$PROMPT_COMMAND"'],
+            capture_output=True,
+            text=True,
+            env=env
+        )
+
+        assert result.returncode == 0
+        assert result.stdout.strip() == '_dirdotenv_load'
+        assert result.stderr == ''
+        with open(hook_path) as f:
+            assert f.read() == fresh
+
+
+def test_installed_hook_regenerates_with_same_options():
+    """Test that the regeneration command keeps --async and an explicit --cmd."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        detected = install_hook(
+            'zsh', 'dirdotenv', os.path.join(tmpdir, 'a'), python=sys.executable, background=True
+        )
+        with open(detected) as f:
+            content = f.read()
+        assert '--async' in content
+        assert '--cmd' not in content
+
+        explicit = install_hook('zsh', 'my dirdotenv', os.path.join(tmpdir, 'b'))
+        with open(explicit) as f:
+            assert "--cmd 'my dirdotenv'" in f.read()
@@ -0,0 +1,186 @@
+"""Tests for shell hook rendering."""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from dirdotenv.hooks import get_hook
+
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("shell", ['bash', 'zsh', 'fish', 'powershell'])
+def test_hook_runs_interpreter_directly(shell):
+    """Test that the hook embeds the interpreter and keeps the command as fallback."""
+    hook = get_hook(shell, 'uvx dirdotenv', python='/opt/tools/bin/python')
+
+    assert "'/opt/tools/bin/python'" in hook
+    assert '-c ' in hook and 'dirdotenv.cli import main' in hook
+    assert 'uvx dirdotenv' in hook
+    assert '{{' not in hook
+
+
+def test_cli_hook_uses_current_interpreter():
+    """Test that `dirdotenv hook` resolves the interpreter, unless --cmd is given."""
+    result = subprocess.run(
+        [sys.executable, '-m', 'dirdotenv', 'hook', 'bash'],
+        capture_output=True,
+        text=True
+    )
+    assert f"[[ -x '{sys.executable}' && -r " in result.stdout
+
+    result = subprocess.run(
+        [sys.executable, '-m', 'dirdotenv', 'hook', 'bash', '--cmd', 'mydirdotenv'],
+        capture_output=True,
+        text=True
+    )
+    assert "[[ -x '' && -r " in result.stdout
+
+
+def _run_bash_hook(hook, directory, **extra_env):
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT, **extra_env)
+    for key in ['_DIRDOTENV_STATE', '_DIRDOTENV_KEYS', 'HOOK_VAR']:
+        env.pop(key, None)
+    return subprocess.run(
+        ['bash', '--norc', '-c', f'{hook}\n_dirdotenv_load; echo "HOOK_VAR=$HOOK_VAR"'],
+        capture_output=True,
+        text=True,
+        cwd=directory,
+        env=env
+    )
+
+
+@pytest.mark.skipif(shutil.which('bash') is None, reason="bash not installed")
+def test_bash_hook_falls_back_when_interpreter_is_missing():
+    """Test that the hook uses cmd when the resolved interpreter no longer exists."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("HOOK_VAR=loaded\n")
+
+        cmd = f'{sys.executable} -m dirdotenv'
+        direct = _run_bash_hook(get_hook('bash', 'false', python=sys.executable), tmpdir)
+        assert 'HOOK_VAR=loaded' in direct.stdout
+
+        missing = os.path.join(tmpdir, 'removed', 'python')
+        fallback = _run_bash_hook(get_hook('bash', cmd, python=missing), tmpdir)
+        assert 'HOOK_VAR=loaded' in fallback.stdout
+
+
+@pytest.mark.skipif(shutil.which('bash') is None, reason="bash not installed")
+def test_bash_hook_falls_back_when_dirdotenv_is_removed(tmp_path):
+    """Test that the hook uses cmd when the interpreter no longer has this dirdotenv."""
+    from dirdotenv.hooks import quote_for_shell
+
+    (tmp_path / '.env').write_text("HOOK_VAR=loaded\n")
+    module_file = os.path.join(PACKAGE_ROOT, 'dirdotenv', 'cli.py')
+    missing = str(tmp_path / 'removed' / 'cli.py')
+
+    hook = get_hook('bash', 'false', python=sys.executable)
+    assert quote_for_shell(module_file, 'bash') in hook
+    hook = hook.replace(quote_for_shell(module_file, 'bash'), quote_for_shell(missing, 'bash'))
+    result = _run_bash_hook(hook, str(tmp_path))
+    assert 'HOOK_VAR=loaded' not in result.stdout
+
+    cmd = f'{sys.executable} -m dirdotenv'
+    hook = get_hook('bash', cmd, python=sys.executable)
+    hook = hook.replace(quote_for_shell(module_file, 'bash'), quote_for_shell(missing, 'bash'))
+    result = _run_bash_hook(hook, str(tmp_path))
+    assert 'HOOK_VAR=loaded' in result.stdout
+
+
+@pytest.mark.skipif(shutil.which('bash') is None, reason="bash not installed")
+def test_bash_hook_removes_load_script(tmp_path):
+    """Test that the script holding the loaded values is removed once sourced."""
+    (tmp_path / '.env').write_text("HOOK_VAR=loaded\n")
+    runtime_dir = tmp_path / 'runtime'
+
+    result = _run_bash_hook(
+        get_hook('bash', 'false', python=sys.executable), str(tmp_path), DIRDOTENV_RUNTIME_DIR=str(runtime_dir)
+    )
+    assert 'HOOK_VAR=loaded' in result.stdout
+    assert os.listdir(runtime_dir) == []
+
+
+@pytest.mark.skipif(shutil.which('bash') is None, reason="bash not installed")
+def test_bash_hook_ignores_package_in_directory():
+    """Test that a dirdotenv package in the entered directory is not imported."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("HOOK_VAR=loaded\n")
+        fake = os.path.join(tmpdir, 'dirdotenv')
+        os.makedirs(fake)
+        for name in ['__init__.py', '__main__.py', 'cli.py']:
+            with open(os.path.join(fake, name), 'w') as f:
+                f.write("print('echo PWNED'); raise SystemExit\n")
+
+        result = _run_bash_hook(get_hook('bash', 'false', python=sys.executable), tmpdir)
+        assert 'PWNED' not in result.stdout
+        assert 'HOOK_VAR=loaded' in result.stdout
+
+
+def test_async_hooks():
+    """Test that zsh and fish have background-loading hooks."""
+    zsh_hook = get_hook('zsh', 'dirdotenv', background=True)
+    assert 'zle -F' in zsh_hook
+    assert 'add-zsh-hook precmd _dirdotenv_async_start' in zsh_hook
+
+    fish_hook = get_hook('fish', 'dirdotenv', background=True)
+    assert '--on-signal SIGUSR1' in fish_hook
+    assert '_dirdotenv_generation' in fish_hook
+
+    with pytest.raises(ValueError):
+        get_hook('bash', 'dirdotenv', background=True)
+    with pytest.raises(ValueError):
+        get_hook('zsh', 'dirdotenv', background=True, session=True)
+
+
+def test_async_hooks_apply_load_files():
+    """Test that background loads apply a script or data file and leave stderr alone."""
+    zsh_hook = get_hook('zsh', 'dirdotenv', background=True)
+    assert '--script-file' in zsh_hook
+    assert 'source "$1"' in zsh_hook
+
+    fish_hook = get_hook('fish', 'dirdotenv', background=True)
+    assert '--data-file' in fish_hook
+    assert 'string split0' in fish_hook
+
+    for hook in [zsh_hook, fish_hook]:
+        assert '2>&1' not in hook
+        assert 'eval' not in hook
+
+
+@pytest.mark.skipif(shutil.which('zsh') is None, reason="zsh not installed")
+def test_zsh_async_hook_without_zle(tmp_path):
+    """Test that the background hook loads synchronously outside the line editor."""
+    (tmp_path / '.env').write_text("HOOK_VAR=loaded\n")
+    runtime_dir = tmp_path / 'runtime'
+    hook = get_hook('zsh', 'false', python=sys.executable, background=True)
+    env = dict(os.environ, PYTHONPATH=PACKAGE_ROOT, DIRDOTENV_RUNTIME_DIR=str(runtime_dir))
+    for key in ['_DIRDOTENV_STATE', '_DIRDOTENV_KEYS', 'HOOK_VAR']:
+        env.pop(key, None)
+
+    result = subprocess.run(
+        ['zsh', '-f', '-c', f'{hook}\n_dirdotenv_async_start; echo "HOOK_VAR=$HOOK_VAR"'],
+        capture_output=True,
+        text=True,
+        cwd=str(tmp_path),
+        env=env
+    )
+    assert 'HOOK_VAR=loaded' in result.stdout
+    assert os.listdir(runtime_dir) == []
+
+
+def test_cli_async_rejects_unsupported_shell():
+    """Test that --async is refused for shells without a background hook."""
+    result = subprocess.run(
+        [sys.executable, '-m', 'dirdotenv', 'hook', 'bash', '--async'],
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 1
+    assert '--async' in result.stderr
@@ -0,0 +1,114 @@
+"""Tests for the persistent key index and `dirdotenv where`."""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+from dirdotenv import index as index_module
+from dirdotenv.index import KeyIndex, scan_file, winning_definition
+
+
+def test_scan_file(write_file):
+    """Test finding the lines defining each key."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        write_file(env_file, "# comment\nKEY=1\nOTHER=2\nKEY=3\n")
+        assert scan_file(env_file) == {'KEY': [2, 4], 'OTHER': [3]}
+
+        envrc_file = os.path.join(tmpdir, '.envrc')
+        write_file(envrc_file, "export KEY=1\nIGNORED=2\nPATH_add bin\npath_add PYTHONPATH src\ndotenv .env.shared\n")
+        assert scan_file(envrc_file) == {'KEY': [1], 'PATH': [3], 'PYTHONPATH': [4]}
+
+
+def test_index_definitions_and_winner(write_file):
+    """Test listing definitions and resolving the winning one."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root_env = os.path.join(tmpdir, '.env')
+        api_envrc = os.path.join(tmpdir, 'api', '.envrc')
+        api_env = os.path.join(tmpdir, 'api', '.env')
+        web_env = os.path.join(tmpdir, 'web', '.env')
+        write_file(root_env, "URL=root\n")
+        write_file(api_envrc, "export URL=api-envrc\n")
+        write_file(api_env, "PORT=1\nURL=api\n")
+        write_file(web_env, "PORT=2\n")
+
+        index = KeyIndex(tmpdir, index_path=os.path.join(tmpdir, 'index.json'))
+        index.refresh(jobs=1)
+
+        assert index.definitions('URL') == sorted(
+            [(root_env, 1), (api_envrc, 1), (api_env, 2)]
+        )
+        assert index.definitions('MISSING') == []
+
+        assert winning_definition('URL', os.path.join(tmpdir, 'api'), index) == (api_env, 2)
+        assert winning_definition('URL', os.path.join(tmpdir, 'web'), index) == (root_env, 1)
+        assert winning_definition('PORT', tmpdir, index) is None
+
+
+def test_index_reuses_unchanged_files(monkeypatch, write_file):
+    """Test that a stored index only rescans changed files."""
+    # Trust everything so that freshly written files are not treated as racy
+    monkeypatch.setattr(index_module, 'RACY_WINDOW_NS', -10**18)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index_path = os.path.join(tmpdir, 'index.json')
+        write_file(os.path.join(tmpdir, 'a', '.env'), "A=1\n")
+        write_file(os.path.join(tmpdir, 'b', '.env'), "B=1\n")
+
+        index = KeyIndex(tmpdir, index_path=index_path)
+        assert index.refresh(jobs=1) == 2
+        index.save()
+
+        write_file(os.path.join(tmpdir, 'b', '.env'), "B=1\nB2=2\n")
+        write_file(os.path.join(tmpdir, 'c', '.env'), "C=1\n")
+
+        index = KeyIndex(tmpdir, index_path=index_path)
+        assert index.load()
+        assert index.refresh(jobs=1) == 2
+        assert index.definitions('B2') == [(os.path.join(tmpdir, 'b', '.env'), 2)]
+        assert index.definitions('C') == [(os.path.join(tmpdir, 'c', '.env'), 1)]
+
+        os.remove(os.path.join(tmpdir, 'a', '.env'))
+        assert index.refresh(jobs=1) == 0
+        assert index.definitions('A') == []
+
+
+def test_index_load_rejects_other_root():
+    """Test that an index stored for another root is not used."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index_path = os.path.join(tmpdir, 'index.json')
+        KeyIndex(tmpdir, index_path=index_path).save()
+        assert KeyIndex(tmpdir, index_path=index_path).load()
+        assert not KeyIndex(os.path.join(tmpdir, 'x'), index_path=index_path).load()
+
+
+def test_cli_where(write_file):
+    """Test the where subcommand output and exit code."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root_env = os.path.join(tmpdir, '.env')
+        child_env = os.path.join(tmpdir, 'child', '.env')
+        write_file(root_env, "KEY=root\n")
+        write_file(child_env, "KEY=child\n")
+
+        env = dict(os.environ, DIRDOTENV_CACHE_DIR=os.path.join(tmpdir, 'cache'))
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'where', 'KEY',
+             '--root', tmpdir, '--dir', os.path.join(tmpdir, 'child')],
+            capture_output=True,
+            text=True,
+            env=env
+        )
+        assert result.returncode == 0
+        assert f"  {root_env}:1" in result.stdout
+        assert f"* {child_env}:1" in result.stdout
+        assert os.path.isdir(os.path.join(tmpdir, 'cache', 'index'))
+
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'where', 'NOPE', '--root', tmpdir],
+            capture_output=True,
+            text=True,
+            env=env
+        )
+        assert result.returncode == 1
+        assert 'NOPE: not defined' in result.stdout
@@ -0,0 +1,115 @@
+"""Tests for ${VAR} interpolation across layers."""
+
+import os
+import tempfile
+
+from dirdotenv.check import check_file
+from dirdotenv.interpolate import Interpolator, interpolate_layers
+from dirdotenv.loader import load_env_with_inheritance
+from dirdotenv.parser import load_env
+
+
+def test_references_and_defaults():
+    """Test plain references, both default forms and the process environment fallback."""
+    layers = [{
+        'HOST': 'example.com',
+        'URL': 'https://${HOST}/api',
+        'EMPTY': '',
+        'A': '${EMPTY:-colon}',
+        'B': '${EMPTY-dash}',
+        'C': '${MISSING:-${HOST}}',
+        'D': '${FROM_PROCESS}/x',
+        'E': '${ not a reference',
+    }]
+
+    env_vars = interpolate_layers(layers, environ={'FROM_PROCESS': 'proc'})
+    assert env_vars['URL'] == 'https://example.com/api'
+    assert env_vars['A'] == 'colon'
+    assert env_vars['B'] == ''
+    assert env_vars['C'] == 'example.com'
+    assert env_vars['D'] == 'proc/x'
+    assert env_vars['E'] == '${ not a reference'
+
+
+def test_self_reference_uses_lower_layer():
+    """Test that a variable referencing itself gets the value from below."""
+    layers = [{'PATH_EXTRA': 'a'}, {'PATH_EXTRA': '${PATH_EXTRA}:b'}, {'PATH_EXTRA': '${PATH_EXTRA}:c'}]
+    assert interpolate_layers(layers, environ={}) == {'PATH_EXTRA': 'a:b:c'}
+
+    layers = [{'HOME_BIN': '${HOME_BIN}/bin'}]
+    assert interpolate_layers(layers, environ={'HOME_BIN': '/home/me'}) == {'HOME_BIN': '/home/me/bin'}
+
+
+def test_cycles_resolve_to_empty():
+    """Test that a reference cycle is reported and does not recurse forever."""
+    interpolator = Interpolator(environ={})
+    interpolator.update([('layer', {'A': 'a${B}', 'B': 'b${A}', 'C': 'c'})])
+
+    assert interpolator.env_vars['C'] == 'c'
+    assert interpolator.cycles == [['A', 'B', 'A']]
+    assert interpolator.env_vars['A'] == 'ab'
+
+
+def test_update_evaluates_only_dependents():
+    """Test that changing a key re-evaluates only the variables depending on it."""
+    base = {f'INDEPENDENT_{i}': str(i) for i in range(100)}
+    base['ROOT'] = 'https://old'
+    child = {'API': '${ROOT}/api', 'DOCS': '${API}/docs', 'OTHER': '${INDEPENDENT_1}'}
+
+    interpolator = Interpolator(environ={})
+    interpolator.update([('base', base), ('child', child)])
+    assert interpolator.evaluated == 104
+
+    changed = interpolator.update([('base', dict(base, ROOT='https://new')), ('child', child)])
+    assert changed == {'ROOT', 'API', 'DOCS'}
+    assert interpolator.evaluated == 3
+    assert interpolator.env_vars['DOCS'] == 'https://new/api/docs'
+
+
+def test_update_reevaluates_changed_process_values():
+    """Test that references falling back to the process environment see its changes."""
+    environ = {'HOME_DIR': '/home/a'}
+    layers = [('layer', {'CACHE': '${HOME_DIR}/.cache', 'OTHER': 'x'})]
+
+    interpolator = Interpolator(environ=environ)
+    interpolator.update(layers)
+    assert interpolator.update(layers) == set()
+
+    environ['HOME_DIR'] = '/home/b'
+    assert interpolator.update(layers) == {'CACHE'}
+    assert interpolator.evaluated == 1
+    assert interpolator.env_vars['CACHE'] == '/home/b/.cache'
+
+
+def test_files_across_directories():
+    """Test that child files reference parent values and single quotes stay literal."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        child = os.path.join(tmpdir, 'service')
+        os.makedirs(child)
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("BASE_URL=https://internal\n")
+        with open(os.path.join(child, '.envrc'), 'w') as f:
+            f.write('export SERVICE_URL="${BASE_URL}/service"\n')
+        with open(os.path.join(child, '.env'), 'w') as f:
+            f.write("TEMPLATE='${BASE_URL}'\nHEALTH=${SERVICE_URL}/health\n")
+
+        env_vars, _ = load_env_with_inheritance(child)
+        assert env_vars['SERVICE_URL'] == 'https://internal/service'
+        assert env_vars['HEALTH'] == 'https://internal/service/health'
+        assert env_vars['TEMPLATE'] == '${BASE_URL}'
+        assert type(env_vars['TEMPLATE']) is str
+
+        # Single directory: the parent is not loaded
+        assert load_env(child)['HEALTH'] == '/service/health'
+
+
+def test_check_reports_cycles():
+    """Test that check reports a reference cycle within a file."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        with open(env_file, 'w') as f:
+            f.write("A=${B}\nB=${A}\n")
+
+        diagnostics, _ = check_file(env_file)
+        assert [d.message for d in diagnostics] == ['circular reference: A -> B -> A']
+        assert diagnostics[0].line == 1
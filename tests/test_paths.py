@@ -0,0 +1,30 @@
+"""Tests for the files dirdotenv keeps outside of project directories."""
+
+import threading
+
+from dirdotenv.paths import write_file_atomic
+
+
+def test_write_file_atomic_from_threads(tmp_path):
+    """Test that threads writing the same file never publish a partial write."""
+    target = str(tmp_path / 'out' / 'file')
+    payloads = [bytes([ord('a') + i]) * (10000 * (i + 1)) for i in range(8)]
+    errors = []
+
+    def write(payload):
+        try:
+            for _ in range(20):
+                write_file_atomic(target, payload)
+                with open(target, 'rb') as f:
+                    assert f.read() in payloads
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(payload,)) for payload in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(p.name for p in (tmp_path / 'out').iterdir()) == ['file']
@@ -0,0 +1,113 @@
+"""Tests for configurable env file names and profiles."""
+
+import os
+import tempfile
+
+from dirdotenv.cache import EnvCache
+from dirdotenv.loader import compute_env_state, has_state_changed, load_env_with_inheritance
+from dirdotenv.parser import load_env
+from dirdotenv import profiles
+from dirdotenv.profiles import FILES_VAR, PROFILE_VAR, file_kind, get_file_names, scan_env_files
+
+
+def test_file_names(monkeypatch):
+    """Test the default names, profile names and $DIRDOTENV_FILES."""
+    monkeypatch.delenv(FILES_VAR, raising=False)
+    monkeypatch.delenv(PROFILE_VAR, raising=False)
+    assert get_file_names() == ('.envrc', '.env')
+    assert get_file_names('dev') == ('.envrc', '.env', '.env.dev', '.env.dev.local')
+
+    monkeypatch.setenv(PROFILE_VAR, 'prod')
+    assert get_file_names() == ('.envrc', '.env', '.env.prod', '.env.prod.local')
+
+    files = '.env, .env.local, .env.{profile}, .env, ../escape'
+    assert get_file_names('ci', files) == ('.env', '.env.local', '.env.ci')
+    assert get_file_names('', files) == ('.env', '.env.local')
+
+    assert file_kind('/x/.envrc.local') == 'envrc'
+    assert file_kind('/x/.env.dev') == 'env'
+
+
+def test_profile_files_override(monkeypatch, write_file):
+    """Test that profile files are loaded after the defaults in every directory."""
+    monkeypatch.delenv(FILES_VAR, raising=False)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        child = os.path.join(tmpdir, 'child')
+        write_file(os.path.join(tmpdir, '.env'), "DB=local\nLEVEL=root\n")
+        write_file(os.path.join(tmpdir, '.env.prod'), "DB=prod-db\n")
+        write_file(os.path.join(child, '.env'), "LEVEL=child\n")
+        write_file(os.path.join(child, '.env.prod.local'), "LEVEL=child-prod\nURL=${DB}/app\n")
+
+        monkeypatch.delenv(PROFILE_VAR, raising=False)
+        env_vars, _ = load_env_with_inheritance(child)
+        assert env_vars == {'DB': 'local', 'LEVEL': 'child'}
+
+        monkeypatch.setenv(PROFILE_VAR, 'prod')
+        env_vars, _ = load_env_with_inheritance(child)
+        assert env_vars == {'DB': 'prod-db', 'LEVEL': 'child-prod', 'URL': 'prod-db/app'}
+        assert load_env(tmpdir) == {'DB': 'prod-db', 'LEVEL': 'root'}
+
+
+def test_custom_file_list(monkeypatch, write_file):
+    """Test that $DIRDOTENV_FILES replaces the list of file names."""
+    monkeypatch.delenv(PROFILE_VAR, raising=False)
+    monkeypatch.setenv(FILES_VAR, '.env,.env.local')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_file(os.path.join(tmpdir, '.envrc'), "export IGNORED=1\n")
+        write_file(os.path.join(tmpdir, '.env'), "A=1\nB=1\n")
+        write_file(os.path.join(tmpdir, '.env.local'), "B=2\n")
+
+        assert load_env(tmpdir) == {'A': '1', 'B': '2'}
+
+
+def test_switching_profiles_does_not_reparse(monkeypatch, write_file):
+    """Test that the cache keeps merged results per profile."""
+    monkeypatch.delenv(FILES_VAR, raising=False)
+    monkeypatch.delenv(PROFILE_VAR, raising=False)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_file(os.path.join(tmpdir, '.env'), "DB=local\n")
+        write_file(os.path.join(tmpdir, '.env.dev'), "DB=dev\n")
+        write_file(os.path.join(tmpdir, '.env.prod'), "DB=prod\n")
+
+        cache = EnvCache()
+        for profile in ['dev', 'prod', 'dev', 'prod']:
+            env_vars, _ = cache.load_env_with_inheritance(tmpdir, profile)
+            assert env_vars == {'DB': profile}
+        assert cache.stats().misses == 3
+
+        # A referenced process value is part of the merged result
+        write_file(os.path.join(tmpdir, '.env.dev'), "DB=${DB_HOST}/dev\n")
+        monkeypatch.setenv('DB_HOST', 'a')
+        assert cache.load_env_with_inheritance(tmpdir, 'dev')[0] == {'DB': 'a/dev'}
+        monkeypatch.setenv('DB_HOST', 'b')
+        assert cache.load_env_with_inheritance(tmpdir, 'dev')[0] == {'DB': 'b/dev'}
+        assert cache.stats().misses == 4
+
+
+def test_unlistable_directory_falls_back_to_stat(monkeypatch, tmp_path, write_file):
+    """Test that env files are found in a directory that can be entered but not listed."""
+    write_file(str(tmp_path / '.env'), "KEY=1\n")
+    os.makedirs(str(tmp_path / '.envrc'))
+
+    def scandir(path):
+        raise PermissionError(13, 'Permission denied', path)
+
+    monkeypatch.setattr(profiles.os, 'scandir', scandir)
+    entries = scan_env_files(str(tmp_path), ('.envrc', '.env'))
+    assert [entry.path for entry in entries] == [str(tmp_path / '.env')]
+    assert entries[0].stat().st_size == 6
+
+
+def test_profile_switch_changes_state(monkeypatch, write_file):
+    """Test that selecting a profile with its own files makes the hook reload."""
+    monkeypatch.delenv(FILES_VAR, raising=False)
+    monkeypatch.delenv(PROFILE_VAR, raising=False)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_file(os.path.join(tmpdir, '.env'), "DB=local\n")
+        write_file(os.path.join(tmpdir, '.env.test'), "DB=test\n")
+
+        state = compute_env_state(tmpdir)
+        monkeypatch.setenv(PROFILE_VAR, 'staging')
+        assert not has_state_changed(state, tmpdir)
+        monkeypatch.setenv(PROFILE_VAR, 'test')
+        assert has_state_changed(state, tmpdir)
@@ -0,0 +1,65 @@
+"""Tests for the pytest plugin."""
+
+pytest_plugins = ["pytester"]
+
+
+def _make_packages(pytester):
+    pytester.makefile('', **{'pkg_a/.env': "DIRDOTENV_PLUGIN_VAR=a\nDIRDOTENV_PLUGIN_A=1\n"})
+    pytester.makefile('', **{'pkg_b/.env': "DIRDOTENV_PLUGIN_VAR=b\n"})
+    pytester.makepyfile(**{
+        'pkg_a/test_a': """
+            import os
+
+            IMPORT_TIME_VALUE = os.environ.get('DIRDOTENV_PLUGIN_VAR')
+
+            def test_import_time():
+                assert IMPORT_TIME_VALUE == 'a'
+
+            def test_a():
+                assert os.environ['DIRDOTENV_PLUGIN_VAR'] == 'a'
+                assert os.environ['DIRDOTENV_PLUGIN_A'] == '1'
+        """,
+        'pkg_b/test_b': """
+            import os
+
+            def test_b():
+                assert os.environ['DIRDOTENV_PLUGIN_VAR'] == 'b'
+                assert 'DIRDOTENV_PLUGIN_A' not in os.environ
+        """,
+        'test_root': """
+            import os
+
+            def test_root():
+                assert 'DIRDOTENV_PLUGIN_VAR' not in os.environ
+        """,
+    })
+
+
+def test_plugin_applies_environment_per_directory(pytester):
+    """Test that each test sees its own directory's environment."""
+    _make_packages(pytester)
+
+    result = pytester.runpytest('-p', 'dirdotenv.pytest_plugin', '--dirdotenv')
+
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines(['dirdotenv: 3 directories resolved in *'])
+
+
+def test_plugin_enabled_from_ini(pytester):
+    """Test enabling the plugin from the ini file."""
+    _make_packages(pytester)
+    pytester.makeini("[pytest]\ndirdotenv = true\n")
+
+    result = pytester.runpytest('-p', 'dirdotenv.pytest_plugin')
+
+    result.assert_outcomes(passed=4)
+
+
+def test_plugin_disabled_by_default(pytester):
+    """Test that the plugin does nothing unless enabled."""
+    _make_packages(pytester)
+
+    result = pytester.runpytest('-p', 'dirdotenv.pytest_plugin')
+
+    result.assert_outcomes(passed=1, failed=3)
+    assert 'dirdotenv:' not in result.stdout.str()
@@ -0,0 +1,106 @@
+"""Tests for running commands in many directories."""
+
+import io
+import os
+import subprocess
+import sys
+import tempfile
+
+from dirdotenv.cache import EnvCache
+from dirdotenv.loader import load_env_with_inheritance
+from dirdotenv.runner import resolve_environments, run_many
+
+
+def _make_tree(tmpdir, write_file):
+    write_file(os.path.join(tmpdir, '.env'), "ROOT=root\nSHARED=root\n")
+    write_file(os.path.join(tmpdir, 'a', '.envrc'), "export SHARED=a\n")
+    write_file(os.path.join(tmpdir, 'a', 'deep', '.env'), "DEEP=1\n")
+    os.makedirs(os.path.join(tmpdir, 'b'))
+    return [
+        os.path.join(tmpdir, 'a', 'deep'),
+        os.path.join(tmpdir, 'a'),
+        os.path.join(tmpdir, 'b'),
+    ]
+
+
+def test_resolve_environments_matches_inheritance(write_file):
+    """Test that batch resolution matches load_env_with_inheritance."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        directories = _make_tree(tmpdir, write_file)
+        environments = resolve_environments(directories)
+
+        for directory in directories:
+            expected, _ = load_env_with_inheritance(directory)
+            assert environments[directory] == expected
+
+
+def test_resolve_environments_nested_path_add(write_file, monkeypatch):
+    """Test that a child .envrc builds on the PATH its parent .envrc set."""
+    monkeypatch.setenv('PATH', '/usr/bin')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        child = os.path.join(tmpdir, 'child')
+        write_file(os.path.join(tmpdir, '.envrc'), "PATH_add pbin\n")
+        write_file(os.path.join(child, '.envrc'), "PATH_add cbin\n")
+
+        expected, _ = load_env_with_inheritance(child)
+        assert resolve_environments([child])[child] == expected
+        assert expected['PATH'].startswith(os.path.join(child, 'cbin') + os.pathsep)
+
+
+def test_resolve_environments_parses_ancestors_once(write_file):
+    """Test that shared ancestors are parsed a single time."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        directories = _make_tree(tmpdir, write_file)
+        cache = EnvCache()
+        resolve_environments(directories, cache)
+
+        stats = cache.stats()
+        assert stats.misses == 3
+        assert stats.hits == 0
+
+
+def test_run_many_output_and_results(write_file):
+    """Test prefixed output, exit codes and result order."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        directories = _make_tree(tmpdir, write_file)
+        output = io.BytesIO()
+        command = [
+            sys.executable, '-c',
+            'import os, sys; print(os.environ["SHARED"]); sys.exit("DEEP" in os.environ)',
+        ]
+
+        results = run_many(directories, command, jobs=2, output=output)
+
+        assert [r.directory for r in results] == directories
+        assert [r.returncode for r in results] == [1, 0, 0]
+        lines = output.getvalue().decode().splitlines()
+        assert f"[{directories[0]}] a" in lines
+        assert f"[{directories[1]}] a" in lines
+        assert f"[{directories[2]}] root" in lines
+
+
+def test_run_many_command_not_found():
+    """Test that a missing command is reported with exit code 127."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output = io.BytesIO()
+        results = run_many([tmpdir], ['dirdotenv-no-such-command'], output=output)
+        assert results[0].returncode == 127
+        assert b'Command not found' in output.getvalue()
+
+
+def test_cli_exec_many(write_file):
+    """Test exec-many reading directories from stdin."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        directories = _make_tree(tmpdir, write_file)
+        result = subprocess.run(
+            [sys.executable, '-m', 'dirdotenv', 'exec-many', '--jobs', '2', '--',
+             sys.executable, '-c', 'import os; print(os.environ["ROOT"])'],
+            input="\n".join(directories) + "\n",
+            capture_output=True,
+            text=True
+        )
+
+        assert result.returncode == 0
+        for directory in directories:
+            assert f"[{directory}] root" in result.stdout
+        assert '3 succeeded, 0 failed' in result.stderr
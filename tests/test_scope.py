@@ -0,0 +1,123 @@
+"""Tests for applying a directory's environment in-process."""
+
+import os
+import tempfile
+import threading
+
+import dirdotenv
+from dirdotenv.cache import EnvCache
+
+
+def test_scoped_applies_and_restores(monkeypatch, write_file):
+    """Test that variables are set inside the block and restored after it."""
+    monkeypatch.setenv('DIRDOTENV_TEST_EXISTING', 'original')
+    monkeypatch.delenv('DIRDOTENV_TEST_NEW', raising=False)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_file(os.path.join(tmpdir, '.env'),
+               "DIRDOTENV_TEST_EXISTING=scoped\nDIRDOTENV_TEST_NEW=new\n")
+
+        with dirdotenv.scoped(tmpdir) as env_vars:
+            assert env_vars['DIRDOTENV_TEST_NEW'] == 'new'
+            assert os.environ['DIRDOTENV_TEST_EXISTING'] == 'scoped'
+            assert os.environ['DIRDOTENV_TEST_NEW'] == 'new'
+
+        assert os.environ['DIRDOTENV_TEST_EXISTING'] == 'original'
+        assert 'DIRDOTENV_TEST_NEW' not in os.environ
+
+
+def test_scoped_restores_on_exception(monkeypatch, write_file):
+    """Test that the environment is restored when the block raises."""
+    monkeypatch.delenv('DIRDOTENV_TEST_KEY', raising=False)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_file(os.path.join(tmpdir, '.env'), "DIRDOTENV_TEST_KEY=value\n")
+
+        try:
+            with dirdotenv.scoped(tmpdir):
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+        assert 'DIRDOTENV_TEST_KEY' not in os.environ
+
+
+def test_scoped_inherit(monkeypatch, write_file):
+    """Test inheritance from parent directories and the inherit=False switch."""
+    monkeypatch.delenv('DIRDOTENV_TEST_PARENT', raising=False)
+    monkeypatch.delenv('DIRDOTENV_TEST_CHILD', raising=False)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        child_dir = os.path.join(tmpdir, 'child')
+        write_file(os.path.join(tmpdir, '.env'), "DIRDOTENV_TEST_PARENT=parent\n")
+        write_file(os.path.join(child_dir, '.env'), "DIRDOTENV_TEST_CHILD=child\n")
+
+        with dirdotenv.scoped(child_dir):
+            assert os.environ['DIRDOTENV_TEST_PARENT'] == 'parent'
+            assert os.environ['DIRDOTENV_TEST_CHILD'] == 'child'
+
+        with dirdotenv.scoped(child_dir, inherit=False):
+            assert 'DIRDOTENV_TEST_PARENT' not in os.environ
+            assert os.environ['DIRDOTENV_TEST_CHILD'] == 'child'
+
+
+def test_scoped_nested_unloads_outer_keys(monkeypatch, write_file):
+    """Test that a nested block removes keys only the outer directory defines."""
+    monkeypatch.delenv('DIRDOTENV_TEST_A', raising=False)
+    monkeypatch.delenv('DIRDOTENV_TEST_SHARED', raising=False)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dir_a = os.path.join(tmpdir, 'a')
+        dir_b = os.path.join(tmpdir, 'b')
+        write_file(os.path.join(dir_a, '.env'), "DIRDOTENV_TEST_A=a\nDIRDOTENV_TEST_SHARED=a\n")
+        write_file(os.path.join(dir_b, '.env'), "DIRDOTENV_TEST_SHARED=b\n")
+
+        with dirdotenv.scoped(dir_a):
+            with dirdotenv.scoped(dir_b):
+                assert 'DIRDOTENV_TEST_A' not in os.environ
+                assert os.environ['DIRDOTENV_TEST_SHARED'] == 'b'
+            assert os.environ['DIRDOTENV_TEST_A'] == 'a'
+            assert os.environ['DIRDOTENV_TEST_SHARED'] == 'a'
+
+        assert 'DIRDOTENV_TEST_A' not in os.environ
+        assert 'DIRDOTENV_TEST_SHARED' not in os.environ
+
+
+def test_scoped_nesting_is_per_thread(monkeypatch, tmp_path, write_file):
+    """Test that a block in another thread is not nested in this thread's block."""
+    monkeypatch.delenv('DIRDOTENV_TEST_A', raising=False)
+    monkeypatch.delenv('DIRDOTENV_TEST_B', raising=False)
+    write_file(str(tmp_path / 'a' / '.env'), "DIRDOTENV_TEST_A=a\n")
+    write_file(str(tmp_path / 'b' / '.env'), "DIRDOTENV_TEST_B=b\n")
+    seen = {}
+
+    def other_thread():
+        with dirdotenv.scoped(str(tmp_path / 'b')):
+            seen['A'] = os.environ.get('DIRDOTENV_TEST_A')
+
+    with dirdotenv.scoped(str(tmp_path / 'a')):
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        thread.join()
+        # os.environ is shared, but the outer keys of another thread are not unloaded
+        assert seen['A'] == 'a'
+        assert os.environ['DIRDOTENV_TEST_A'] == 'a'
+        assert 'DIRDOTENV_TEST_B' not in os.environ
+
+    assert 'DIRDOTENV_TEST_A' not in os.environ
+
+
+def test_scoped_reuses_cached_parses(monkeypatch, write_file):
+    """Test that re-entering a directory does not re-parse its files."""
+    monkeypatch.delenv('DIRDOTENV_TEST_KEY', raising=False)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        write_file(os.path.join(tmpdir, '.env'), "DIRDOTENV_TEST_KEY=value\n")
+        cache = EnvCache()
+
+        for _ in range(100):
+            with dirdotenv.scoped(tmpdir, cache=cache):
+                pass
+
+        assert cache.stats().misses == 1
+        assert cache.stats().hits == 99
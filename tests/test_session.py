@@ -0,0 +1,144 @@
+"""Tests for per-session bookkeeping files."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from dirdotenv.session import (
+    SESSION_VAR,
+    STALE_AFTER,
+    Session,
+    cleanup_stale_load_files,
+    cleanup_stale_sessions,
+)
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()
+    return process.pid
+
+
+def test_session_is_reused_by_its_owner(monkeypatch):
+    """Test that the owning shell gets its saved keys and state back."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv('DIRDOTENV_RUNTIME_DIR', tmpdir)
+        monkeypatch.delenv(SESSION_VAR, raising=False)
+        monkeypatch.delenv('_DIRDOTENV_KEYS', raising=False)
+        monkeypatch.delenv('_DIRDOTENV_STATE', raising=False)
+
+        session = Session.open(os.getpid())
+        assert session.is_new
+        assert session.keys == '' and session.state is None
+        session.save('A:B', 'dir:/x')
+
+        monkeypatch.setenv(SESSION_VAR, session.session_id)
+        reopened = Session.open(os.getpid())
+        assert not reopened.is_new
+        assert reopened.session_id == session.session_id
+        assert (reopened.keys, reopened.state) == ('A:B', 'dir:/x')
+
+
+def test_child_shell_gets_a_copy(monkeypatch):
+    """Test that a shell inheriting the session id starts a new session from its state."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv('DIRDOTENV_RUNTIME_DIR', tmpdir)
+        monkeypatch.delenv(SESSION_VAR, raising=False)
+
+        parent = Session.open(os.getpid())
+        parent.save('A', 'dir:/x')
+        monkeypatch.setenv(SESSION_VAR, parent.session_id)
+
+        child = Session.open(os.getppid())
+        assert child.is_new
+        assert child.session_id != parent.session_id
+        assert (child.keys, child.state) == ('A', 'dir:/x')
+
+
+def test_exported_bookkeeping_is_migrated(monkeypatch):
+    """Test that a new session starts from exported _DIRDOTENV_KEYS/_DIRDOTENV_STATE."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv('DIRDOTENV_RUNTIME_DIR', tmpdir)
+        monkeypatch.delenv(SESSION_VAR, raising=False)
+        monkeypatch.setenv('_DIRDOTENV_KEYS', 'OLD')
+        monkeypatch.setenv('_DIRDOTENV_STATE', 'dir:/old')
+
+        session = Session.open(os.getpid())
+        assert (session.keys, session.state) == ('OLD', 'dir:/old')
+
+
+def test_cleanup_stale_sessions():
+    """Test that sessions of exited shells and old sessions are removed."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        def write(name, owner):
+            path = os.path.join(tmpdir, name)
+            with open(path, 'w') as f:
+                f.write(f"{owner}\0A\0dir:/x")
+            return path
+
+        alive = write('session-alive', os.getpid())
+        dead = write('session-dead', _dead_pid())
+        old = write('session-old', os.getpid())
+        old_time = time.time() - STALE_AFTER - 10
+        os.utime(old, (old_time, old_time))
+        other = write('load-1.sh', _dead_pid())
+
+        assert cleanup_stale_sessions(tmpdir) == 2
+        assert os.path.exists(alive)
+        assert not os.path.exists(dead)
+        assert not os.path.exists(old)
+        assert os.path.exists(other)
+
+
+def test_cleanup_stale_load_files(tmp_path):
+    """Test that load files of exited shells are removed."""
+    alive = tmp_path / f'load-{os.getpid()}.sh'
+    dead = tmp_path / f'load-{_dead_pid()}.data'
+    kept = tmp_path / f'load-{_dead_pid()}.sh'
+    session = tmp_path / f'session-{_dead_pid()}'
+    for path in [alive, dead, kept, session]:
+        path.write_text("export SECRET=1\n")
+
+    assert cleanup_stale_load_files(str(tmp_path), keep=str(kept)) == 1
+    assert alive.exists() and kept.exists() and session.exists()
+    assert not dead.exists()
+
+
+def test_cli_load_session_exports_only_session_id():
+    """Test that load --session keeps keys and state out of the environment."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = os.path.join(tmpdir, 'project')
+        os.makedirs(project)
+        with open(os.path.join(project, '.env'), 'w') as f:
+            f.write("API_KEY=secret\n")
+
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(
+            os.environ,
+            DIRDOTENV_RUNTIME_DIR=os.path.join(tmpdir, 'runtime'),
+            PYTHONPATH=package_root
+        )
+        for key in [SESSION_VAR, '_DIRDOTENV_KEYS', '_DIRDOTENV_STATE']:
+            env.pop(key, None)
+
+        def load():
+            return subprocess.run(
+                [sys.executable, '-m', 'dirdotenv', 'load', '--session', str(os.getpid())],
+                capture_output=True,
+                text=True,
+                cwd=project,
+                env=env
+            ).stdout
+
+        output = load()
+        assert "export API_KEY='secret'" in output
+        assert '_DIRDOTENV_KEYS' not in output
+        assert '_DIRDOTENV_STATE' not in output
+        session_line = [line for line in output.splitlines() if SESSION_VAR in line][0]
+        env[SESSION_VAR] = session_line.split("'")[1]
+        env['API_KEY'] = 'secret'
+
+        # Nothing changed: nothing to do
+        assert load() == ''
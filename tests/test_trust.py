@@ -0,0 +1,138 @@
+"""Tests for the allowlist of env files loaded by the hooks."""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from dirdotenv import filehash
+from dirdotenv.loader import load_env_tree
+from dirdotenv.trust import ALLOWED, DENIED, UNTRUSTED, Allowlist, find_untrusted
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def user_dirs(monkeypatch, tmp_path):
+    """Use private data and cache directories for every test."""
+    monkeypatch.setenv('DIRDOTENV_DATA_DIR', str(tmp_path / 'data'))
+    monkeypatch.setenv('DIRDOTENV_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(filehash, 'default_hash_cache', None)
+    return tmp_path
+
+
+def test_allow_is_tied_to_content():
+    """Test that a file is allowed until its content changes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        with open(env_file, 'w') as f:
+            f.write("KEY=value\n")
+
+        allowlist = Allowlist()
+        assert allowlist.status(env_file) == UNTRUSTED
+        allowlist.allow(env_file)
+        assert Allowlist().status(env_file) == ALLOWED
+
+        with open(env_file, 'a') as f:
+            f.write("OTHER=1\n")
+        assert Allowlist().status(env_file) == UNTRUSTED
+
+
+def test_find_untrusted_skips_denied_silently():
+    """Test that denied files are skipped but only untrusted ones are reported."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        child = os.path.join(tmpdir, 'child')
+        os.makedirs(child)
+        parent_file = os.path.join(tmpdir, '.env')
+        envrc_file = os.path.join(child, '.envrc')
+        env_file = os.path.join(child, '.env')
+        for path in [parent_file, envrc_file, env_file]:
+            with open(path, 'w') as f:
+                f.write("KEY=value\n")
+
+        allowlist = Allowlist()
+        allowlist.allow(parent_file)
+        allowlist.deny(envrc_file)
+        assert allowlist.status(envrc_file) == DENIED
+
+        skip, untrusted = find_untrusted(child, allowlist)
+        assert skip == {envrc_file, env_file}
+        assert untrusted == [env_file]
+
+
+def test_cli_hook_loads_only_allowed_files(user_dirs):
+    """Test that load skips untrusted files once and reloads after allow."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("API_KEY=secret\n")
+
+        env = dict(os.environ, DIRDOTENV_REQUIRE_ALLOW='1', PYTHONPATH=PACKAGE_ROOT)
+        for key in ['_DIRDOTENV_KEYS', '_DIRDOTENV_STATE', '_DIRDOTENV_SESSION']:
+            env.pop(key, None)
+
+        def run(*args):
+            return subprocess.run(
+                [sys.executable, '-m', 'dirdotenv', *args],
+                capture_output=True,
+                text=True,
+                cwd=tmpdir,
+                env=env
+            )
+
+        def state_of(output):
+            line = [line for line in output.splitlines() if '_DIRDOTENV_STATE' in line][0]
+            return line.split("'")[1]
+
+        output = run('load').stdout
+        assert 'API_KEY' not in output
+        assert 'is not allowed' in output
+
+        # Same state: the message is not repeated
+        env['_DIRDOTENV_STATE'] = state_of(output)
+        assert run('load').stdout == ''
+
+        assert run('allow').returncode == 0
+        assert run('status').stdout.split() == [ALLOWED, os.path.join(os.path.realpath(tmpdir), '.env')]
+
+        output = run('load').stdout
+        assert "export API_KEY='secret'" in output
+        assert 'is not allowed' not in output
+
+
+def test_sourced_files_must_be_allowed():
+    """Test that files sourced by .envrc directives are checked one by one."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = os.path.join(tmpdir, 'project')
+        os.makedirs(project)
+        parent_envrc = os.path.join(tmpdir, '.envrc')
+        other = os.path.join(tmpdir, 'other.sh')
+        envrc = os.path.join(project, '.envrc')
+        with open(parent_envrc, 'w') as f:
+            f.write("export PARENT=1\n")
+        with open(other, 'w') as f:
+            f.write("export OTHER=1\n")
+        with open(envrc, 'w') as f:
+            f.write("source_env ../other.sh\nsource_up\nexport OWN=1\n")
+
+        allowlist = Allowlist()
+        allowlist.allow(envrc)
+        allowlist.deny(parent_envrc)
+
+        skip, _ = find_untrusted(project, allowlist)
+        result = load_env_tree(project, skip, allowlist=allowlist)
+        assert result.env_vars == {'OWN': '1'}
+        assert result.untrusted == (other,)
+        assert other in result.watched
+
+        allowlist.allow(other)
+        result = load_env_tree(project, skip, allowlist=allowlist)
+        assert result.env_vars == {'OTHER': '1', 'OWN': '1'}
+
+        # A sourced file that changes has to be allowed again
+        with open(other, 'a') as f:
+            f.write("export MORE=1\n")
+        result = load_env_tree(project, skip, allowlist=Allowlist())
+        assert result.env_vars == {'OWN': '1'}
+        assert result.untrusted == (other,)
@@ -0,0 +1,297 @@
+"""Tests for env file watching and --exec --watch."""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+import dirdotenv
+from dirdotenv import parser
+from dirdotenv.watch import FileWatcher, exec_with_watch
+
+
+BACKENDS = [True, False]
+
+
+def _write_later(path, content, delay=0.1):
+    def write():
+        time.sleep(delay)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    return thread
+
+
+@pytest.mark.parametrize("use_inotify", BACKENDS)
+def test_detects_modification(use_inotify):
+    """Test that modifying a watched file is detected."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        with open(env_file, 'w') as f:
+            f.write("KEY=1\n")
+
+        with FileWatcher([env_file], poll_interval=0.05, use_inotify=use_inotify) as watcher:
+            if use_inotify and sys.platform.startswith('linux'):
+                assert watcher.backend == 'inotify'
+            else:
+                assert watcher.backend == 'polling'
+
+            thread = _write_later(env_file, "KEY=22\n")
+            assert watcher.wait(timeout=5) is True
+            thread.join()
+
+
+@pytest.mark.parametrize("use_inotify", BACKENDS)
+def test_detects_creation_by_rename(use_inotify):
+    """Test that a file created by an editor-style save-rename is detected."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+
+        with FileWatcher([env_file], poll_interval=0.05, use_inotify=use_inotify) as watcher:
+            tmp_file = os.path.join(tmpdir, '.env.swp')
+            with open(tmp_file, 'w') as f:
+                f.write("KEY=1\n")
+            os.replace(tmp_file, env_file)
+            assert watcher.wait(timeout=5) is True
+
+
+@pytest.mark.parametrize("use_inotify", BACKENDS)
+def test_detects_changes_after_directory_is_replaced(use_inotify, tmp_path):
+    """Test that files are still watched after their directory was removed and created again."""
+    directory = tmp_path / 'project'
+    directory.mkdir()
+    env_file = directory / '.env'
+    env_file.write_text("KEY=1\n")
+
+    with FileWatcher([str(env_file)], poll_interval=0.05, use_inotify=use_inotify) as watcher:
+        env_file.unlink()
+        directory.rmdir()
+        assert watcher.wait(timeout=5) is True
+
+        directory.mkdir()
+        assert watcher.wait(timeout=0.3) is False
+        env_file.write_text("KEY=2\n")
+        assert watcher.wait(timeout=5) is True
+
+        # Watched again (inotify), or polled
+        thread = _write_later(str(env_file), "KEY=3\n")
+        assert watcher.wait(timeout=5) is True
+        thread.join()
+
+
+@pytest.mark.parametrize("use_inotify", BACKENDS)
+def test_burst_is_debounced(use_inotify):
+    """Test that a burst of writes is reported as one change."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+
+        with FileWatcher(
+            [env_file], debounce=0.2, poll_interval=0.05, use_inotify=use_inotify
+        ) as watcher:
+            for i in range(5):
+                with open(env_file, 'w') as f:
+                    f.write("KEY=" + "x" * i + "\n")
+                time.sleep(0.02)
+
+            assert watcher.wait(timeout=5) is True
+            assert watcher.wait(timeout=0.3) is False
+
+
+@pytest.mark.parametrize("use_inotify", BACKENDS)
+def test_ignores_other_files(use_inotify):
+    """Test that changes to unrelated files in the same directory are ignored."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+
+        with FileWatcher([env_file], poll_interval=0.05, use_inotify=use_inotify) as watcher:
+            with open(os.path.join(tmpdir, 'other.txt'), 'w') as f:
+                f.write("data\n")
+            assert watcher.wait(timeout=0.3) is False
+
+
+@pytest.mark.parametrize("use_inotify", BACKENDS)
+def test_wake(use_inotify):
+    """Test that wake() interrupts a blocked wait."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with FileWatcher([os.path.join(tmpdir, '.env')], use_inotify=use_inotify) as watcher:
+            threading.Timer(0.1, watcher.wake).start()
+            start = time.monotonic()
+            assert watcher.wait(timeout=5) is False
+            assert time.monotonic() - start < 4
+
+
+def _read_line(stream, timeout=10):
+    """Read one line from a pipe, failing instead of hanging."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(stream.readline()))
+    thread.daemon = True
+    thread.start()
+    thread.join(timeout)
+    assert result, "Timed out waiting for output"
+    return result[0].strip()
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="uses POSIX signals")
+def test_cli_exec_watch_restarts_on_change():
+    """Test that the child is restarted only when the environment changes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        with open(env_file, 'w') as f:
+            f.write("VALUE=first\n")
+
+        child_code = (
+            "import os, sys, time; print(os.environ['VALUE'], flush=True); time.sleep(60)"
+        )
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'dirdotenv', tmpdir, '--watch', '--exec',
+             sys.executable, '-c', child_code],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        try:
+            assert _read_line(process.stdout) == 'first'
+
+            # Same content: no restart
+            with open(env_file, 'w') as f:
+                f.write("VALUE=first\n")
+            time.sleep(0.5)
+
+            with open(env_file, 'w') as f:
+                f.write("VALUE=second\n")
+            assert _read_line(process.stdout) == 'second'
+
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=10)
+            stderr = process.stderr.read()
+            assert stderr.count('restarting') == 1
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="uses POSIX signals")
+def test_cli_watch_after_exec_restarts_on_sourced_file_change(tmp_path):
+    """Test --exec --watch, and that files sourced from .envrc are watched."""
+    (tmp_path / '.envrc').write_text("dotenv .env.shared\n")
+    shared = tmp_path / '.env.shared'
+    shared.write_text("VALUE=first\n")
+
+    child_code = "import os, time; print(os.environ['VALUE'], flush=True); time.sleep(60)"
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'dirdotenv', str(tmp_path), '--exec', '--watch',
+         sys.executable, '-c', child_code],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    try:
+        assert _read_line(process.stdout) == 'first'
+        time.sleep(0.3)
+        shared.write_text("VALUE=second\n")
+        assert _read_line(process.stdout) == 'second'
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="uses a shell script")
+def test_exec_watch_returns_127_when_restart_finds_no_command(tmp_path):
+    """Test that a command the new environment cannot find ends watching with 127."""
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    script = bin_dir / 'dirdotenv-test-sleep'
+    script.write_text("#!/bin/sh\nexec sleep 60\n")
+    script.chmod(0o755)
+    env_file = tmp_path / '.env'
+    env_file.write_text("A=1\n")
+
+    paths = iter([str(bin_dir), str(tmp_path / 'missing')])
+    thread = _write_later(str(env_file), "A=2\n", delay=0.3)
+    try:
+        code = exec_with_watch(
+            ['dirdotenv-test-sleep'], [str(env_file)], lambda: {'PATH': next(paths)}, debounce=0.05
+        )
+    finally:
+        thread.join()
+    assert code == 127
+
+
+def _wait_for(changes, count, timeout=10):
+    deadline = time.monotonic() + timeout
+    while len(changes) < count and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return changes
+
+
+@pytest.mark.parametrize("use_inotify", BACKENDS)
+def test_watcher_reports_added_changed_removed(use_inotify):
+    """Test that the background watcher reports key-level changes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        parent_env = os.path.join(tmpdir, '.env')
+        child_dir = os.path.join(tmpdir, 'child')
+        os.makedirs(child_dir)
+        with open(parent_env, 'w') as f:
+            f.write("KEEP=1\nCHANGE=old\nREMOVE=1\n")
+
+        changes = []
+        watcher = dirdotenv.Watcher(
+            child_dir, changes.append, poll_interval=0.05, use_inotify=use_inotify
+        )
+        assert watcher.env_vars == {'KEEP': '1', 'CHANGE': 'old', 'REMOVE': '1'}
+
+        with watcher:
+            with open(parent_env, 'w') as f:
+                f.write("KEEP=1\nCHANGE=new\n")
+            _wait_for(changes, 1)
+
+            assert len(changes) == 1
+            assert changes[0].added == set()
+            assert changes[0].changed == {'CHANGE'}
+            assert changes[0].removed == {'REMOVE'}
+
+            # A new file in the child directory is picked up too
+            with open(os.path.join(child_dir, '.env'), 'w') as f:
+                f.write("ADDED=1\n")
+            _wait_for(changes, 2)
+
+            assert changes[1].added == {'ADDED'}
+            assert changes[1].env_vars == {'KEEP': '1', 'CHANGE': 'new', 'ADDED': '1'}
+
+
+def test_watcher_reparses_only_changed_layer(monkeypatch):
+    """Test that reload() parses only the files whose fingerprint changed."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        child_dir = os.path.join(tmpdir, 'child')
+        os.makedirs(child_dir)
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("PARENT=1\n")
+        child_env = os.path.join(child_dir, '.env')
+        with open(child_env, 'w') as f:
+            f.write("CHILD=1\n")
+
+        watcher = dirdotenv.Watcher(child_dir)
+        try:
+            parsed = []
+            original = parser.parse_env_file
+            monkeypatch.setattr(
+                parser, 'parse_env_file', lambda path: parsed.append(path) or original(path)
+            )
+
+            with open(child_env, 'w') as f:
+                f.write("CHILD=22\n")
+            change = watcher.reload()
+
+            assert parsed == [child_env]
+            assert change.changed == {'CHILD'}
+            assert watcher.reload() is None
+        finally:
+            watcher.stop()
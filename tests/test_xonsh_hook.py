@@ -0,0 +1,136 @@
+"""Tests for the in-process xonsh integration."""
+
+import io
+import os
+import tempfile
+
+from dirdotenv.cache import EnvCache
+from dirdotenv.hooks import get_hook
+from dirdotenv.xonsh_hook import XonshSession, install
+
+
+class FakeEvents:
+    """Minimal stand-in for xonsh's events object."""
+
+    def __init__(self):
+        self.handlers = {}
+
+    def __getattr__(self, name):
+        def register(func):
+            self.handlers.setdefault(name, []).append(func)
+            return func
+        return register
+
+
+def test_session_loads_and_unloads():
+    """Test that entering and leaving a directory updates the environment."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = os.path.join(tmpdir, 'project')
+        os.makedirs(project)
+        with open(os.path.join(project, '.env'), 'w') as f:
+            f.write("API_KEY=secret\n")
+
+        env = {'PATH': '/bin'}
+        stream = io.StringIO()
+        session = XonshSession(env, stream=stream)
+
+        assert session.update(project) is True
+        assert env == {'PATH': '/bin', 'API_KEY': 'secret'}
+        assert 'dirdotenv: +API_KEY' in stream.getvalue()
+
+        assert session.update(tmpdir) is True
+        assert env == {'PATH': '/bin'}
+        assert 'dirdotenv: -API_KEY' in stream.getvalue()
+
+
+def test_session_skips_unchanged_state():
+    """Test that an unchanged directory does not re-read env files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env_file = os.path.join(tmpdir, '.env')
+        with open(env_file, 'w') as f:
+            f.write("KEY=1\n")
+
+        cache = EnvCache()
+        env = {}
+        session = XonshSession(env, cache=cache, stream=io.StringIO())
+
+        assert session.update(tmpdir) is True
+        for _ in range(10):
+            assert session.update(tmpdir) is False
+        assert cache.stats().misses == 1
+        assert cache.stats().hits == 0
+
+        with open(env_file, 'w') as f:
+            f.write("KEY=22\n")
+        assert session.update(tmpdir) is True
+        assert env['KEY'] == '22'
+
+
+def test_session_reloads_when_sourced_file_changes(tmp_path):
+    """Test that a file sourced by .envrc is part of the state."""
+    (tmp_path / '.envrc').write_text("dotenv .env.shared\n")
+    shared = tmp_path / '.env.shared'
+    shared.write_text("KEY=1\n")
+
+    env = {}
+    session = XonshSession(env, stream=io.StringIO())
+    assert session.update(str(tmp_path)) is True
+    assert session.update(str(tmp_path)) is False
+
+    shared.write_text("KEY=22\n")
+    assert session.update(str(tmp_path)) is True
+    assert env['KEY'] == '22'
+
+
+def test_install_registers_events(monkeypatch):
+    """Test that install hooks chdir and pre-prompt events."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(os.path.join(tmpdir, '.env'), 'w') as f:
+            f.write("KEY=value\n")
+
+        monkeypatch.chdir(tmpdir)
+        env = {}
+        events = FakeEvents()
+        install(env, events)
+
+        assert env == {'KEY': 'value'}
+        assert len(events.handlers['on_chdir']) == 1
+        assert len(events.handlers['on_pre_prompt']) == 1
+
+        events.handlers['on_chdir'][0](olddir=tmpdir, newdir=os.path.dirname(tmpdir))
+        assert env == {}
+
+
+def test_get_hook_xonsh():
+    """Test that the xonsh hook imports dirdotenv instead of spawning it."""
+    hook = get_hook('xonsh', 'dirdotenv')
+    assert 'dirdotenv.xonsh_hook' in hook
+    assert '{{pythonpath}}' not in hook
+    assert 'load --shell' not in hook
+    compile(hook.replace('__xonsh__.env', 'ENV'), '<hook>', 'exec')
+
+
+def test_session_skips_unallowed_files(monkeypatch, tmp_path):
+    """Test that only allowed files are loaded when the allowlist is required."""
+    from dirdotenv import filehash
+    from dirdotenv.trust import Allowlist
+
+    monkeypatch.setenv('DIRDOTENV_DATA_DIR', str(tmp_path / 'data'))
+    monkeypatch.setenv('DIRDOTENV_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setenv('DIRDOTENV_REQUIRE_ALLOW', '1')
+    monkeypatch.setattr(filehash, 'default_hash_cache', None)
+    project = tmp_path / 'project'
+    project.mkdir()
+    env_file = project / '.env'
+    env_file.write_text("SECRET=untrusted\n")
+
+    env = {}
+    stream = io.StringIO()
+    session = XonshSession(env, stream=stream)
+    assert session.update(str(project)) is True
+    assert env == {}
+    assert f"{env_file} is not allowed, run 'dirdotenv allow {project}'" in stream.getvalue()
+
+    Allowlist().allow(str(env_file))
+    assert session.update(str(project)) is True
+    assert env == {'SECRET': 'untrusted'}
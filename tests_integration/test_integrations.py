@@ -364,3 +364,25 @@ def test_uvx_hook_behavior(shell, test_env):
         return False
 
     return True
+
+
+@pytest.mark.parametrize("shell", ["zsh", "fish"])
+def test_async_hook(shell, test_env):
+    """Test that the --async hook applies the environment once the background load finishes."""
+    child = pexpect.spawn(shell, encoding="utf-8")
+    prompt = "ASYNC_TEST_PROMPT> "
+    if shell == "fish":
+        child.sendline(f"function fish_prompt; echo '{prompt}'; end")
+        child.expect(prompt)
+        child.sendline("dirdotenv hook fish --async | source")
+    else:
+        child.sendline(f"precmd() {{ }}; PS1='{prompt}'")
+        child.expect(prompt)
+        child.sendline('eval "$(dirdotenv hook zsh --async)"')
+    child.expect(prompt)
+
+    child.sendline(f"cd {test_env}")
+    child.expect("dirdotenv: \\+TEST_VAR", timeout=10)
+
+    child.sendline("echo $TEST_VAR")
+    child.expect("hello_world")